@@ -7,6 +7,7 @@ from the 26-column CSV format to the Lex Stream application's expected JSON stru
 
 Usage:
     python convert_umls_to_lexstream.py
+    python convert_umls_to_lexstream.py --sample 0.01   # Output of a sampled dev run
 
 Input:
     imports/umls/umls_neuroscience_terms.csv - UMLS merged database (325K terms)
@@ -15,11 +16,18 @@ Output:
     neuro_terms_v3.0.0_umls.json - Lex Stream compatible UMLS database
 """
 
+import sys
 import csv
 import json
+import argparse
 from pathlib import Path
 from datetime import datetime
 
+# Add scripts/lib to path
+sys.path.insert(0, str(Path(__file__).parent / 'scripts'))
+
+from lib.sampling import add_sample_argument, enter_sample
+
 
 def extract_synonyms(row):
     """Extract all synonym fields from CSV row."""
@@ -277,8 +285,18 @@ def print_statistics(database):
     print(f"Associated Terms: {with_assoc:,} ({with_assoc/total*100:.1f}%)")
 
 
+def parse_args():
+    parser = argparse.ArgumentParser(description="Convert the UMLS CSV to Lex Stream JSON")
+    add_sample_argument(parser)
+    return parser.parse_args()
+
+
 def main():
     """Main conversion process."""
+    args = parse_args()
+    if args.sample:
+        enter_sample(args.sample)
+
     csv_path = Path('imports/umls/umls_neuroscience_terms.csv')
     output_path = Path('neuro_terms_v3.0.0_umls.json')
 
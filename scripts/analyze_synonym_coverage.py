@@ -6,32 +6,32 @@ This script analyzes how many synonyms we're losing by limiting to 3 per term
 in the NeuroDB-2 schema.
 """
 
-import json
+import sys
 from collections import Counter, defaultdict
 from pathlib import Path
 
+# Add lib to path
+sys.path.insert(0, str(Path(__file__).parent))
+
+from lib.filter_index import FilterIndex
+from lib.intermediate import iter_intermediate
+
 # File paths
 BASE_DIR = Path(__file__).parent.parent
-CUIS_FILE = BASE_DIR / "imports/umls/neuroscience_cuis.txt"
-CONCEPTS_FILE = BASE_DIR / "imports/umls/umls_concepts_intermediate.json"
+FILTER_INDEX_FILE = BASE_DIR / "imports/umls/neuroscience_cuis.idx"
+CONCEPTS_FILE = BASE_DIR / "imports/umls/umls_concepts_intermediate.jsonl"
 OUTPUT_FILE = BASE_DIR / "imports/umls/synonym_coverage_analysis.md"
 
 def load_neuroscience_cuis():
     """Load the neuroscience CUI filter list."""
     print("Loading neuroscience CUI filter...")
-    with open(CUIS_FILE, 'r') as f:
-        cuis = {line.strip() for line in f if line.strip()}
+    cuis = FilterIndex(FILTER_INDEX_FILE).cui_set()
     print(f"  Loaded {len(cuis):,} neuroscience CUIs")
     return cuis
 
 def analyze_intermediate_concepts():
-    """Analyze synonym counts from intermediate concepts JSON."""
-    print("\nAnalyzing intermediate concepts JSON...")
-
-    with open(CONCEPTS_FILE, 'r') as f:
-        concepts = json.load(f)
-
-    print(f"  Loaded {len(concepts):,} concepts")
+    """Analyze synonym counts from intermediate concepts (streamed)."""
+    print("\nAnalyzing intermediate concepts...")
 
     # Count synonyms per concept
     synonym_counts = []
@@ -39,9 +39,8 @@ def analyze_intermediate_concepts():
     total_synonyms_available = 0
     total_synonyms_kept = 0
 
-    for cui, data in concepts.items():
-        synonyms = data.get('synonyms', [])
-        syn_count = len(synonyms)
+    for cui, concept in iter_intermediate(CONCEPTS_FILE):
+        syn_count = len(concept.synonyms)
         synonym_counts.append(syn_count)
 
         if syn_count > 0:
@@ -49,11 +48,13 @@ def analyze_intermediate_concepts():
             total_synonyms_available += syn_count
             total_synonyms_kept += min(syn_count, 3)
 
+    print(f"  Analyzed {len(synonym_counts):,} concepts")
+
     # Distribution analysis
     distribution = Counter(synonym_counts)
 
     return {
-        'total_concepts': len(concepts),
+        'total_concepts': len(synonym_counts),
         'terms_with_synonyms': terms_with_synonyms,
         'total_synonyms_available': total_synonyms_available,
         'total_synonyms_kept': total_synonyms_kept,
@@ -331,7 +332,7 @@ Keep 3-synonym limit but prioritize by source quality
 ---
 
 **Analysis Generated**: 2025-11-21
-**Data Source**: `imports/umls/umls_concepts_intermediate.json`
+**Data Source**: `imports/umls/umls_concepts_intermediate.jsonl`
 **Total Concepts Analyzed**: {total:,}
 **Script**: `scripts/analyze_synonym_coverage.py`
 """
@@ -11,19 +11,26 @@ Investigation areas:
 3. Coverage by semantic type
 4. Term relevance assessment
 
-Input: imports/umls/umls_concepts_intermediate.json
+Input: imports/umls/umls_concepts_intermediate.jsonl
 Output: imports/umls/coverage_analysis_report.md
 """
 
+import sys
 import json
 import random
 from pathlib import Path
-from collections import defaultdict, Counter
+from collections import Counter
+
+# Add lib to path
+sys.path.insert(0, str(Path(__file__).parent))
+
+from lib.filter_index import FilterIndex
+from lib.intermediate import iter_intermediate
 
 # File paths
-INTERMEDIATE_JSON = Path("imports/umls/umls_concepts_intermediate.json")
+INTERMEDIATE_FILE = Path("imports/umls/umls_concepts_intermediate.jsonl")
 FILTER_STATS = Path("imports/umls/filter_statistics.json")
-MRSTY_FILE = Path("downloads/umls/2025AB/2025AB/META/MRSTY.RRF")
+FILTER_INDEX = Path("imports/umls/neuroscience_cuis.idx")
 OUTPUT_REPORT = Path("imports/umls/coverage_analysis_report.md")
 
 # Sample sizes
@@ -36,8 +43,9 @@ def load_data():
     """Load intermediate concepts and filter statistics."""
     print(f"\n📥 Loading data...")
 
-    with open(INTERMEDIATE_JSON, 'r', encoding='utf-8') as f:
-        concepts = json.load(f)
+    # Samples and several passes below need the concepts in memory; keep a
+    # single dict-per-concept copy while streaming the file
+    concepts = {cui: concept.to_dict() for cui, concept in iter_intermediate(INTERMEDIATE_FILE)}
 
     with open(FILTER_STATS, 'r', encoding='utf-8') as f:
         filter_stats = json.load(f)
@@ -50,16 +58,12 @@ def load_cui_semantic_types(concept_cuis):
     """Load semantic types for concepts (needed for coverage by type analysis)."""
     print(f"\n📖 Loading semantic types for {len(concept_cuis):,} concepts...")
 
-    cui_types = defaultdict(set)
-
-    with open(MRSTY_FILE, 'r', encoding='utf-8') as f:
-        for line in f:
-            cols = line.strip().split('|')
-            if len(cols) >= 4:
-                cui = cols[0]
-                if cui in concept_cuis:
-                    semantic_type = cols[3]  # Semantic type name
-                    cui_types[cui].add(semantic_type)
+    filter_index = FilterIndex(FILTER_INDEX)
+    cui_types = {}
+    for cui in concept_cuis:
+        semantic_types = filter_index.semantic_types(cui)
+        if semantic_types:
+            cui_types[cui] = semantic_types
 
     print(f"   ✅ Loaded semantic types for {len(cui_types):,} concepts")
     return cui_types
@@ -0,0 +1,269 @@
+#!/usr/bin/env python3
+"""
+UMLS Pipeline Benchmark
+
+Runs every UMLS pipeline stage end to end against a synthetic release
+(generate_synthetic_umls.py) in a scratch directory, and reports
+throughput and memory per stage:
+
+1. Generate MRCONSO/MRSTY/MRDEF/MRREL at the requested scale
+2. Run build_umls_filter_index.py, import_umls_neuroscience.py,
+   parse_mrrel_associations.py, map_umls_to_schema.py and
+   convert_umls_to_lexstream.py there, as separate processes
+3. Collect each script's wall/CPU time plus its per-step telemetry
+   (throughput and peak RSS, lib/telemetry.py)
+
+Results are printed as a table and optionally written as JSON, so perf
+work can be measured without the licensed META files.
+
+Usage:
+    python scripts/benchmark_pipeline.py --rows 1000000
+    python scripts/benchmark_pipeline.py --rows 100000 --workers 4 --output bench.json
+    python scripts/benchmark_pipeline.py --data /tmp/META   # Reuse generated files
+"""
+
+import os
+import sys
+import json
+import time
+import shutil
+import platform
+import argparse
+import tempfile
+import subprocess
+from pathlib import Path
+from datetime import datetime
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+# Add lib to path
+sys.path.insert(0, str(Path(__file__).parent))
+
+from lib.telemetry import format_bytes, format_duration
+
+import generate_synthetic_umls as generator
+
+SCRIPTS_DIR = Path(__file__).resolve().parent
+REPO_ROOT = SCRIPTS_DIR.parent
+
+# Where the pipeline scripts expect the release (relative to their working directory)
+META_DIR = Path("downloads/umls/2025AB/2025AB/META")
+IMPORTS_DIR = Path("imports/umls")
+
+# (stage name, script, takes --workers, telemetry file name or None)
+STAGES = [
+    ('filter_index', SCRIPTS_DIR / 'build_umls_filter_index.py', False,
+     'build_umls_filter_index_telemetry.json'),
+    ('import', SCRIPTS_DIR / 'import_umls_neuroscience.py', True,
+     'import_umls_neuroscience_telemetry.json'),
+    ('mrrel', SCRIPTS_DIR / 'parse_mrrel_associations.py', True,
+     'parse_mrrel_associations_telemetry.json'),
+    ('map', SCRIPTS_DIR / 'map_umls_to_schema.py', False,
+     'map_umls_to_schema_telemetry.json'),
+    ('lexstream_umls', REPO_ROOT / 'convert_umls_to_lexstream.py', False, None),
+]
+
+
+def run_process(command, cwd, log_path):
+    """
+    Runs one stage script, logging its output.
+
+    Returns:
+        dict: exit code, wall seconds and CPU seconds (including worker
+            processes; None where the platform cannot report it)
+    """
+    cpu_before = children_cpu()
+    started = time.perf_counter()
+    with open(log_path, 'w', encoding='utf-8') as log:
+        returncode = subprocess.call(
+            command, cwd=cwd, stdout=log, stderr=subprocess.STDOUT,
+            env=dict(os.environ, PYTHONHASHSEED='0'),
+        )
+    wall = time.perf_counter() - started
+    cpu_after = children_cpu()
+    return {
+        'exit_code': returncode,
+        'wall_seconds': round(wall, 3),
+        'cpu_seconds': round(cpu_after - cpu_before, 3) if cpu_after is not None else None,
+    }
+
+
+def children_cpu():
+    """CPU seconds of all finished child processes, or None without `resource` (Windows)."""
+    if resource is None:
+        return None
+    usage = resource.getrusage(resource.RUSAGE_CHILDREN)
+    return usage.ru_utime + usage.ru_stime
+
+
+def peak_rss(steps):
+    """
+    Largest peak RSS over a script's telemetry steps (main process or workers).
+
+    The parent's own rusage cannot be used for this: a child's high-water
+    mark starts at the parent's RSS when it is forked.
+    """
+    peaks = [
+        value for step in steps
+        for value in (step.get('peak_rss_bytes'), step.get('workers_peak_rss_bytes'))
+        if value
+    ]
+    return max(peaks) if peaks else None
+
+
+def prepare_release(workdir, args):
+    """
+    Puts a release into workdir/META_DIR: generated, or linked from --data.
+
+    Returns:
+        dict: Generation details (rows per file, seconds), or the source directory
+    """
+    meta_dir = workdir / META_DIR
+    if args.data:
+        meta_dir.parent.mkdir(parents=True, exist_ok=True)
+        meta_dir.symlink_to(args.data.resolve(), target_is_directory=True)
+        print(f"\n📂 Using existing release files in {args.data}")
+        return {'source': str(args.data)}
+
+    print(f"\n🧪 Generating synthetic release (~{args.rows:,} MRCONSO rows, seed {args.seed})...")
+    started = time.perf_counter()
+    counts = generator.generate_release(
+        meta_dir, args.rows, seed=args.seed, mrrel_ratio=args.mrrel_ratio,
+    )
+    seconds = time.perf_counter() - started
+    total_rows = sum(counts[name] for name in generator.RRF_FILES)
+    print(f"   ✅ {total_rows:,} rows in {format_duration(seconds)}")
+    return {
+        'mrconso_rows': args.rows,
+        'seed': args.seed,
+        'mrrel_ratio': args.mrrel_ratio,
+        'rows': counts,
+        'seconds': round(seconds, 3),
+    }
+
+
+def run_stages(workdir, workers):
+    """
+    Runs the pipeline stages in order, stopping at the first failure.
+
+    Returns:
+        list: One result dict per stage that ran
+    """
+    (workdir / IMPORTS_DIR).mkdir(parents=True, exist_ok=True)
+    log_dir = workdir / 'logs'
+    log_dir.mkdir(exist_ok=True)
+
+    results = []
+    for name, script, takes_workers, telemetry_file in STAGES:
+        command = [sys.executable, str(script)]
+        if takes_workers and workers > 1:
+            command += ['--workers', str(workers)]
+
+        print(f"\n▶️  {name} ({script.name})...")
+        result = {'stage': name, 'script': script.name}
+        result.update(run_process(command, workdir, log_dir / f"{name}.log"))
+
+        if telemetry_file and (workdir / IMPORTS_DIR / telemetry_file).exists():
+            with open(workdir / IMPORTS_DIR / telemetry_file, 'r', encoding='utf-8') as f:
+                result['steps'] = json.load(f)['stages']
+        result['peak_rss_bytes'] = peak_rss(result.get('steps', []))
+        results.append(result)
+
+        if result['exit_code'] != 0:
+            print(f"   ❌ Exit code {result['exit_code']}, see {log_dir / (name + '.log')}")
+            break
+        print(f"   ✅ {result['wall_seconds']:.1f}s")
+    return results
+
+
+def print_report(results):
+    """Prints per-stage and per-step throughput and memory."""
+    print("\n" + "="*70)
+    print("BENCHMARK RESULTS")
+    print("="*70)
+    print(f"\n{'Stage / step':<32} {'Wall':>8} {'CPU':>8} {'Rows/s':>12} {'MB/s':>8} {'Peak RSS':>10}")
+
+    for result in results:
+        cpu = f"{result['cpu_seconds']:.1f}s" if result['cpu_seconds'] is not None else '-'
+        peak = format_bytes(result['peak_rss_bytes']) if result['peak_rss_bytes'] else '-'
+        print(f"{result['stage']:<32} {result['wall_seconds']:>7.1f}s {cpu:>8} {'':>12} {'':>8} {peak:>10}")
+        for step in result.get('steps', []):
+            rows_per_second = f"{step['rows_per_second']:,.0f}" if step['rows'] else '-'
+            mb_per_second = f"{step['bytes_per_second'] / 1024 / 1024:.1f}" if step['bytes'] else '-'
+            step_peak = format_bytes(step['peak_rss_bytes']) if step['peak_rss_bytes'] else '-'
+            print(f"   {step['name']:<29} {step['wall_seconds']:>7.1f}s {step['cpu_seconds']:>7.1f}s "
+                  f"{rows_per_second:>12} {mb_per_second:>8} {step_peak:>10}")
+
+    total = sum(result['wall_seconds'] for result in results)
+    print(f"\n⏱️  Total: {format_duration(total)}")
+
+
+def parse_args():
+    """Parses command-line options."""
+    parser = argparse.ArgumentParser(description="Benchmark the UMLS pipeline on a synthetic release")
+    parser.add_argument(
+        '--rows', type=int, default=100000,
+        help="Approximate MRCONSO rows to generate, 10000 to 16000000 (default: 100000)"
+    )
+    parser.add_argument('--seed', type=int, default=0, help="Generator seed (default: 0)")
+    parser.add_argument(
+        '--mrrel-ratio', type=float, default=generator.MRREL_ROWS_PER_ATOM,
+        help=f"MRREL rows per MRCONSO row (default: {generator.MRREL_ROWS_PER_ATOM})"
+    )
+    parser.add_argument(
+        '--data', type=Path,
+        help="Use an existing META directory instead of generating one"
+    )
+    parser.add_argument(
+        '--workers', type=int, default=1,
+        help="--workers for the MRCONSO/MRREL stages (default: 1)"
+    )
+    parser.add_argument(
+        '--workdir', type=Path,
+        help="Scratch directory to run in and keep (default: temporary, removed afterwards)"
+    )
+    parser.add_argument('--output', type=Path, help="Write results as JSON to this file")
+    return parser.parse_args()
+
+
+def main():
+    args = parse_args()
+
+    print("="*70)
+    print("UMLS PIPELINE BENCHMARK")
+    print("="*70)
+
+    workdir = args.workdir or Path(tempfile.mkdtemp(prefix='neurodb_bench_'))
+    workdir.mkdir(parents=True, exist_ok=True)
+    print(f"\n📁 Working directory: {workdir}")
+
+    try:
+        release = prepare_release(workdir, args)
+        results = run_stages(workdir, args.workers)
+        print_report(results)
+
+        if args.output:
+            report = {
+                'started_at': datetime.now().isoformat(timespec='seconds'),
+                'python': platform.python_version(),
+                'platform': platform.platform(),
+                'cpu_count': os.cpu_count(),
+                'workers': args.workers,
+                'release': release,
+                'stages': results,
+            }
+            with open(args.output, 'w', encoding='utf-8') as f:
+                json.dump(report, f, indent=2)
+            print(f"💾 Results: {args.output}")
+    finally:
+        if not args.workdir:
+            shutil.rmtree(workdir, ignore_errors=True)
+
+    return 0 if all(result['exit_code'] == 0 for result in results) else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -5,20 +5,31 @@ Build Neuroscience CUI Filter Index from UMLS MRSTY.RRF
 Filters 4M+ UMLS concepts → 100K-150K neuroscience-relevant concepts
 using semantic type assignments.
 
-Input: downloads/umls/2025AB/2025AB/META/MRSTY.RRF
-Output: imports/umls/neuroscience_cuis.txt (one CUI per line)
+Input: downloads/umls/2025AB/2025AB/META/MRSTY.RRF (--release / --meta-dir for others)
+Output: imports/umls/neuroscience_cuis.idx (binary filter index, see lib/filter_index.py)
         imports/umls/filter_statistics.json
+        imports/umls/build_umls_filter_index_telemetry.json (timings, see lib/telemetry.py)
 """
 
 import sys
 import json
+import argparse
 from pathlib import Path
 from collections import defaultdict, Counter
 
-# UMLS file path
-MRSTY_PATH = Path("downloads/umls/2025AB/2025AB/META/MRSTY.RRF")
+# Add lib to path
+sys.path.insert(0, str(Path(__file__).parent))
+
+from lib.rrf_reader import RRFReader, resolve_rrf
+from lib.merge_join import group_by_cui, UnsortedRRFError
+from lib.filter_index import write_filter_index
+from lib.sampling import add_sample_argument, enter_sample
+from lib.telemetry import Telemetry, StageMetrics
+
+# UMLS release and file path
+UMLS_RELEASE = "2025AB"
 OUTPUT_DIR = Path("imports/umls")
-CUI_OUTPUT = OUTPUT_DIR / "neuroscience_cuis.txt"
+CUI_OUTPUT = OUTPUT_DIR / "neuroscience_cuis.idx"
 STATS_OUTPUT = OUTPUT_DIR / "filter_statistics.json"
 
 # Neuroscience-relevant semantic types with TUI codes
@@ -81,9 +92,47 @@ NEURO_KEYWORDS = [
 ]
 
 
-def parse_mrsty(mrsty_path):
+def iter_mrsty(mrsty_path, metrics=None):
+    """
+    Stream MRSTY.RRF (sorted by CUI) one concept at a time, so only the
+    current CUI's semantic types are held in memory instead of lists for
+    all 4M+ CUIs.
+
+    Yields:
+        tuple: (CUI, [(TUI, semantic_type_name), ...]), in file order
+
+    Raises:
+        UnsortedRRFError: If MRSTY.RRF is not sorted by CUI
     """
-    Parse MRSTY.RRF to build CUI → Semantic Types mapping.
+    print(f"\n📖 Streaming {mrsty_path}...")
+
+    if not resolve_rrf(mrsty_path).exists():
+        print(f"❌ ERROR: File not found: {mrsty_path}")
+        sys.exit(1)
+
+    unique_cuis = 0
+    metrics = metrics or StageMetrics('parse_mrsty')
+
+    def report_progress(reader):
+        print(f"   Processed {reader.rows_read:,} rows, {unique_cuis:,} unique CUIs..." +
+              metrics.track(reader))
+
+    reader = RRFReader(mrsty_path, columns=('CUI', 'TUI', 'STY'),
+                       progress=report_progress, progress_every=100000)
+    for cui, rows in group_by_cui(reader):
+        unique_cuis += 1
+        yield cui, [(tui, sty) for _, tui, sty in rows]
+    metrics.track(reader)
+    metrics.count({'unique_cuis': unique_cuis})
+
+    print(f"   ✅ Parsed {reader.rows_read:,} rows")
+    print(f"   ✅ Found {unique_cuis:,} unique CUIs with semantic types")
+
+
+def parse_mrsty(mrsty_path, metrics=None):
+    """
+    Parse MRSTY.RRF to build CUI → Semantic Types mapping. Holds every CUI's
+    types in memory; used when MRSTY.RRF is not sorted by CUI (see iter_mrsty()).
 
     MRSTY.RRF format (pipe-delimited):
     CUI|TUI|STN|STY|ATUI|CVF
@@ -93,29 +142,25 @@ def parse_mrsty(mrsty_path):
     """
     print(f"\n📖 Parsing {mrsty_path}...")
 
-    if not mrsty_path.exists():
+    if not resolve_rrf(mrsty_path).exists():
         print(f"❌ ERROR: File not found: {mrsty_path}")
         sys.exit(1)
 
     cui_to_types = defaultdict(list)
-    total_rows = 0
-
-    with open(mrsty_path, 'r', encoding='utf-8') as f:
-        for line in f:
-            total_rows += 1
-            cols = line.strip().split('|')
-
-            if len(cols) < 4:
-                continue
+    metrics = metrics or StageMetrics('parse_mrsty')
 
-            cui = cols[0]
-            tui = cols[1]  # Semantic type unique identifier (e.g., T023)
-            sty = cols[3]  # Semantic type name (e.g., "Body Part, Organ, or Organ Component")
+    def report_progress(reader):
+        print(f"   Processed {reader.rows_read:,} rows, {len(cui_to_types):,} unique CUIs..." +
+              metrics.track(reader))
 
-            cui_to_types[cui].append((tui, sty))
-
-            if total_rows % 100000 == 0:
-                print(f"   Processed {total_rows:,} rows, {len(cui_to_types):,} unique CUIs...")
+    # TUI: Semantic type unique identifier (e.g., T023)
+    # STY: Semantic type name (e.g., "Body Part, Organ, or Organ Component")
+    reader = RRFReader(mrsty_path, columns=('CUI', 'TUI', 'STY'),
+                       progress=report_progress, progress_every=100000)
+    for cui, tui, sty in reader:
+        cui_to_types[cui].append((tui, sty))
+    total_rows = reader.rows_read
+    metrics.track(reader)
 
     print(f"   ✅ Parsed {total_rows:,} rows")
     print(f"   ✅ Found {len(cui_to_types):,} unique CUIs with semantic types")
@@ -123,7 +168,7 @@ def parse_mrsty(mrsty_path):
     return cui_to_types
 
 
-def filter_neuroscience_cuis(cui_to_types):
+def filter_neuroscience_cuis(cui_type_lists):
     """
     Filter CUIs to neuroscience-relevant concepts using hybrid approach.
 
@@ -132,17 +177,21 @@ def filter_neuroscience_cuis(cui_to_types):
     - Priority 2 semantic type: Include if from neuro domain
     - Priority 3 semantic type: Include only with neuro keywords
 
+    Args:
+        cui_type_lists (iterable): (CUI, [(TUI, semantic_type_name), ...]) pairs,
+            from iter_mrsty() or parse_mrsty().items()
+
     Returns:
-        set: Neuroscience-relevant CUIs
+        dict: {CUI: [(TUI, semantic_type_name), ...]} for neuroscience-relevant CUIs
         dict: Statistics by semantic type
     """
     print(f"\n🔍 Filtering neuroscience-relevant CUIs...")
 
-    neuroscience_cuis = set()
+    neuroscience_cuis = {}
     stats_by_type = Counter()
     priority_distribution = Counter()
 
-    for cui, type_list in cui_to_types.items():
+    for cui, type_list in cui_type_lists:
         include = False
         cui_priorities = set()
 
@@ -168,7 +217,7 @@ def filter_neuroscience_cuis(cui_to_types):
                     pass
 
         if include:
-            neuroscience_cuis.add(cui)
+            neuroscience_cuis[cui] = type_list
             # Track highest priority for this CUI
             if cui_priorities:
                 priority_distribution[min(cui_priorities)] += 1
@@ -183,22 +232,55 @@ def filter_neuroscience_cuis(cui_to_types):
     return neuroscience_cuis, dict(stats_by_type)
 
 
-def write_outputs(neuroscience_cuis, stats_by_type):
+def build_index_entries(neuroscience_cuis):
     """
-    Write filtered CUIs to file and statistics to JSON.
+    Collect per-CUI semantic types and priority for the binary filter index.
+
+    Args:
+        neuroscience_cuis (dict): {CUI: [(TUI, semantic_type_name), ...]}
+
+    Returns:
+        dict: {CUI: (set of TUIs, best priority)}
+        list: TUI table [(TUI, semantic type name, priority), ...], sorted by TUI;
+              priority is 0 for types outside NEURO_SEMANTIC_TYPES
+    """
+    cui_types = {}
+    type_names = {}
+
+    for cui, type_list in neuroscience_cuis.items():
+        tuis = set()
+        for tui, sty in type_list:
+            tuis.add(tui)
+            type_names[tui] = sty
+        priority = min(
+            NEURO_SEMANTIC_TYPES[tui][1] for tui in tuis if tui in NEURO_SEMANTIC_TYPES
+        )
+        cui_types[cui] = (tuis, priority)
+
+    tui_table = [
+        (tui, type_names[tui], NEURO_SEMANTIC_TYPES.get(tui, (None, 0))[1])
+        for tui in sorted(type_names)
+    ]
+    return cui_types, tui_table
+
+
+def write_outputs(neuroscience_cuis, stats_by_type, release=UMLS_RELEASE):
+    """
+    Write the binary filter index and statistics to JSON.
     """
     OUTPUT_DIR.mkdir(parents=True, exist_ok=True)
 
-    # Write CUI list
+    # Write filter index (CUIs + semantic types + priorities)
     print(f"\n💾 Writing {len(neuroscience_cuis):,} CUIs to {CUI_OUTPUT}...")
-    with open(CUI_OUTPUT, 'w', encoding='utf-8') as f:
-        for cui in sorted(neuroscience_cuis):
-            f.write(f"{cui}\n")
-    print(f"   ✅ Wrote {CUI_OUTPUT}")
+    cui_types, tui_table = build_index_entries(neuroscience_cuis)
+    checksum = write_filter_index(CUI_OUTPUT, release, cui_types, tui_table)
+    print(f"   ✅ Wrote {CUI_OUTPUT} ({len(tui_table)} semantic types, sha256 {checksum[:12]}...)")
 
     # Write statistics
     print(f"\n📊 Writing statistics to {STATS_OUTPUT}...")
     stats = {
+        'umls_release': release,
+        'filter_index_checksum': checksum,
         'total_cuis_filtered': len(neuroscience_cuis),
         'semantic_type_counts': stats_by_type,
         'top_10_semantic_types': sorted(
@@ -218,19 +300,64 @@ def write_outputs(neuroscience_cuis, stats_by_type):
     print(f"   ✅ Wrote {STATS_OUTPUT}")
 
 
+def parse_args():
+    parser = argparse.ArgumentParser(description="Build the neuroscience CUI filter index")
+    parser.add_argument(
+        '--release', default=UMLS_RELEASE,
+        help=f"UMLS release name recorded in the index (default: {UMLS_RELEASE})"
+    )
+    parser.add_argument(
+        '--meta-dir', type=Path,
+        help="META directory of the release (default: downloads/umls/<release>/<release>/META)"
+    )
+    add_sample_argument(parser)
+    return parser.parse_args()
+
+
 def main():
+    args = parse_args()
+    meta_dir = args.meta_dir or Path(f"downloads/umls/{args.release}/{args.release}/META")
+    if args.sample:
+        meta_dir = enter_sample(args.sample, meta_dir, ['MRSTY.RRF'])
+
     print("="*70)
     print("UMLS NEUROSCIENCE CUI FILTER BUILDER")
     print("="*70)
 
-    # Step 1: Parse MRSTY.RRF
-    cui_to_types = parse_mrsty(MRSTY_PATH)
-
-    # Step 2: Filter to neuroscience CUIs
-    neuroscience_cuis, stats_by_type = filter_neuroscience_cuis(cui_to_types)
+    telemetry = Telemetry('build_umls_filter_index', OUTPUT_DIR, release=args.release,
+                          sample=args.sample)
+
+    # Steps 1-2: Stream MRSTY.RRF and filter to neuroscience CUIs
+    mrsty_path = meta_dir / "MRSTY.RRF"
+    neuroscience_cuis = None
+    with telemetry.stage('filter_mrsty') as metrics:
+        try:
+            neuroscience_cuis, stats_by_type = filter_neuroscience_cuis(
+                iter_mrsty(mrsty_path, metrics)
+            )
+            metrics.count({'neuroscience_cuis': len(neuroscience_cuis)})
+        except UnsortedRRFError as e:
+            print(f"\n⚠️  {e}")
+            print(f"   Falling back to loading all of MRSTY.RRF...")
+
+    if neuroscience_cuis is None:
+        with telemetry.stage('parse_mrsty') as metrics:
+            cui_to_types = parse_mrsty(mrsty_path, metrics)
+            metrics.count({'unique_cuis': len(cui_to_types)})
+
+        with telemetry.stage('filter_neuroscience_cuis') as metrics:
+            neuroscience_cuis, stats_by_type = filter_neuroscience_cuis(cui_to_types.items())
+            metrics.advance(rows=len(cui_to_types))
+            metrics.count({'neuroscience_cuis': len(neuroscience_cuis)})
+        del cui_to_types
 
     # Step 3: Write outputs
-    write_outputs(neuroscience_cuis, stats_by_type)
+    with telemetry.stage('write_outputs') as metrics:
+        write_outputs(neuroscience_cuis, stats_by_type, release=args.release)
+        metrics.advance(rows=len(neuroscience_cuis), bytes_done=CUI_OUTPUT.stat().st_size)
+
+    telemetry.save()
+    telemetry.print_summary()
 
     # Summary
     print("\n" + "="*70)
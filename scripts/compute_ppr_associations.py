@@ -0,0 +1,253 @@
+#!/usr/bin/env python3
+"""
+UMLS Associations by Personalized PageRank
+
+Ranks related concepts for every concept in the concept graph written by
+parse_mrrel_associations.py, by personalized PageRank (random walk with
+restart, lib/pagerank.py) instead of by direct relationships only:
+
+- Hub concepts with thousands of edges get the neighbours most strongly
+  connected to them, not simply their best-weighted direct edges
+- Concepts with few direct relationships pick up closely connected
+  concepts two or three edges away
+
+Edges are weighted like parse_mrrel_associations.py scores them (RELA
+weight × source weight, taxonomy edges included as walk paths), and
+results are scaled by concept_quality().
+
+Input:
+- imports/umls/umls_concepts_intermediate.jsonl (terms, concept quality)
+- imports/umls/umls_concept_graph.csr (from parse_mrrel_associations.py)
+
+Output:
+- imports/umls/umls_ppr_associations.json (umls_associations.json format;
+  map it with: python scripts/map_umls_to_schema.py --associations imports/umls/umls_ppr_associations.json)
+- imports/umls/compute_ppr_associations_telemetry.json
+
+Needs NumPy (pip install numpy).
+
+Usage:
+    python scripts/compute_ppr_associations.py --workers 0
+"""
+
+import os
+import sys
+import json
+import argparse
+import multiprocessing
+from pathlib import Path
+
+# Add lib to path
+sys.path.insert(0, str(Path(__file__).parent))
+
+from lib.concept_graph import ConceptGraph, ConceptGraphError
+from lib.pagerank import PersonalizedPageRank, DEFAULT_RESTART, DEFAULT_EPSILON
+from lib.sampling import add_sample_argument, enter_sample
+from lib.telemetry import Telemetry
+
+import parse_mrrel_associations as mrrel
+
+GRAPH_FILE = mrrel.OUTPUT_GRAPH
+OUTPUT_ASSOCIATIONS = Path("imports/umls/umls_ppr_associations.json")
+
+# Seeds per power-iteration block; each block holds its seeds' sparse
+# vectors (~1 / (restart × epsilon) entries per seed at most) in memory
+SEED_BLOCK_SIZE = 512
+
+
+def edge_weights(graph):
+    """
+    Per-code RELA and SAB edge weights for the graph's type tables, as
+    parse_mrrel_associations.py scores relationships.
+    """
+    rela_weights = [mrrel.rela_weight(rela) for rela in graph.type_tables['RELA']]
+    sab_weights = [
+        mrrel.SOURCE_WEIGHTS.get(sab, mrrel.DEFAULT_SOURCE_WEIGHT)
+        for sab in graph.type_tables['SAB']
+    ]
+    return rela_weights, sab_weights
+
+
+def node_weights(graph, concept_terms, concept_qualities):
+    """Ranking multiplier per node: concept quality, 0 for concepts without a term."""
+    return [
+        concept_qualities.get(cui, 1.0) if concept_terms.get(cui) else 0.0
+        for cui in graph
+    ]
+
+
+# PageRank engine shared with worker processes (set by init_ppr_worker)
+_worker_state = {}
+
+
+def init_ppr_worker(graph, rela_weights, sab_weights, weights, options):
+    """Process pool initializer: build the PageRank engine once per worker."""
+    _worker_state['engine'] = PersonalizedPageRank(graph, rela_weights, sab_weights, weights)
+    _worker_state['options'] = options
+
+
+def rank_block(seeds):
+    """Process pool task: top-k related nodes for one block of seed nodes."""
+    return _worker_state['engine'].top_k(seeds, **_worker_state['options'])
+
+
+def compute_associations(graph, concept_terms, concept_qualities, top_k, restart,
+                         epsilon, workers=1, metrics=None):
+    """
+    Personalized PageRank top-k related concepts for every graph node.
+
+    Seeds are processed in blocks of SEED_BLOCK_SIZE, by a process pool
+    when workers > 1. Results do not depend on the block size or the
+    number of workers.
+
+    Returns:
+        dict: {CUI: [(related CUI, score), ...]} best first, for CUIs with
+            at least one related concept
+    """
+    print(f"\n🧮 Computing personalized PageRank for {len(graph):,} concepts "
+          f"({graph.edge_count:,} edges, restart={restart}, epsilon={epsilon})...")
+
+    rela_weights, sab_weights = edge_weights(graph)
+    weights = node_weights(graph, concept_terms, concept_qualities)
+    options = {'k': top_k, 'restart': restart, 'epsilon': epsilon}
+    blocks = [
+        range(start, min(start + SEED_BLOCK_SIZE, len(graph)))
+        for start in range(0, len(graph), SEED_BLOCK_SIZE)
+    ]
+    cuis = list(graph)
+    related = {}
+
+    def collect(block, results):
+        for seed, ranked in zip(block, results):
+            if ranked:
+                related[cuis[seed]] = [(cuis[node], score) for node, score in ranked]
+
+    initargs = (graph, rela_weights, sab_weights, weights, options)
+    if workers > 1 and len(blocks) > 1:
+        print(f"   Ranking {len(blocks)} seed blocks with {workers} worker processes...")
+        with multiprocessing.Pool(workers, initializer=init_ppr_worker, initargs=initargs) as pool:
+            for i, results in enumerate(pool.imap(rank_block, blocks), 1):
+                collect(blocks[i - 1], results)
+                report_block(i, blocks, metrics)
+    else:
+        init_ppr_worker(*initargs)
+        for i, block in enumerate(blocks, 1):
+            collect(block, rank_block(block))
+            report_block(i, blocks, metrics)
+
+    print(f"   ✅ Ranked related concepts for {len(related):,} concepts")
+    return related
+
+
+def report_block(done, blocks, metrics):
+    """Progress line every ~10% of the seed blocks."""
+    seeds = blocks[done - 1].stop
+    if metrics is not None:
+        metrics.advance(seeds)
+    if done == len(blocks) or done % max(len(blocks) // 10, 1) == 0:
+        print(f"   Ranked {seeds:,}/{blocks[-1].stop:,} concepts...")
+
+
+def save_associations(related, concept_terms, path=OUTPUT_ASSOCIATIONS):
+    """
+    Write related concepts in umls_associations.json's format, so
+    map_umls_to_schema.py can use them as associated terms.
+    """
+    print(f"\n💾 Saving associations to {path}...")
+
+    json_data = {}
+    for cui, ranked in related.items():
+        json_data[cui] = {
+            'associated_terms': [concept_terms[related_cui] for related_cui, _ in ranked],
+            'related_cuis': [related_cui for related_cui, _ in ranked],
+            'scores': [float(f"{score:.6g}") for _, score in ranked],
+            'relationship_details': {},
+            'total_associations': len(ranked),
+        }
+
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(json_data, f, indent=2)
+
+    print(f"   ✅ Saved {len(json_data):,} CUI associations")
+    return len(json_data)
+
+
+def parse_args():
+    """Parses command-line options."""
+    parser = argparse.ArgumentParser(
+        description="Rank associated terms by personalized PageRank over the concept graph"
+    )
+    parser.add_argument(
+        '--top-k', type=int, default=mrrel.ASSOCIATED_TERMS_LIMIT,
+        help=f"Related concepts kept per concept (default: {mrrel.ASSOCIATED_TERMS_LIMIT})"
+    )
+    parser.add_argument(
+        '--restart', type=float, default=DEFAULT_RESTART,
+        help=f"Restart probability per walk step (default: {DEFAULT_RESTART})"
+    )
+    parser.add_argument(
+        '--epsilon', type=float, default=DEFAULT_EPSILON,
+        help=f"Residual mass per edge below which the walk stops expanding (default: {DEFAULT_EPSILON})"
+    )
+    parser.add_argument(
+        '--workers', type=int, default=1,
+        help="Worker processes (1 = serial, 0 = all CPU cores)"
+    )
+    parser.add_argument('--graph', type=Path, default=GRAPH_FILE, help=f"Graph file (default: {GRAPH_FILE})")
+    parser.add_argument(
+        '--output', type=Path, default=OUTPUT_ASSOCIATIONS,
+        help=f"Output file (default: {OUTPUT_ASSOCIATIONS})"
+    )
+    add_sample_argument(parser)
+    return parser.parse_args()
+
+
+def main():
+    args = parse_args()
+    workers = args.workers or os.cpu_count() or 1
+    if args.sample:
+        enter_sample(args.sample)
+
+    print("="*70)
+    print("UMLS ASSOCIATIONS BY PERSONALIZED PAGERANK")
+    print("="*70)
+
+    telemetry = Telemetry('compute_ppr_associations', args.output.parent, sample=args.sample)
+
+    try:
+        graph = ConceptGraph(args.graph)
+    except ConceptGraphError as e:
+        print(f"\n❌ ERROR: {e} (run parse_mrrel_associations.py first)")
+        return 1
+
+    with telemetry.stage('load_concepts', path=mrrel.INTERMEDIATE_FILE) as metrics:
+        _, concept_terms, concept_qualities = mrrel.load_concepts()
+        metrics.advance(len(concept_terms), metrics.total_bytes)
+
+    with telemetry.stage('personalized_pagerank') as metrics:
+        try:
+            related = compute_associations(
+                graph, concept_terms, concept_qualities, args.top_k, args.restart,
+                args.epsilon, workers=workers, metrics=metrics,
+            )
+        except ImportError as e:
+            print(f"\n❌ ERROR: {e}")
+            return 1
+
+    with telemetry.stage('save_associations') as metrics:
+        count = save_associations(related, concept_terms, args.output)
+        metrics.advance(count, args.output.stat().st_size)
+
+    telemetry.save()
+    telemetry.print_summary()
+
+    print("\n" + "="*70)
+    print("PERSONALIZED PAGERANK COMPLETE")
+    print("="*70)
+    print(f"\n✅ Output: {args.output}")
+    print(f"\n🎯 Next: python scripts/map_umls_to_schema.py --associations {args.output}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
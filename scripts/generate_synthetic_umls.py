@@ -0,0 +1,358 @@
+#!/usr/bin/env python3
+"""
+Synthetic UMLS Release Generator
+
+Writes MRCONSO.RRF, MRSTY.RRF, MRDEF.RRF and MRREL.RRF with the real
+column layouts (lib/rrf_reader.py RRF_COLUMNS) and roughly the shape of
+the 2025AB release, so the import pipeline can be tested and benchmarked
+without the licensed META files:
+
+- All files sorted by CUI (MRREL by CUI1), sparse CUI ids below C6000000
+- ~4.7 MRCONSO atoms per CUI with 2025AB-like LAT / SUPPRESS / ISPREF /
+  SAB / TTY mixes; English terms mention neuroscience keywords at a rate
+  that exercises the stage 5 keyword filter
+- ~23% of CUIs carry a priority 1/2 neuroscience semantic type (the
+  1.0M-of-4.4M ratio of build_umls_filter_index.py on 2025AB); the rest
+  get non-neuroscience or priority 3 types
+- MRDEF definitions for ~13% of CUIs, MRREL ~5 rows per MRCONSO row with
+  REL / RELA mixes covering taxonomy and domain-specific relationships
+
+Scale is set by the MRCONSO row count (2025AB: ~16M rows); the other
+files follow the ratios above. Output is deterministic for a given seed.
+
+Usage:
+    python scripts/generate_synthetic_umls.py --rows 1000000 \\
+        --output downloads/umls/2025AB/2025AB/META
+    python scripts/generate_synthetic_umls.py --rows 100000 --mrrel-ratio 1 --output /tmp/META
+"""
+
+import sys
+import random
+import argparse
+from array import array
+from itertools import chain
+from pathlib import Path
+
+# Add lib to path
+sys.path.insert(0, str(Path(__file__).parent))
+
+from lib.cui_set import MAX_CUI_ID, decode_cui
+
+# Release shape (approximate 2025AB ratios)
+ATOMS_PER_CUI = 4.7
+MRREL_ROWS_PER_ATOM = 5.0
+NEURO_CUI_FRACTION = 0.23
+SECOND_SEMANTIC_TYPE_FRACTION = 0.08
+DEFINITION_CUI_FRACTION = 0.13
+CUI_ID_SPACE = 6_000_000
+
+# Draws from weighted distributions are made in batches of this size
+DRAW_BATCH = 65536
+
+# {value: weight} distributions
+LANGUAGES = {
+    'ENG': 62, 'SPA': 9, 'JPN': 5, 'FRE': 4, 'GER': 4, 'POR': 4,
+    'DUT': 3, 'ITA': 3, 'CZE': 2, 'RUS': 1, 'KOR': 1, 'CHI': 1, 'POL': 1,
+}
+SUPPRESS_FLAGS = {'N': 92, 'O': 5, 'Y': 2, 'E': 1}
+ISPREF_FLAGS = {'Y': 60, 'N': 40}
+ENGLISH_SOURCES = {
+    'SNOMEDCT_US': 20, 'MSH': 12, 'NCI': 10, 'LNC': 10, 'MEDCIN': 8,
+    'MDR': 8, 'MTH': 5, 'RXNORM': 5, 'NCBI': 5, 'ICD10CM': 3, 'GO': 3,
+    'HPO': 2, 'OMIM': 2, 'CSP': 2, 'MEDLINEPLUS': 1, 'FMA': 4,
+}
+# Non-English atoms come from the translated vocabularies, e.g. MSHSPA / MDRJPN
+TRANSLATED_SOURCES = {'MSH': 60, 'MDR': 40}
+TERM_TYPES = {
+    'PT': 25, 'SY': 20, 'FN': 8, 'LLT': 8, 'ET': 8, 'PN': 5, 'MH': 4,
+    'AB': 4, 'OP': 3, 'IS': 3, 'ACR': 1, 'MTH_FN': 1, 'LN': 5, 'HT': 5,
+}
+DEFINITION_SOURCES = {
+    'MSH': 25, 'NCI': 30, 'CSP': 10, 'SNOMEDCT_US': 5, 'HPO': 5,
+    'NCBI': 10, 'MEDLINEPLUS': 5, 'PDQ': 5, 'OMIM': 3, 'GO': 2,
+}
+DEFINITIONS_PER_CUI = {1: 60, 2: 25, 3: 10, 4: 5}
+RELATIONSHIPS = {
+    'RO': 30, 'SIB': 20, 'PAR': 10, 'CHD': 10, 'RB': 8, 'RN': 8,
+    'RQ': 6, 'SY': 4, 'AQ': 2, 'QB': 2,
+}
+RELATIONSHIP_ATTRIBUTES = {
+    '': 35, 'isa': 10, 'inverse_isa': 10, 'mapped_to': 4, 'mapped_from': 4,
+    'part_of': 4, 'has_part': 4, 'associated_with': 3, 'has_location': 2,
+    'location_of': 2, 'causes': 1, 'caused_by': 1, 'treats': 1, 'treated_by': 1,
+    'has_active_ingredient': 2, 'active_ingredient_of': 2,
+    'has_finding_site': 3, 'finding_site_of': 3, 'classified_as': 3,
+    'innervates': 1, 'branch_of': 1, 'tributary_of': 1,
+}
+
+# Semantic types: (TUI, name) with weights. Neuroscience types pass the
+# filter index (priority 1/2); other types do not (including priority 3).
+NEURO_TYPES = {
+    ('T047', 'Disease or Syndrome'): 18,
+    ('T121', 'Pharmacologic Substance'): 14,
+    ('T116', 'Amino Acid, Peptide, or Protein'): 14,
+    ('T028', 'Gene or Genome'): 12,
+    ('T023', 'Body Part, Organ, or Organ Component'): 8,
+    ('T123', 'Biologically Active Substance'): 6,
+    ('T191', 'Neoplastic Process'): 5,
+    ('T037', 'Injury or Poisoning'): 5,
+    ('T126', 'Enzyme'): 4,
+    ('T044', 'Molecular Function'): 3,
+    ('T043', 'Cell Function'): 2,
+    ('T046', 'Pathologic Function'): 2,
+    ('T048', 'Mental or Behavioral Dysfunction'): 2,
+    ('T025', 'Cell'): 1,
+    ('T026', 'Cell Component'): 1,
+    ('T041', 'Mental Process'): 1,
+    ('T192', 'Receptor'): 1,
+    ('T114', 'Nucleic Acid, Nucleoside, or Nucleotide'): 1,
+}
+OTHER_TYPES = {
+    ('T109', 'Organic Chemical'): 20,
+    ('T033', 'Finding'): 15,
+    ('T204', 'Eukaryote'): 12,
+    ('T170', 'Intellectual Product'): 8,
+    ('T201', 'Clinical Attribute'): 8,
+    ('T059', 'Laboratory Procedure'): 8,
+    ('T061', 'Therapeutic or Preventive Procedure'): 6,
+    ('T060', 'Diagnostic Procedure'): 4,
+    ('T074', 'Medical Device'): 5,
+    ('T071', 'Entity'): 4,
+    ('T007', 'Bacterium'): 5,
+    ('T129', 'Immunologic Factor'): 5,
+}
+
+# Vocabulary for generated terms and definitions
+NEURO_WORDS = [
+    'neuronal', 'brain', 'cerebral', 'cortex', 'cortical', 'neural', 'synaptic',
+    'axonal', 'dendritic', 'glial', 'astrocytic', 'cognitive', 'memory',
+    'psychiatric', 'mental', 'behavioral', 'parkinson', 'alzheimer', 'epileptic',
+    'schizophrenia', 'depressive', 'anxiety', 'dementia', 'stroke', 'migraine',
+    'dopamine', 'serotonin', 'gaba', 'glutamate', 'hippocampus', 'amygdala',
+    'thalamus', 'cerebellum', 'neurotrophic', 'neurodegeneration',
+]
+GENERAL_WORDS = [
+    'acute', 'chronic', 'syndrome', 'disease', 'disorder', 'protein', 'receptor',
+    'kinase', 'gene', 'cell', 'tissue', 'liver', 'renal', 'cardiac', 'pulmonary',
+    'muscle', 'bone', 'skin', 'blood', 'plasma', 'inhibitor', 'agonist', 'antagonist',
+    'type', 'family', 'member', 'factor', 'deficiency', 'infection', 'tumor',
+    'carcinoma', 'injury', 'fracture', 'procedure', 'measurement', 'level', 'left',
+    'right', 'upper', 'lower', 'primary', 'secondary', 'congenital', 'hereditary',
+    'oral', 'tablet', 'injection', 'solution', 'mg', 'structure', 'region',
+]
+ACCENTED_WORDS = ['éstasis', 'déficit', 'Störung', 'maladie', 'síndrome', 'doença']
+# Fraction of English terms (and definition phrases) built around a
+# neuroscience word. Together with the ~26% of neuroscience CUIs whose types
+# skip the keyword filter, ~1/3 of filtered CUIs end up with a preferred
+# term, as on 2025AB (~325K concepts from ~1.0M filtered CUIs).
+NEURO_TERM_FRACTION = 0.07
+
+RRF_FILES = ('MRCONSO.RRF', 'MRSTY.RRF', 'MRDEF.RRF', 'MRREL.RRF')
+
+
+def weighted_stream(rng, distribution):
+    """
+    Endless iterator of values drawn from a {value: weight} distribution,
+    drawn DRAW_BATCH at a time (one random.choices call per batch).
+    """
+    values = list(distribution)
+    weights = list(distribution.values())
+    return chain.from_iterable(
+        iter(lambda: rng.choices(values, weights, k=DRAW_BATCH), None)
+    )
+
+
+def draw_count(rng, mean):
+    """Draws a non-negative integer with a geometric-like distribution around `mean`."""
+    return int(rng.expovariate(1.0 / mean) + 0.5) if mean > 0 else 0
+
+
+def cui_ids(rng, count):
+    """
+    Sorted, sparse CUI ids spread over CUI_ID_SPACE (denser if count needs
+    it), as an array of ints.
+
+    Raises:
+        ValueError: If count CUIs cannot fit below MAX_CUI_ID
+    """
+    if count >= MAX_CUI_ID // 2:
+        raise ValueError(f"Too many CUIs for the CUI id space: {count:,}")
+    extra_gap = CUI_ID_SPACE / count - 1
+    ids = array('i')
+    current = 0
+    for _ in range(count):
+        current += 1 + draw_count(rng, extra_gap)
+        ids.append(current)
+    return ids
+
+
+def make_term(rng, neuro):
+    """Builds a 2-5 word term, optionally around a neuroscience word."""
+    words = rng.sample(GENERAL_WORDS, rng.randint(2, 4))
+    if neuro:
+        words.insert(rng.randrange(len(words) + 1), rng.choice(NEURO_WORDS))
+    term = ' '.join(words)
+    return term[0].upper() + term[1:]
+
+
+def generate_release(meta_dir, mrconso_rows, seed=0, mrrel_ratio=MRREL_ROWS_PER_ATOM, progress=None):
+    """
+    Writes a synthetic release into meta_dir.
+
+    Args:
+        meta_dir (str|Path): Output directory (created if missing)
+        mrconso_rows (int): Approximate MRCONSO row count (sets the scale)
+        seed (int): Random seed (same seed and scale, same files)
+        mrrel_ratio (float): MRREL rows per MRCONSO row
+        progress (callable): Optional progress(cuis_done, cui_count)
+
+    Returns:
+        dict: {file name: row count} plus 'cuis' and 'neuro_cuis'
+    """
+    meta_dir = Path(meta_dir)
+    meta_dir.mkdir(parents=True, exist_ok=True)
+    rng = random.Random(seed)
+
+    cui_count = max(1, round(mrconso_rows / ATOMS_PER_CUI))
+    ids = cui_ids(rng, cui_count)
+
+    languages = weighted_stream(rng, LANGUAGES)
+    suppress_flags = weighted_stream(rng, SUPPRESS_FLAGS)
+    ispref_flags = weighted_stream(rng, ISPREF_FLAGS)
+    english_sources = weighted_stream(rng, ENGLISH_SOURCES)
+    translated_sources = weighted_stream(rng, TRANSLATED_SOURCES)
+    term_types = weighted_stream(rng, TERM_TYPES)
+    neuro_types = weighted_stream(rng, NEURO_TYPES)
+    other_types = weighted_stream(rng, OTHER_TYPES)
+    definition_sources = weighted_stream(rng, DEFINITION_SOURCES)
+    definitions_per_cui = weighted_stream(rng, DEFINITIONS_PER_CUI)
+    relationships = weighted_stream(rng, RELATIONSHIPS)
+    relationship_attributes = weighted_stream(rng, RELATIONSHIP_ATTRIBUTES)
+
+    counts = dict.fromkeys(RRF_FILES, 0)
+    counts['cuis'] = cui_count
+    counts['neuro_cuis'] = 0
+    atom_id = 0
+    attribute_id = 0  # ATUIs are shared by MRSTY and MRDEF rows
+    relationship_id = 0
+    extra_atoms = ATOMS_PER_CUI - 1
+    rels_per_cui = mrrel_ratio * ATOMS_PER_CUI
+
+    files = {name: open(meta_dir / name, 'w', encoding='utf-8', newline='\n') for name in RRF_FILES}
+    try:
+        buffers = {name: [] for name in RRF_FILES}
+        for i, cui_id in enumerate(ids):
+            cui = decode_cui(cui_id)
+
+            # MRSTY: CUI|TUI|STN|STY|ATUI|CVF
+            neuro = rng.random() < NEURO_CUI_FRACTION
+            types = [next(neuro_types) if neuro else next(other_types)]
+            if rng.random() < SECOND_SEMANTIC_TYPE_FRACTION:
+                second = next(other_types)
+                if second != types[0]:
+                    types.append(second)
+            counts['neuro_cuis'] += neuro
+            for tui, name in sorted(types):
+                attribute_id += 1
+                buffers['MRSTY.RRF'].append(f"{cui}|{tui}|A1.2.3|{name}|AT{attribute_id:08d}|256|\n")
+
+            # MRCONSO: CUI|LAT|TS|LUI|STT|SUI|ISPREF|AUI|SAUI|SCUI|SDUI|SAB|TTY|CODE|STR|SRL|SUPPRESS|CVF
+            for atom in range(1 + draw_count(rng, extra_atoms)):
+                atom_id += 1
+                lat = next(languages)
+                if lat == 'ENG':
+                    sab = next(english_sources)
+                    term = make_term(rng, rng.random() < NEURO_TERM_FRACTION)
+                else:
+                    sab = next(translated_sources) + lat[:3]
+                    term = f"{make_term(rng, False)} {rng.choice(ACCENTED_WORDS)}"
+                code = f"D{cui_id % 1000000:06d}" if sab.startswith('MSH') else f"{cui_id * 7 % 99999989}"
+                buffers['MRCONSO.RRF'].append(
+                    f"{cui}|{lat}|{'P' if atom == 0 else 'S'}|L{atom_id:07d}|PF|S{atom_id:07d}|"
+                    f"{next(ispref_flags)}|A{atom_id:08d}||{code}|{code}|{sab}|{next(term_types)}|"
+                    f"{code}|{term}|0|{next(suppress_flags)}|256|\n"
+                )
+
+            # MRDEF: CUI|AUI|ATUI|SATUI|SAB|DEF|SUPPRESS|CVF
+            if rng.random() < DEFINITION_CUI_FRACTION:
+                for _ in range(next(definitions_per_cui)):
+                    attribute_id += 1
+                    text = ' '.join(
+                        make_term(rng, rng.random() < NEURO_TERM_FRACTION).lower()
+                        for _ in range(rng.randint(2, 8))
+                    )
+                    flag = 'N' if rng.random() < 0.97 else 'Y'
+                    buffers['MRDEF.RRF'].append(
+                        f"{cui}|A{atom_id:08d}|AT{attribute_id:08d}||{next(definition_sources)}|"
+                        f"{text.capitalize()}.|{flag}||\n"
+                    )
+
+            # MRREL: CUI1|AUI1|STYPE1|REL|CUI2|AUI2|STYPE2|RELA|RUI|SRUI|SAB|SL|RG|DIR|SUPPRESS|CVF
+            for _ in range(draw_count(rng, rels_per_cui)):
+                relationship_id += 1
+                cui2 = decode_cui(ids[rng.randrange(cui_count)])
+                sab = next(english_sources)
+                buffers['MRREL.RRF'].append(
+                    f"{cui}|A{atom_id:08d}|SCUI|{next(relationships)}|{cui2}|A{atom_id + 1:08d}|SCUI|"
+                    f"{next(relationship_attributes)}|R{relationship_id:09d}||{sab}|{sab}|0|Y|"
+                    f"{next(suppress_flags)}||\n"
+                )
+
+            if i % 10000 == 9999 or i == cui_count - 1:
+                for name, lines in buffers.items():
+                    files[name].write(''.join(lines))
+                    counts[name] += len(lines)
+                    lines.clear()
+                if progress:
+                    progress(i + 1, cui_count)
+    finally:
+        for f in files.values():
+            f.close()
+
+    return counts
+
+
+def parse_args():
+    """Parses command-line options."""
+    parser = argparse.ArgumentParser(description="Generate a synthetic UMLS release (RRF files)")
+    parser.add_argument(
+        '--rows', type=int, default=100000,
+        help="Approximate MRCONSO rows, e.g. 10000 to 16000000 (default: 100000)"
+    )
+    parser.add_argument(
+        '--output', type=Path, required=True,
+        help="META directory to write (e.g. downloads/umls/2025AB/2025AB/META)"
+    )
+    parser.add_argument('--seed', type=int, default=0, help="Random seed (default: 0)")
+    parser.add_argument(
+        '--mrrel-ratio', type=float, default=MRREL_ROWS_PER_ATOM,
+        help=f"MRREL rows per MRCONSO row (default: {MRREL_ROWS_PER_ATOM}, as in 2025AB)"
+    )
+    return parser.parse_args()
+
+
+def main():
+    args = parse_args()
+
+    print("="*70)
+    print("SYNTHETIC UMLS RELEASE GENERATOR")
+    print("="*70)
+    print(f"\n🧪 Generating ~{args.rows:,} MRCONSO rows (seed {args.seed}) into {args.output}...")
+
+    def report_progress(done, total):
+        if done % 100000 == 0 or done == total:
+            print(f"   Generated {done:,}/{total:,} CUIs...")
+
+    counts = generate_release(
+        args.output, args.rows, seed=args.seed,
+        mrrel_ratio=args.mrrel_ratio, progress=report_progress,
+    )
+
+    print(f"\n   ✅ {counts['cuis']:,} CUIs ({counts['neuro_cuis']:,} with neuroscience semantic types)")
+    for name in RRF_FILES:
+        size = (args.output / name).stat().st_size
+        print(f"   ✅ {name}: {counts[name]:,} rows ({size / 1024 / 1024:.1f} MB)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,412 @@
+#!/usr/bin/env python3
+"""
+Incremental UMLS Release Upgrade
+
+Re-imports only what changed between two UMLS releases instead of
+re-running the whole pipeline over ~10 GB of RRF:
+
+1. Hash the new release per CUI (lib/release_snapshot.py): the MRCONSO,
+   MRDEF and MRSTY rows of each concept, and the MRREL rows touching it
+2. Diff against the previous release's snapshot
+3. Re-extract changed/added concepts from MRCONSO/MRDEF (CUI-filtered scan)
+   and patch them into the pre-deduplication concepts, then deduplicate
+4. Re-scan MRREL only for CUIs whose relationships changed (or that are new),
+   and re-map associations whose related terms changed
+5. Patch umls_neuroscience_terms.csv: unchanged rows are kept as-is (including
+   their Date Added), changed rows are re-mapped
+6. Write a change manifest and the new release snapshot
+
+Setup (once, after a full import of the current release):
+    python scripts/import_umls_delta.py --snapshot --release 2025AB
+
+Upgrade:
+    python scripts/build_umls_filter_index.py --release 2026AA
+    python scripts/import_umls_delta.py --release 2026AA
+
+Changes to filter parameters (NEURO_KEYWORDS, DOMAIN_SPECIFIC_RELA, ...)
+are not release changes: re-run the full pipeline for those.
+"""
+
+import sys
+import csv
+import json
+import argparse
+from pathlib import Path
+from datetime import datetime
+
+# Add lib to path
+sys.path.insert(0, str(Path(__file__).parent))
+
+from lib.cui_set import CUISet
+from lib.filter_index import FilterIndex
+from lib.intermediate import load_intermediate
+from lib.release_snapshot import hash_release, diff_digests, save_snapshot, load_snapshot
+
+import import_umls_neuroscience as importer
+import parse_mrrel_associations as mrrel
+import map_umls_to_schema as mapper
+
+# File paths
+IMPORTS_DIR = Path("imports/umls")
+SNAPSHOT_FILE = IMPORTS_DIR / "release_snapshot.json.gz"
+
+
+def release_hashes(meta_dir, filter_index):
+    """Hash the release's RRF rows for every CUI in the filter index."""
+    print(f"\n🔑 Hashing {meta_dir} for {len(filter_index):,} neuroscience CUIs...")
+
+    def report_progress(table):
+        print(f"   Hashing {table}...")
+
+    hashes = hash_release(meta_dir, filter_index.cui_set(), progress=report_progress)
+
+    print(f"   ✅ Hashed {len(hashes['concepts']):,} concepts, " +
+          f"{len(hashes['relationships']):,} CUIs with relationships")
+    return hashes
+
+
+def reextract_concepts(filter_index, changed_cuis, meta_dir):
+    """
+    Re-run the importer's MRCONSO and MRDEF extraction for changed CUIs only.
+
+    Returns:
+        dict: {CUI: Concept} for changed CUIs that still have a preferred term
+    """
+    print(f"\n🔍 Re-extracting {len(changed_cuis):,} changed concepts...")
+
+    concepts, stage_counts, _ = importer.scan_mrconso(
+        filter_index,
+        cui_filter=CUISet(changed_cuis),
+        mrconso_file=meta_dir / "MRCONSO.RRF",
+    )
+    concepts = {cui: concept for cui, concept in concepts.items() if concept.preferred_term}
+    for concept in concepts.values():
+        concept.compact()
+
+    print(f"   ✅ {len(concepts):,} changed concepts have preferred terms " +
+          f"({stage_counts['stage5_keyword_fail']:,} failed the keyword filter)")
+
+    return importer.parse_mrdef(concepts, mrdef_file=meta_dir / "MRDEF.RRF")
+
+
+def patch_candidates(old_candidates, reextracted, changed_cuis, order):
+    """
+    Replace changed concepts in the pre-deduplication concept set.
+
+    Concepts are put in the new release's first-seen MRCONSO order, which is
+    the order a full import would produce (deduplication keeps the first
+    occurrence, so the order matters).
+    """
+    patched = {}
+    for cui in order:
+        if cui in changed_cuis:
+            concept = reextracted.get(cui)
+        else:
+            concept = old_candidates.get(cui)
+        if concept is not None:
+            patched[cui] = concept
+    return patched
+
+
+def patch_associations(old_concepts, new_concepts, relationship_changes, meta_dir):
+    """
+    Update relationships and mapped associations for the new concept set.
+
+    A CUI's relationships are re-scanned from MRREL if its MRREL rows changed
+    or it is new to the concept set. Its associations are re-mapped if its
+    relationships were re-scanned or one of its related concepts changed
+    preferred term or ranking quality (or was added/removed).
+
+    Returns:
+        dict: {CUI: relationships} for the new concept set
+        dict: {CUI: mapped associations} for the new concept set
+        set: CUIs whose associations were re-mapped
+    """
+    new_cuis = new_concepts.keys()
+    rescan = (new_cuis - old_concepts.keys()) | (new_cuis & relationship_changes)
+
+    print(f"\n🔍 Re-scanning MRREL.RRF for {len(rescan):,} CUIs...")
+    shard, _ = mrrel.scan_mrrel(CUISet(rescan), mrrel_file=meta_dir / "MRREL.RRF")
+    rescanned = mrrel.reduce_shards([shard])
+    print(f"   ✅ Found relationships for {len(rescanned):,} CUIs")
+
+    def ranking_inputs(concepts, cui):
+        concept = concepts.get(cui)
+        if concept is None:
+            return None
+        return concept.preferred_term, mrrel.concept_quality(concept)
+
+    term_changed = {
+        cui for cui in old_concepts.keys() | new_cuis
+        if ranking_inputs(old_concepts, cui) != ranking_inputs(new_concepts, cui)
+    }
+
+    relationships = {}
+    remap = set()
+    for cui, data in mrrel.load_relationships():
+        if cui in new_cuis and cui not in rescan:
+            relationships[cui] = data
+            if not term_changed.isdisjoint(data['scores']):
+                remap.add(cui)
+    for cui, data in rescanned.items():
+        relationships[cui] = {
+            'scores': dict(data['scores']),
+            'relationships': dict(data['relationships']),
+        }
+    remap |= rescan
+
+    with open(mrrel.OUTPUT_ASSOCIATIONS, 'r', encoding='utf-8') as f:
+        old_associations = json.load(f)
+
+    concept_terms = {cui: concept.preferred_term for cui, concept in new_concepts.items()}
+    concept_qualities = {cui: mrrel.concept_quality(concept) for cui, concept in new_concepts.items()}
+    remapped = mrrel.map_cui_to_terms(
+        {cui: relationships[cui] for cui in remap if cui in relationships},
+        concept_terms, concept_qualities,
+    )
+
+    associations = {}
+    for cui in new_concepts:
+        if cui in remap:
+            if cui in remapped:
+                associations[cui] = remapped[cui]
+        elif cui in old_associations:
+            associations[cui] = old_associations[cui]
+
+    return relationships, associations, remap
+
+
+def save_associations(relationships, associations):
+    """Write the relationships and associations files in their usual formats."""
+    mrrel.save_relationships(relationships)
+
+    print(f"\n💾 Saving associations to {mrrel.OUTPUT_ASSOCIATIONS}...")
+    with open(mrrel.OUTPUT_ASSOCIATIONS, 'w', encoding='utf-8') as f:
+        json.dump(associations, f, indent=2)
+    print(f"   ✅ Saved {len(associations):,} CUI associations")
+
+
+def patch_csv(old_concepts, old_rows, new_concepts, associations, remap):
+    """
+    Write the patched CSV: rows of unchanged concepts (same concept record,
+    associations not re-mapped) are copied from the previous CSV; all other
+    rows are mapped again.
+
+    Returns:
+        dict: {'added': [...], 'removed': [...], 'updated': [...]} CUIs
+        int: Rows copied unchanged
+    """
+    print(f"\n💾 Patching {mapper.OUTPUT_CSV}...")
+
+    changes = {'added': [], 'removed': sorted(old_concepts.keys() - new_concepts.keys()), 'updated': []}
+    unchanged = 0
+
+    with open(mapper.OUTPUT_CSV, 'w', newline='', encoding='utf-8') as f:
+        writer = csv.writer(f)
+        writer.writerow(mapper.SCHEMA_COLUMNS)
+        for cui, concept in new_concepts.items():
+            old_row = old_rows.get(cui)
+            if (old_row is not None and cui not in remap
+                    and concept.to_dict() == old_concepts[cui].to_dict()):
+                writer.writerow(old_row)
+                unchanged += 1
+                continue
+
+            row = mapper.map_concept_to_row(cui, concept, associations)
+            values = [row[column] for column in mapper.SCHEMA_COLUMNS]
+            if old_row is None:
+                changes['added'].append(cui)
+            elif values[:-1] != old_row[:-1]:  # Ignore Date Added
+                changes['updated'].append(cui)
+            else:
+                values = old_row  # Re-mapped to the same content; keep its date
+                unchanged += 1
+            writer.writerow(values)
+
+    print(f"   ✅ {len(changes['added']):,} added, {len(changes['updated']):,} updated, " +
+          f"{len(changes['removed']):,} removed, {unchanged:,} unchanged rows")
+    return changes, unchanged
+
+
+def load_old_rows(old_concepts):
+    """
+    Key the previous CSV's rows by CUI (rows are in intermediate file order).
+
+    Returns:
+        dict: {CUI: row values}, or None if the CSV does not match the
+            intermediate file (e.g. it was edited), in which case every row
+            is re-mapped
+    """
+    if not mapper.OUTPUT_CSV.exists():
+        return None
+
+    with open(mapper.OUTPUT_CSV, 'r', newline='', encoding='utf-8') as f:
+        reader = csv.reader(f)
+        header = next(reader, None)
+        rows = list(reader)
+
+    if header != mapper.SCHEMA_COLUMNS or len(rows) != len(old_concepts):
+        print(f"   ⚠️  {mapper.OUTPUT_CSV} does not match the intermediate data; re-mapping all rows")
+        return None
+    return dict(zip(old_concepts, rows))
+
+
+def write_manifest(path, manifest):
+    """Write the change manifest (JSON)."""
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(manifest, f, indent=2)
+    print(f"   ✅ Wrote change manifest {path}")
+
+
+def run_snapshot(release, meta_dir):
+    """Record the current release's hashes as the baseline for the next upgrade."""
+    filter_index = open_filter_index(release)
+    hashes = release_hashes(meta_dir, filter_index)
+    save_snapshot(SNAPSHOT_FILE, release, hashes)
+    print(f"\n✅ Saved {release} snapshot to {SNAPSHOT_FILE}")
+
+
+def open_filter_index(release):
+    if not importer.FILTER_INDEX_FILE.exists():
+        print(f"❌ ERROR: {importer.FILTER_INDEX_FILE} not found")
+        print(f"   Run scripts/build_umls_filter_index.py --release {release} first")
+        sys.exit(1)
+
+    filter_index = FilterIndex(importer.FILTER_INDEX_FILE)
+    if filter_index.release != release:
+        print(f"❌ ERROR: Filter index is for UMLS {filter_index.release}, not {release}")
+        print(f"   Run scripts/build_umls_filter_index.py --release {release} first")
+        sys.exit(1)
+    return filter_index
+
+
+def run_delta(release, meta_dir):
+    started = datetime.now()
+
+    # Step 1: Load the previous release's snapshot and outputs
+    if not SNAPSHOT_FILE.exists():
+        print(f"❌ ERROR: {SNAPSHOT_FILE} not found")
+        print(f"   Run with --snapshot --release <current release> after a full import")
+        sys.exit(1)
+
+    print(f"\n📥 Loading previous release snapshot and outputs...")
+    old_snapshot = load_snapshot(SNAPSHOT_FILE)
+    old_release = old_snapshot['release']
+    if old_release == release:
+        print(f"❌ ERROR: Snapshot is already for UMLS {release}")
+        sys.exit(1)
+
+    old_candidates = load_intermediate(importer.CANDIDATES_FILE)
+    old_concepts = load_intermediate(importer.INTERMEDIATE_FILE)
+    old_rows = load_old_rows(old_concepts)
+    print(f"   ✅ UMLS {old_release}: {len(old_candidates):,} candidate concepts, " +
+          f"{len(old_concepts):,} terms")
+
+    # Step 2: Hash the new release and diff
+    filter_index = open_filter_index(release)
+    hashes = release_hashes(meta_dir, filter_index)
+
+    concepts_added, concepts_removed, concepts_changed = diff_digests(
+        old_snapshot['concepts'], hashes['concepts'])
+    rels_added, rels_removed, rels_changed = diff_digests(
+        old_snapshot['relationships'], hashes['relationships'])
+
+    print(f"\n📊 Changes {old_release} → {release}:")
+    print(f"   Concepts: {len(concepts_added):,} added, {len(concepts_changed):,} changed, " +
+          f"{len(concepts_removed):,} removed")
+    print(f"   Relationships: {len(rels_added):,} added, {len(rels_changed):,} changed, " +
+          f"{len(rels_removed):,} removed")
+
+    # Step 3: Re-extract changed concepts, patch, deduplicate
+    changed_cuis = concepts_added | concepts_changed | concepts_removed
+    reextracted = reextract_concepts(filter_index, concepts_added | concepts_changed, meta_dir)
+    candidates = patch_candidates(old_candidates, reextracted, changed_cuis, hashes['order'])
+    importer.save_candidates(candidates)
+
+    new_concepts = importer.deduplicate_by_term(candidates)
+    importer.save_intermediate(new_concepts)
+
+    # Step 4: Relationships and associations
+    relationships, associations, remap = patch_associations(
+        old_concepts, new_concepts, rels_added | rels_changed | rels_removed, meta_dir)
+    save_associations(relationships, associations)
+
+    # Step 5: Patch CSV
+    csv_changes, unchanged_rows = patch_csv(
+        old_concepts, old_rows or {}, new_concepts, associations, remap)
+
+    # Step 6: Manifest and snapshot
+    manifest_file = IMPORTS_DIR / f"delta_manifest_{old_release}_{release}.json"
+    print(f"\n💾 Writing change manifest and {release} snapshot...")
+    write_manifest(manifest_file, {
+        'from_release': old_release,
+        'to_release': release,
+        'generated': started.isoformat(timespec='seconds'),
+        'duration_seconds': round((datetime.now() - started).total_seconds(), 1),
+        'concepts': {
+            'added': sorted(concepts_added),
+            'changed': sorted(concepts_changed),
+            'removed': sorted(concepts_removed),
+        },
+        'relationships': {
+            'added': sorted(rels_added),
+            'changed': sorted(rels_changed),
+            'removed': sorted(rels_removed),
+        },
+        'associations_remapped': len(remap),
+        'csv': {
+            'rows_added': csv_changes['added'],
+            'rows_updated': csv_changes['updated'],
+            'rows_removed': csv_changes['removed'],
+            'rows_unchanged': unchanged_rows,
+        },
+    })
+    save_snapshot(SNAPSHOT_FILE, release, hashes)
+    print(f"   ✅ Saved {release} snapshot to {SNAPSHOT_FILE}")
+
+    # Summary
+    print("\n" + "="*70)
+    print(f"DELTA IMPORT COMPLETE: {old_release} → {release}")
+    print("="*70)
+    print(f"\n✅ Terms: {len(new_concepts):,} " +
+          f"(+{len(csv_changes['added']):,} / ~{len(csv_changes['updated']):,} / " +
+          f"-{len(csv_changes['removed']):,})")
+    print(f"✅ Output: {mapper.OUTPUT_CSV}")
+    print(f"✅ Manifest: {manifest_file}")
+    print(f"\n⚠️  {mrrel.OUTPUT_PROFILE}, {mrrel.OUTPUT_GRAPH} and {mrrel.OUTPUT_HIERARCHY} "
+          f"are not updated by delta imports")
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Incremental UMLS release upgrade")
+    parser.add_argument(
+        '--release', required=True,
+        help="UMLS release to import (e.g. 2026AA)"
+    )
+    parser.add_argument(
+        '--meta-dir', type=Path,
+        help="META directory of the release (default: downloads/umls/<release>/<release>/META)"
+    )
+    parser.add_argument(
+        '--snapshot', action='store_true',
+        help="Only record the release's hashes as the baseline (after a full import)"
+    )
+    return parser.parse_args()
+
+
+def main():
+    args = parse_args()
+    meta_dir = args.meta_dir or Path(f"downloads/umls/{args.release}/{args.release}/META")
+
+    print("="*70)
+    print("UMLS INCREMENTAL RELEASE IMPORT")
+    print("="*70)
+
+    if args.snapshot:
+        run_snapshot(args.release, meta_dir)
+    else:
+        run_delta(args.release, meta_dir)
+
+
+if __name__ == "__main__":
+    main()
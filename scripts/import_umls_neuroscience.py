@@ -19,24 +19,48 @@ Filtering stages (DEC-002 Option B):
 - Stage 4: Preferred term filter (ISPREF=Y or TTY=PN)
 - Stage 5: Keyword filter (for broad semantic types)
 
+MRCONSO.RRF and MRDEF.RRF are sorted by CUI, so steps 2-3 run as one
+merge-join pass (lib/merge_join.py): each concept is finished, written to the
+candidates file and deduplicated as soon as the scan moves past its CUI,
+instead of loading every concept first. Files that are not sorted by CUI
+fall back to the in-memory import (also --in-memory); output is identical.
+
+With --atom-features, an extra MRCONSO scan records the per-atom inputs of
+stages 3-5 (lib/atom_features.py), so simulate_filters.py can try other
+filter settings without re-scanning.
+
 Expected output: 150K-250K neuroscience terms
 """
 
+import os
 import sys
 import csv
-import json
+import argparse
+import multiprocessing
 from pathlib import Path
-from collections import defaultdict, Counter
+from collections import Counter
 
 # Add lib to path
 sys.path.insert(0, str(Path(__file__).parent))
 
+from lib.atom_features import build_atom_features
+from lib.concept import Concept
+from lib.cui_set import CUISet
+from lib.filter_index import FilterIndex
+from lib.intermediate import IntermediateWriter, read_intermediate_at
+from lib.keyword_matcher import KeywordMatcher
+from lib.merge_join import group_by_cui, merge_join, UnsortedRRFError
+from lib.prefetch import ordered_imap, TASKS_PER_WORKER
+from lib.rrf_reader import RRFReader, input_size, read_rows_at, split_byte_ranges
+from lib.sampling import add_sample_argument, enter_sample
+from lib.telemetry import Telemetry, StageMetrics
+
 # File paths
 UMLS_META_DIR = Path("downloads/umls/2025AB/2025AB/META")
 IMPORTS_DIR = Path("imports/umls")
 
 # Input files
-NEUROSCIENCE_CUIS_FILE = IMPORTS_DIR / "neuroscience_cuis.txt"
+FILTER_INDEX_FILE = IMPORTS_DIR / "neuroscience_cuis.idx"
 FILTER_STATS_FILE = IMPORTS_DIR / "filter_statistics.json"
 MRCONSO_FILE = UMLS_META_DIR / "MRCONSO.RRF"
 MRDEF_FILE = UMLS_META_DIR / "MRDEF.RRF"
@@ -44,7 +68,21 @@ MRREL_FILE = UMLS_META_DIR / "MRREL.RRF"
 
 # Output files
 OUTPUT_CSV = IMPORTS_DIR / "umls_neuroscience_imported.csv"
-INTERMEDIATE_JSON = IMPORTS_DIR / "umls_concepts_intermediate.json"
+INTERMEDIATE_FILE = IMPORTS_DIR / "umls_concepts_intermediate.jsonl"
+CANDIDATES_FILE = IMPORTS_DIR / "umls_concepts_candidates.jsonl"
+ATOM_FEATURES_DIR = IMPORTS_DIR / "atom_features"
+
+# Byte-range chunks per worker process for parallel MRCONSO parsing
+CHUNKS_PER_WORKER = 4
+
+# Definition sources in priority order (MRDEF SAB); unlisted sources rank last
+DEFINITION_SOURCE_PRIORITY = ['MSH', 'SNOMEDCT_US', 'NCI', 'NCBI', 'HPO', 'OMIM']
+DEFINITION_SOURCE_RANK = {sab: rank for rank, sab in enumerate(DEFINITION_SOURCE_PRIORITY)}
+UNRANKED_DEFINITION_SOURCE = len(DEFINITION_SOURCE_PRIORITY)
+
+# MRCONSO term types collected as synonyms / abbreviations
+SYNONYM_TTYS = frozenset({'SY', 'FN', 'MTH_FN'})
+ABBREVIATION_TTYS = frozenset({'AB', 'ACR'})
 
 # Broad semantic types requiring keyword filter (DEC-002)
 BROAD_SEMANTIC_TYPES = {
@@ -69,75 +107,39 @@ NEURO_KEYWORDS = [
     'hippocampus', 'amygdala', 'thalamus', 'hypothalamus', 'cerebellum'
 ]
 
-def load_neuroscience_cuis():
-    """Load pre-filtered neuroscience CUIs."""
-    print(f"\n📥 Loading neuroscience CUIs from {NEUROSCIENCE_CUIS_FILE}...")
-
-    if not NEUROSCIENCE_CUIS_FILE.exists():
-        print(f"❌ ERROR: {NEUROSCIENCE_CUIS_FILE} not found")
-        print(f"   Run scripts/build_umls_filter_index.py first")
-        sys.exit(1)
-
-    cuis = set()
-    with open(NEUROSCIENCE_CUIS_FILE, 'r') as f:
-        for line in f:
-            cui = line.strip()
-            if cui:
-                cuis.add(cui)
-
-    print(f"   ✅ Loaded {len(cuis):,} neuroscience CUIs")
-    return cuis
+# Compiled once; scans each term in a single pass for all keywords
+NEURO_KEYWORD_MATCHER = KeywordMatcher(NEURO_KEYWORDS)
 
+def load_filter_index():
+    """
+    Open the pre-built neuroscience filter index.
 
-def load_cui_semantic_types():
-    """Load semantic type mapping to identify broad types needing keyword filter."""
-    print(f"\n📥 Loading CUI semantic type mappings...")
+    The index is memory-mapped, so loading it costs no parsing. It provides
+    both the CUI filter (Stage 1) and each CUI's semantic types, which
+    identify broad types needing the keyword filter (Stage 5).
+    """
+    print(f"\n📥 Loading neuroscience filter index from {FILTER_INDEX_FILE}...")
 
-    # Parse MRSTY.RRF to build CUI → semantic types mapping
-    mrsty_file = UMLS_META_DIR / "MRSTY.RRF"
-    cui_types = defaultdict(set)
+    if not FILTER_INDEX_FILE.exists():
+        print(f"❌ ERROR: {FILTER_INDEX_FILE} not found")
+        print(f"   Run scripts/build_umls_filter_index.py first")
+        sys.exit(1)
 
-    with open(mrsty_file, 'r', encoding='utf-8') as f:
-        for line in f:
-            cols = line.strip().split('|')
-            if len(cols) >= 4:
-                cui = cols[0]
-                semantic_type = cols[3]  # Semantic type name
-                cui_types[cui].add(semantic_type)
+    filter_index = FilterIndex(FILTER_INDEX_FILE)
 
-    print(f"   ✅ Loaded semantic types for {len(cui_types):,} CUIs")
-    return cui_types
+    print(f"   ✅ Loaded {len(filter_index):,} neuroscience CUIs " +
+          f"(UMLS {filter_index.release}, {len(filter_index.tui_table)} semantic types)")
+    return filter_index
 
 
 def contains_neuro_keyword(term_string):
     """Check if term contains any neuroscience keyword."""
-    term_lower = term_string.lower()
-    return any(keyword in term_lower for keyword in NEURO_KEYWORDS)
-
-
-def parse_mrconso(neuro_cuis, cui_semantic_types):
-    """
-    Parse MRCONSO.RRF to extract terms, synonyms, abbreviations.
-
-    MRCONSO.RRF format (18 columns, pipe-delimited):
-    CUI|LAT|TS|LUI|STT|SUI|ISPREF|AUI|SAUI|SCUI|SDUI|SAB|TTY|CODE|STR|SRL|SUPPRESS|CVF
-
-    Returns:
-        dict: {CUI: {preferred_term, synonyms[], abbreviations[], mesh_code, sources[]}}
-    """
-    print(f"\n🔍 Parsing MRCONSO.RRF (2.1 GB, ~16M rows)...")
-    print(f"   Applying multi-stage filters (DEC-002 Option B)...")
+    return NEURO_KEYWORD_MATCHER.search(term_string)
 
-    concepts = defaultdict(lambda: {
-        'preferred_term': None,
-        'synonyms': [],
-        'abbreviations': [],
-        'mesh_code': None,
-        'sources': set()
-    })
 
-    # Filter stage counters
-    stage_counts = {
+def new_stage_counts():
+    """Filter stage counters for an MRCONSO scan."""
+    return {
         'total_rows': 0,
         'stage1_cui_match': 0,
         'stage2_english': 0,
@@ -147,78 +149,169 @@ def parse_mrconso(neuro_cuis, cui_semantic_types):
         'stage5_keyword_fail': 0
     }
 
-    with open(MRCONSO_FILE, 'r', encoding='utf-8') as f:
-        for line in f:
-            stage_counts['total_rows'] += 1
-
-            cols = line.strip().split('|')
-            if len(cols) < 18:
-                continue
-
-            cui = cols[0]
-            lat = cols[1]  # Language
-            ispref = cols[6]  # Preferred flag
-            sab = cols[11]  # Source abbreviation
-            tty = cols[12]  # Term type
-            code = cols[13]  # Source code
-            term_str = cols[14]  # The actual term string
-            suppress = cols[16]  # Suppression flag
-
-            # Stage 1: CUI filter (1M neuroscience CUIs)
-            if cui not in neuro_cuis:
-                continue
-            stage_counts['stage1_cui_match'] += 1
-
-            # Stage 2: Language filter (English only)
-            if lat != 'ENG':
-                continue
-            stage_counts['stage2_english'] += 1
-
-            # Stage 3: Suppression filter (not suppressed/obsolete)
-            if suppress != 'N':
-                continue
-            stage_counts['stage3_not_suppressed'] += 1
 
+def iter_mrconso(filter_index, stage_counts, keyword_hits, byte_range=None, progress=None,
+                 cui_filter=None, mrconso_file=MRCONSO_FILE):
+    """
+    Scan MRCONSO.RRF (or one byte range of it), yielding a partial concept
+    record for each run of consecutive rows with the same CUI. MRCONSO is
+    sorted by CUI, so each run is normally a whole concept.
+
+    Args:
+        filter_index (FilterIndex): Neuroscience CUI filter and semantic types
+        stage_counts (dict): new_stage_counts(), updated in place
+        keyword_hits (Counter): Stage 5 hits per keyword, updated in place
+        progress (callable): Optional progress(reader, concepts yielded so far)
+
+    Yields:
+        tuple: (CUI, Concept)
+    """
+    broad_type_mask = filter_index.type_mask(BROAD_SEMANTIC_TYPES)
+    yielded = 0
+
+    def report_progress(reader):
+        progress(reader, yielded)
+
+    # Stages 1-3 are pushed down into the reader:
+    # Stage 1: CUI filter (1M neuroscience CUIs)
+    # Stage 2: Language filter (English only)
+    # Stage 3: Suppression filter (not suppressed/obsolete)
+    reader = RRFReader(
+        mrconso_file,
+        columns=('CUI', 'ISPREF', 'SAB', 'TTY', 'CODE', 'STR'),
+        cui_filter=cui_filter if cui_filter is not None else filter_index.cui_set(),
+        where={'LAT': 'ENG', 'SUPPRESS': 'N'},
+        byte_range=byte_range,
+        progress=report_progress if progress else None,
+    )
+
+    for cui, rows in group_by_cui(reader, strict=False):
+        concept = Concept()
+        for _, ispref, sab, tty, code, term_str in rows:
             # Track source vocabularies
-            concepts[cui]['sources'].add(sab)
+            concept.add_source(sab)
 
             # Extract MeSH code if from MeSH source
-            if sab == 'MSH' and not concepts[cui]['mesh_code']:
-                concepts[cui]['mesh_code'] = code
+            if sab == 'MSH' and not concept.mesh_code:
+                concept.mesh_code = code
 
             # Stage 4: Preferred term extraction
             if ispref == 'Y' or tty == 'PN':
                 stage_counts['stage4_preferred'] += 1
 
                 # Stage 5: Keyword filter for broad semantic types
-                cui_types = cui_semantic_types.get(cui, set())
-                needs_keyword_filter = bool(BROAD_SEMANTIC_TYPES & cui_types)
+                needs_keyword_filter = bool(filter_index.mask(cui) & broad_type_mask)
 
                 if needs_keyword_filter:
-                    if not contains_neuro_keyword(term_str):
+                    matched_keywords = NEURO_KEYWORD_MATCHER.matches(term_str)
+                    if not matched_keywords:
                         stage_counts['stage5_keyword_fail'] += 1
                         continue  # Skip non-neuro terms from broad types
                     stage_counts['stage5_keyword_pass'] += 1
+                    keyword_hits.update(matched_keywords)
 
                 # Store preferred term (only if not already set)
-                if not concepts[cui]['preferred_term']:
-                    concepts[cui]['preferred_term'] = term_str
+                if not concept.preferred_term:
+                    concept.preferred_term = term_str
 
             # Extract synonyms
-            elif tty in ['SY', 'FN', 'MTH_FN']:
-                if term_str and term_str not in concepts[cui]['synonyms']:
-                    concepts[cui]['synonyms'].append(term_str)
+            elif tty in SYNONYM_TTYS:
+                if term_str:
+                    concept.add_synonym(term_str)
 
             # Extract abbreviations
-            elif tty in ['AB', 'ACR']:
-                if term_str and term_str not in concepts[cui]['abbreviations']:
-                    concepts[cui]['abbreviations'].append(term_str)
+            elif tty in ABBREVIATION_TTYS:
+                if term_str:
+                    concept.add_abbreviation(term_str)
+
+        yielded += 1
+        yield cui, concept
+
+    stage_counts['total_rows'] += reader.counts['rows']
+    stage_counts['stage1_cui_match'] += reader.counts['cui_match']
+    stage_counts['stage2_english'] += reader.counts['LAT']
+    stage_counts['stage3_not_suppressed'] += reader.counts['SUPPRESS']
+
+
+def scan_mrconso(filter_index, byte_range=None, progress=None,
+                 cui_filter=None, mrconso_file=MRCONSO_FILE):
+    """
+    Scan MRCONSO.RRF (or one byte range of it) into partial concept records.
+
+    Used once per chunk by the parallel path, by the in-memory import, and
+    by import_umls_delta.py with `cui_filter` restricted to changed CUIs.
+    Works on unsorted files too: repeated runs of a CUI are merged.
+
+    Returns:
+        dict: {CUI: Concept} in first-seen order
+        dict: Filter stage counters for the scanned rows
+        Counter: Stage 5 hits per keyword (terms that passed the keyword filter)
+    """
+    concepts = {}
+    stage_counts = new_stage_counts()
+    keyword_hits = Counter()
+
+    def report_progress(reader, _):
+        progress(reader, len(concepts))
 
-            # Progress indicator
-            if stage_counts['total_rows'] % 1000000 == 0:
-                print(f"   Processed {stage_counts['total_rows']:,} rows, " +
-                      f"{len(concepts):,} concepts with data...")
+    for cui, concept in iter_mrconso(
+        filter_index, stage_counts, keyword_hits,
+        byte_range=byte_range, progress=report_progress if progress else None,
+        cui_filter=cui_filter, mrconso_file=mrconso_file,
+    ):
+        merge_concepts(concepts, {cui: concept})
 
+    return concepts, stage_counts, keyword_hits
+
+
+def merge_concepts(concepts, partial):
+    """
+    Merge a later chunk's partial concept records into `concepts` in place.
+
+    Applying chunks in file order reproduces the serial scan exactly (see
+    Concept.merge); new CUIs are appended in first-seen order.
+    """
+    for cui, concept in partial.items():
+        merged = concepts.get(cui)
+        if merged is None:
+            concepts[cui] = concept
+        else:
+            merged.merge(concept)
+
+
+# Filter index shared with MRCONSO worker processes (set by init_mrconso_worker)
+_worker_filters = {}
+
+
+def init_mrconso_worker(filter_index):
+    """Process pool initializer: keep the filter index per worker."""
+    _worker_filters['filter_index'] = filter_index
+
+
+def scan_mrconso_chunk(byte_range):
+    """Process pool task: scan one MRCONSO byte range."""
+    return scan_mrconso(_worker_filters['filter_index'], byte_range=byte_range)
+
+
+def print_keyword_hits(keyword_hits):
+    """
+    Print Stage 5 hits per keyword (a term matching several keywords counts
+    for each), most frequent first, followed by keywords that never matched.
+    """
+    if not keyword_hits:
+        return
+
+    print(f"         Hits per keyword:")
+    for keyword, hits in sorted(keyword_hits.items(), key=lambda item: (-item[1], item[0])):
+        print(f"            {keyword:<15} {hits:,}")
+
+    unused = [k for k in NEURO_KEYWORD_MATCHER.keywords if k not in keyword_hits]
+    if unused:
+        print(f"         Keywords with no hits: {', '.join(unused)}")
+
+
+def print_stage_results(stage_counts, keyword_hits):
+    """Print the MRCONSO filter stage counters."""
     print(f"\n   ✅ Parsing complete!")
     print(f"\n   📊 Filter Stage Results:")
     print(f"      Total rows processed: {stage_counts['total_rows']:,}")
@@ -229,192 +322,571 @@ def parse_mrconso(neuro_cuis, cui_semantic_types):
     print(f"      Stage 5 (Keyword filter):")
     print(f"         Passed: {stage_counts['stage5_keyword_pass']:,}")
     print(f"         Failed: {stage_counts['stage5_keyword_fail']:,}")
+    print_keyword_hits(keyword_hits)
+
+
+def parse_mrconso(filter_index, workers=1, metrics=None):
+    """
+    Parse MRCONSO.RRF to extract terms, synonyms, abbreviations.
+
+    MRCONSO.RRF format (18 columns, pipe-delimited):
+    CUI|LAT|TS|LUI|STT|SUI|ISPREF|AUI|SAUI|SCUI|SDUI|SAB|TTY|CODE|STR|SRL|SUPPRESS|CVF
+
+    With workers > 1, the file is split into newline-aligned byte ranges that
+    are filtered in a process pool, then merged back in file order so the
+    result is identical to the serial scan.
+
+    Returns:
+        dict: {CUI: Concept} (compacted)
+    """
+    print(f"\n🔍 Parsing MRCONSO.RRF (2.1 GB, ~16M rows)...")
+    print(f"   Applying multi-stage filters (DEC-002 Option B)...")
+    metrics = metrics or StageMetrics('parse_mrconso')
+    metrics.total_bytes = input_size(MRCONSO_FILE)
+
+    if workers > 1:
+        # Several chunks per worker keeps the pool busy when chunks are uneven
+        byte_ranges = split_byte_ranges(MRCONSO_FILE, workers * CHUNKS_PER_WORKER)
+        print(f"   Scanning {len(byte_ranges)} chunks with {workers} worker processes...")
+
+        concepts = {}
+        stage_counts = Counter()
+        keyword_hits = Counter()
+        with multiprocessing.Pool(
+            workers,
+            initializer=init_mrconso_worker,
+            initargs=(filter_index,),
+        ) as pool:
+            for i, (partial, chunk_counts, chunk_hits) in enumerate(
+                ordered_imap(pool, scan_mrconso_chunk, byte_ranges, TASKS_PER_WORKER * workers), 1
+            ):
+                merge_concepts(concepts, partial)
+                stage_counts.update(chunk_counts)
+                keyword_hits.update(chunk_hits)
+                # Chunks complete in file order, so the last one done marks the offset reached
+                metrics.advance(stage_counts['total_rows'], byte_ranges[i - 1][1])
+                print(f"   Chunk {i}/{len(byte_ranges)}: " +
+                      f"{stage_counts['total_rows']:,} rows, " +
+                      f"{len(concepts):,} concepts with data..." + metrics.eta())
+    else:
+        def report_progress(reader, concept_count):
+            print(f"   Processed {reader.rows_read:,} rows, " +
+                  f"{concept_count:,} concepts with data..." + metrics.track(reader))
+
+        concepts, stage_counts, keyword_hits = scan_mrconso(
+            filter_index, progress=report_progress
+        )
+
+    metrics.advance(stage_counts['total_rows'], metrics.total_bytes)
+    metrics.count(stage_counts)
+    print_stage_results(stage_counts, keyword_hits)
 
     # Filter to concepts with preferred terms
     concepts_with_terms = {
-        cui: data for cui, data in concepts.items()
-        if data['preferred_term']
+        cui: concept for cui, concept in concepts.items()
+        if concept.preferred_term
     }
+    for concept in concepts_with_terms.values():
+        concept.compact()
 
     print(f"\n   ✅ Extracted {len(concepts_with_terms):,} concepts with preferred terms")
     return dict(concepts_with_terms)
 
 
-def parse_mrdef(concepts):
+def replaces_definition(best, rank):
+    """
+    MRDEF row selection: a row replaces the CUI's current best row if there
+    is none yet, if the best has no text, or if the row's source ranks
+    higher in DEFINITION_SOURCE_PRIORITY.
+
+    Args:
+        best (tuple): (rank, has_text, ...) of the current best row, or None
+        rank (int): The row's source rank
+    """
+    return best is None or not best[1] or rank < best[0]
+
+
+def parse_mrdef(concepts, mrdef_file=MRDEF_FILE, metrics=None):
     """
     Parse MRDEF.RRF to add definitions.
 
     MRDEF.RRF format (8 columns):
     CUI|AUI|ATUI|SATUI|SAB|DEF|SUPPRESS|CVF
+
+    The scan keeps only (rank, byte offset) of the best definition row per
+    CUI, so memory does not grow with the number of definitions per CUI.
+    The winning rows are then re-read by offset.
     """
     print(f"\n📖 Parsing MRDEF.RRF for definitions...")
 
-    # Priority order for definition sources
-    SOURCE_PRIORITY = ['MSH', 'SNOMEDCT_US', 'NCI', 'NCBI', 'HPO', 'OMIM']
-
-    def_counts = 0
-
-    with open(MRDEF_FILE, 'r', encoding='utf-8') as f:
-        for line in f:
-            cols = line.strip().split('|')
-            if len(cols) < 8:
-                continue
-
-            cui = cols[0]
-            sab = cols[4]  # Source
-            definition = cols[5]
-            suppress = cols[6]
-
-            # Only process CUIs we have
-            if cui not in concepts:
-                continue
-
-            # Skip suppressed
-            if suppress != 'N':
-                continue
-
-            # Check if we should update definition
-            existing_def = concepts[cui].get('definition')
-            existing_source = concepts[cui].get('definition_source', '')
-
-            # Update if no definition, or better source
-            should_update = False
-            if not existing_def:
-                should_update = True
-            elif sab in SOURCE_PRIORITY:
-                if existing_source not in SOURCE_PRIORITY:
-                    should_update = True
-                elif SOURCE_PRIORITY.index(sab) < SOURCE_PRIORITY.index(existing_source):
-                    should_update = True
-
-            if should_update:
-                concepts[cui]['definition'] = definition
-                concepts[cui]['definition_source'] = sab
-                def_counts += 1
+    # Pass 1: pick the best definition row per CUI (see replaces_definition)
+    best_rows = {}  # {CUI: (rank, has_text, offset)}
+
+    # Only process CUIs we have, skip suppressed
+    reader = RRFReader(
+        mrdef_file,
+        columns=('CUI', 'SAB', 'DEF'),
+        cui_filter=CUISet(concepts),
+        where={'SUPPRESS': 'N'},
+        row_offsets=True,
+    )
+
+    for offset, cui, sab, definition in reader:
+        rank = DEFINITION_SOURCE_RANK.get(sab, UNRANKED_DEFINITION_SOURCE)
+        if replaces_definition(best_rows.get(cui), rank):
+            best_rows[cui] = (rank, bool(definition), offset)
+    if metrics:
+        metrics.track(reader)
+
+    # Pass 2: seek-read only the winning rows
+    offset_cuis = {offset: cui for cui, (_, _, offset) in best_rows.items()}
+    for offset, (sab, definition) in read_rows_at(mrdef_file, offset_cuis, ('SAB', 'DEF')):
+        concept = concepts[offset_cuis[offset]]
+        concept.definition = definition
+        concept.definition_source = sab
 
     # Count concepts with definitions
-    with_defs = sum(1 for c in concepts.values() if c.get('definition'))
+    with_defs = sum(1 for c in concepts.values() if c.definition)
     coverage = (with_defs / len(concepts) * 100) if concepts else 0
 
     print(f"   ✅ Added definitions to {with_defs:,} concepts ({coverage:.1f}% coverage)")
+    if metrics:
+        metrics.count({
+            'definition_rows': reader.counts['SUPPRESS'],
+            'rows_reread': len(offset_cuis),
+            'with_definitions': with_defs,
+        })
     return concepts
 
 
-def deduplicate_by_term(concepts):
+def stream_mrconso(filter_index, stage_counts, keyword_hits, workers=1, metrics=None):
     """
-    Deduplicate concepts by preferred term (case-insensitive).
-    Keep first occurrence, prioritize MSH source.
+    Yields MRCONSO concepts in file (CUI) order, each one as soon as the
+    scan has moved past its rows.
+
+    With workers > 1, byte ranges are scanned in a process pool as in
+    parse_mrconso(); a concept split across a chunk boundary is merged with
+    its continuation before it is yielded. Memory is then bounded by the
+    chunks in flight instead of one concept.
+
+    Yields:
+        tuple: (CUI, Concept), not yet compacted
     """
-    print(f"\n🔄 Deduplicating by term name...")
+    if workers <= 1:
+        def report_progress(reader, concept_count):
+            print(f"   Processed {reader.rows_read:,} rows, " +
+                  f"{concept_count:,} concepts with data..." + metrics.track(reader))
+
+        yield from iter_mrconso(filter_index, stage_counts, keyword_hits, progress=report_progress)
+        return
+
+    # Several chunks per worker keeps the pool busy when chunks are uneven
+    byte_ranges = split_byte_ranges(MRCONSO_FILE, workers * CHUNKS_PER_WORKER)
+    print(f"   Scanning {len(byte_ranges)} chunks with {workers} worker processes...")
+
+    pending = None
+    yielded = 0
+    with multiprocessing.Pool(
+        workers,
+        initializer=init_mrconso_worker,
+        initargs=(filter_index,),
+    ) as pool:
+        for i, (partial, chunk_counts, chunk_hits) in enumerate(
+            ordered_imap(pool, scan_mrconso_chunk, byte_ranges, TASKS_PER_WORKER * workers), 1
+        ):
+            for name, count in chunk_counts.items():
+                stage_counts[name] += count
+            keyword_hits.update(chunk_hits)
+            for cui, concept in partial.items():
+                if pending is not None:
+                    if pending[0] == cui:
+                        pending[1].merge(concept)
+                        continue
+                    yield pending
+                    yielded += 1
+                pending = (cui, concept)
+            # Chunks complete in file order, so the last one done marks the offset reached
+            metrics.advance(stage_counts['total_rows'], byte_ranges[i - 1][1])
+            print(f"   Chunk {i}/{len(byte_ranges)}: " +
+                  f"{stage_counts['total_rows']:,} rows, " +
+                  f"{yielded:,} concepts with data..." + metrics.eta())
+    if pending is not None:
+        yield pending
+
+
+def iter_definitions(cui_filter, counts, mrdef_file=MRDEF_FILE):
+    """
+    Streams each CUI's best definition from MRDEF.RRF (sorted by CUI), with
+    the same row selection as parse_mrdef().
 
-    unique_terms = {}
-    duplicates_removed = 0
+    Args:
+        cui_filter (CUISet): CUIs to read definitions for
+        counts (dict): Receives 'definition_rows' once the scan is done
 
-    for cui, data in concepts.items():
-        term = data.get('preferred_term', '')
-        if not term:
+    Yields:
+        tuple: (CUI, (SAB, definition))
+
+    Raises:
+        UnsortedRRFError: If MRDEF.RRF is not sorted by CUI
+    """
+    reader = RRFReader(
+        mrdef_file,
+        columns=('CUI', 'SAB', 'DEF'),
+        cui_filter=cui_filter,
+        where={'SUPPRESS': 'N'},
+    )
+    for cui, rows in group_by_cui(reader):
+        best = None
+        for _, sab, definition in rows:
+            rank = DEFINITION_SOURCE_RANK.get(sab, UNRANKED_DEFINITION_SOURCE)
+            if replaces_definition(best, rank):
+                best = (rank, bool(definition), sab, definition)
+        yield cui, best[2:]
+    counts['definition_rows'] = reader.counts['SUPPRESS']
+
+
+def iter_concepts(filter_index, workers=1, metrics=None):
+    """
+    Merge-joins MRCONSO.RRF and MRDEF.RRF, which UMLS sorts by CUI, into
+    finished concepts, one at a time (lib/merge_join.py). Gives the same
+    concepts, in the same order, as parse_mrconso() + parse_mrdef(), without
+    holding them all in memory.
+
+    Yields:
+        tuple: (CUI, Concept) for concepts with a preferred term, compacted,
+            with their definition
+
+    Raises:
+        UnsortedRRFError: If either file is not sorted by CUI
+    """
+    print(f"\n🔍 Merge-joining MRCONSO.RRF (2.1 GB, ~16M rows) and MRDEF.RRF by CUI...")
+    print(f"   Applying multi-stage filters (DEC-002 Option B)...")
+    metrics = metrics or StageMetrics('merge_join_concepts')
+    metrics.total_bytes = input_size(MRCONSO_FILE)
+
+    stage_counts = new_stage_counts()
+    keyword_hits = Counter()
+    definition_counts = {}
+    concepts = stream_mrconso(filter_index, stage_counts, keyword_hits, workers, metrics)
+    definitions = iter_definitions(filter_index.cui_set(), definition_counts)
+
+    extracted = 0
+    with_defs = 0
+    for cui, (concept, definition) in merge_join(concepts, definitions):
+        # Filter to concepts with preferred terms
+        if concept is None or not concept.preferred_term:
             continue
+        concept.compact()
+        if definition is not None:
+            concept.definition_source, concept.definition = definition
+            if concept.definition:
+                with_defs += 1
+        extracted += 1
+        yield cui, concept
+
+    metrics.advance(stage_counts['total_rows'], metrics.total_bytes)
+    metrics.count(stage_counts)
+    print_stage_results(stage_counts, keyword_hits)
+    print(f"\n   ✅ Extracted {extracted:,} concepts with preferred terms")
+
+    coverage = (with_defs / extracted * 100) if extracted else 0
+    print(f"   ✅ Added definitions to {with_defs:,} concepts ({coverage:.1f}% coverage)")
+    metrics.count({
+        'definition_rows': definition_counts.get('definition_rows', 0),
+        'with_definitions': with_defs,
+    })
+
+
+class TermDeduplicator:
+    """
+    Deduplicates concepts by preferred term (case-insensitive) as they
+    stream past: the first occurrence of a term is kept, unless a later
+    one has a MeSH source (or a SNOMED CT source, where neither has MeSH).
+
+    Only the term key, the winner's CUI, its two source flags and a
+    caller-chosen reference (the Concept itself, or its offset in the
+    candidates file) are kept per term.
+    """
+
+    def __init__(self):
+        self.unique_terms = {}  # {term key: (CUI, has MSH, has SNOMEDCT_US, reference)}
+        self.duplicates_removed = 0
+
+    def add(self, cui, concept, reference):
+        term = concept.preferred_term
+        if not term:
+            return
 
         term_key = term.lower().strip()
+        has_msh = concept.has_source('MSH')
+        has_snomed = concept.has_source('SNOMEDCT_US')
+        existing = self.unique_terms.get(term_key)
 
-        if term_key not in unique_terms:
-            unique_terms[term_key] = (cui, data)
+        if existing is None:
+            self.unique_terms[term_key] = (cui, has_msh, has_snomed, reference)
         else:
             # Duplicate found - keep one with MSH source if possible
-            existing_cui, existing_data = unique_terms[term_key]
-            existing_sources = existing_data.get('sources', set())
-            new_sources = data.get('sources', set())
+            _, existing_msh, existing_snomed, _ = existing
+
+            if has_msh and not existing_msh:
+                self.unique_terms[term_key] = (cui, has_msh, has_snomed, reference)
+            elif has_snomed and not (existing_msh or existing_snomed):
+                self.unique_terms[term_key] = (cui, has_msh, has_snomed, reference)
 
-            if 'MSH' in new_sources and 'MSH' not in existing_sources:
-                unique_terms[term_key] = (cui, data)
-            elif 'SNOMEDCT_US' in new_sources and not ('MSH' in existing_sources or 'SNOMEDCT_US' in existing_sources):
-                unique_terms[term_key] = (cui, data)
+            self.duplicates_removed += 1
 
-            duplicates_removed += 1
+    def winners(self):
+        """(CUI, reference) of each kept concept, in first-occurrence order of its term."""
+        return [(cui, reference) for cui, _, _, reference in self.unique_terms.values()]
+
+
+def deduplicate_by_term(concepts):
+    """
+    Deduplicate concepts by preferred term (case-insensitive).
+    Keep first occurrence, prioritize MSH source.
+    """
+    print(f"\n🔄 Deduplicating by term name...")
+
+    deduplicator = TermDeduplicator()
+    for cui, data in concepts.items():
+        deduplicator.add(cui, data, data)
 
     # Convert back to dict format
-    deduplicated = {cui: data for cui, data in unique_terms.values()}
+    deduplicated = dict(deduplicator.winners())
 
-    print(f"   ✅ Removed {duplicates_removed:,} duplicates")
+    print(f"   ✅ Removed {deduplicator.duplicates_removed:,} duplicates")
     print(f"   ✅ Final count: {len(deduplicated):,} unique terms")
 
     return deduplicated
 
 
+def save_candidates(concepts):
+    """
+    Stream the concepts as they were before deduplication, so an incremental
+    re-import (import_umls_delta.py) can re-run deduplication exactly.
+    """
+    print(f"\n💾 Saving pre-deduplication concepts to {CANDIDATES_FILE}...")
+
+    with IntermediateWriter(CANDIDATES_FILE) as writer:
+        for cui, concept in concepts.items():
+            writer.write(cui, concept)
+
+    print(f"   ✅ Saved {writer.count:,} concepts to {CANDIDATES_FILE}")
+
+
 def save_intermediate(concepts):
-    """Save intermediate JSON for debugging/inspection."""
-    print(f"\n💾 Saving intermediate data to {INTERMEDIATE_JSON}...")
+    """Stream concepts to the intermediate JSON Lines file for the next stages."""
+    print(f"\n💾 Saving intermediate data to {INTERMEDIATE_FILE}...")
 
-    # Convert sets to lists for JSON serialization
-    json_data = {}
-    for cui, data in concepts.items():
-        json_data[cui] = {
-            'preferred_term': data.get('preferred_term'),
-            'definition': data.get('definition', ''),
-            'definition_source': data.get('definition_source', ''),
-            'synonyms': data.get('synonyms', []),
-            'abbreviations': data.get('abbreviations', []),
-            'mesh_code': data.get('mesh_code', ''),
-            'sources': list(data.get('sources', []))
-        }
+    with IntermediateWriter(INTERMEDIATE_FILE) as writer:
+        for cui, concept in concepts.items():
+            writer.write(cui, concept)
 
-    with open(INTERMEDIATE_JSON, 'w', encoding='utf-8') as f:
-        json.dump(json_data, f, indent=2)
+    print(f"   ✅ Saved {writer.count:,} concepts to {INTERMEDIATE_FILE}")
 
-    print(f"   ✅ Saved {len(concepts):,} concepts to {INTERMEDIATE_JSON}")
 
+def coverage_counts(concepts):
+    """Final-term coverage counts for the summary."""
+    coverage = Counter()
+    for concept in concepts:
+        coverage['terms'] += 1
+        coverage['definitions'] += bool(concept.definition)
+        coverage['mesh'] += bool(concept.mesh_code)
+        coverage['synonyms'] += bool(concept.synonyms)
+    return coverage
 
-def main():
-    print("="*70)
-    print("UMLS NEUROSCIENCE TERM IMPORTER")
-    print("="*70)
-    print(f"\nStrategy: DEC-002 Option B (Multi-stage filtering)")
-    print(f"Input: 1,015,068 neuroscience CUIs")
-    print(f"Target: 150K-250K final terms")
 
-    # Step 1: Load neuroscience CUI filter
-    neuro_cuis = load_neuroscience_cuis()
+def import_streaming(filter_index, workers, telemetry):
+    """
+    Steps 2-5 as one merge-join pass (iter_concepts()): each finished
+    concept is written to the candidates file and offered to the
+    deduplicator straight away, and the kept ones are then copied from the
+    candidates file to the intermediate file. Only the deduplicator's
+    per-term entries are held in memory.
 
-    # Step 2: Load semantic type mappings (for keyword filtering)
-    cui_semantic_types = load_cui_semantic_types()
+    Returns:
+        Counter: coverage_counts() of the final terms
 
-    # Step 3: Parse MRCONSO (terms, synonyms, abbreviations)
-    concepts = parse_mrconso(neuro_cuis, cui_semantic_types)
+    Raises:
+        UnsortedRRFError: If MRCONSO.RRF or MRDEF.RRF is not sorted by CUI
+            (the candidates file is then incomplete)
+    """
+    deduplicator = TermDeduplicator()
+    with telemetry.stage('merge_join_concepts') as metrics:
+        with IntermediateWriter(CANDIDATES_FILE) as writer:
+            for cui, concept in iter_concepts(filter_index, workers=workers, metrics=metrics):
+                deduplicator.add(cui, concept, writer.write(cui, concept))
+        print(f"\n💾 Saved {writer.count:,} pre-deduplication concepts to {CANDIDATES_FILE}")
+
+    if not writer.count:
+        print("\n❌ ERROR: No concepts extracted from MRCONSO")
+        sys.exit(1)
+
+    with telemetry.stage('deduplicate_by_term') as metrics:
+        metrics.advance(rows=writer.count)
+        print(f"\n🔄 Deduplicating by term name...")
+        winners = deduplicator.winners()
+        print(f"   ✅ Removed {deduplicator.duplicates_removed:,} duplicates")
+        print(f"   ✅ Final count: {len(winners):,} unique terms")
+        metrics.count({'unique_terms': len(winners)})
+
+    with telemetry.stage('save_intermediate') as metrics:
+        print(f"\n💾 Saving intermediate data to {INTERMEDIATE_FILE}...")
+        offsets = (offset for _, offset in winners)
+        with IntermediateWriter(INTERMEDIATE_FILE) as writer:
+            def copy_winners():
+                for cui, concept in read_intermediate_at(CANDIDATES_FILE, offsets):
+                    writer.write(cui, concept)
+                    yield concept
+
+            coverage = coverage_counts(copy_winners())
+        print(f"   ✅ Saved {writer.count:,} concepts to {INTERMEDIATE_FILE}")
+        metrics.advance(writer.count, INTERMEDIATE_FILE.stat().st_size)
+    return coverage
+
+
+def import_in_memory(filter_index, workers, telemetry):
+    """
+    Steps 2-5 with every concept in memory, for RRF files that are not
+    sorted by CUI.
+
+    Returns:
+        Counter: coverage_counts() of the final terms
+    """
+    # Step 2: Parse MRCONSO (terms, synonyms, abbreviations)
+    with telemetry.stage('parse_mrconso') as metrics:
+        concepts = parse_mrconso(filter_index, workers=workers, metrics=metrics)
 
     if not concepts:
         print("\n❌ ERROR: No concepts extracted from MRCONSO")
         sys.exit(1)
 
-    # Step 4: Parse MRDEF (definitions)
-    concepts = parse_mrdef(concepts)
+    # Step 3: Parse MRDEF (definitions)
+    with telemetry.stage('parse_mrdef') as metrics:
+        concepts = parse_mrdef(concepts, metrics=metrics)
+    with telemetry.stage('save_candidates') as metrics:
+        save_candidates(concepts)
+        metrics.advance(len(concepts), CANDIDATES_FILE.stat().st_size)
+
+    # Step 4: Deduplicate by term name
+    with telemetry.stage('deduplicate_by_term') as metrics:
+        metrics.advance(rows=len(concepts))
+        concepts = deduplicate_by_term(concepts)
+        metrics.count({'unique_terms': len(concepts)})
+
+    # Step 5: Save intermediate results
+    with telemetry.stage('save_intermediate') as metrics:
+        save_intermediate(concepts)
+        metrics.advance(len(concepts), INTERMEDIATE_FILE.stat().st_size)
+    return coverage_counts(concepts.values())
+
+
+def save_atom_features(filter_index, extra_keywords, metrics):
+    """
+    Write the per-atom feature table for simulate_filters.py. Its keyword
+    vocabulary is NEURO_KEYWORDS plus extra_keywords, the candidates a
+    simulation may add.
+    """
+    print(f"\n💾 Saving atom feature table to {ATOM_FEATURES_DIR}...")
+    metrics.total_bytes = input_size(MRCONSO_FILE)
+
+    def report_progress(reader):
+        print(f"   Processed {reader.rows_read:,} rows..." + metrics.track(reader))
+
+    meta = build_atom_features(
+        MRCONSO_FILE, filter_index, NEURO_KEYWORDS + list(extra_keywords),
+        ATOM_FEATURES_DIR, progress=report_progress,
+    )
+    metrics.advance(meta['rows'], metrics.total_bytes)
+    metrics.count({'atoms': meta['stored_rows']})
+    print(f"   ✅ Saved {meta['stored_rows']:,} English atoms, " +
+          f"{len(meta['keywords'])} keywords")
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Import neuroscience terms from UMLS")
+    parser.add_argument(
+        '--workers', type=int, default=1,
+        help="Worker processes for MRCONSO parsing (1 = serial, 0 = all CPU cores)"
+    )
+    parser.add_argument(
+        '--in-memory', action='store_true',
+        help="Load all concepts before deduplicating instead of merge-joining the "
+             "CUI-sorted RRF files (used automatically for unsorted files)"
+    )
+    parser.add_argument(
+        '--atom-features', action='store_true',
+        help=f"Also write the per-atom filter feature table ({ATOM_FEATURES_DIR}) "
+             "for simulate_filters.py (one extra MRCONSO scan)"
+    )
+    parser.add_argument(
+        '--feature-keyword', action='append', default=[], metavar='KEYWORD',
+        help="Extra keyword to record in the feature table, so simulations can "
+             "add it to NEURO_KEYWORDS (repeatable)"
+    )
+    add_sample_argument(parser)
+    return parser.parse_args()
 
-    # Step 5: Deduplicate by term name
-    concepts = deduplicate_by_term(concepts)
 
-    # Step 6: Save intermediate results
-    save_intermediate(concepts)
+def main():
+    args = parse_args()
+    workers = args.workers or os.cpu_count() or 1
+    if args.sample:
+        enter_sample(args.sample, UMLS_META_DIR, [MRCONSO_FILE.name, MRDEF_FILE.name])
+
+    print("="*70)
+    print("UMLS NEUROSCIENCE TERM IMPORTER")
+    print("="*70)
+    print(f"\nStrategy: DEC-002 Option B (Multi-stage filtering)")
+    print(f"Input: 1,015,068 neuroscience CUIs")
+    print(f"Target: 150K-250K final terms")
+
+    # Step 1: Load neuroscience CUI filter (also maps CUIs to semantic types
+    # for keyword filtering)
+    filter_index = load_filter_index()
+    telemetry = Telemetry('import_umls_neuroscience', IMPORTS_DIR, release=filter_index.release,
+                          sample=args.sample)
+
+    # Steps 2-5: Terms, definitions, deduplication, intermediate file
+    coverage = None
+    if not args.in_memory:
+        try:
+            coverage = import_streaming(filter_index, workers, telemetry)
+        except UnsortedRRFError as e:
+            print(f"\n⚠️  {e}")
+            print(f"   Falling back to the in-memory import...")
+    if coverage is None:
+        coverage = import_in_memory(filter_index, workers, telemetry)
+
+    if args.atom_features:
+        with telemetry.stage('save_atom_features') as metrics:
+            save_atom_features(filter_index, args.feature_keyword, metrics)
+
+    telemetry.save()
+    telemetry.print_summary()
 
     # Summary
+    term_count = coverage['terms']
     print("\n" + "="*70)
     print("PHASE 1 COMPLETE: TERM EXTRACTION")
     print("="*70)
-    print(f"\n✅ Extracted {len(concepts):,} unique neuroscience terms")
-    print(f"✅ Intermediate data: {INTERMEDIATE_JSON}")
+    print(f"\n✅ Extracted {term_count:,} unique neuroscience terms")
+    print(f"✅ Intermediate data: {INTERMEDIATE_FILE}")
 
     # Coverage statistics
-    with_defs = sum(1 for c in concepts.values() if c.get('definition'))
-    with_mesh = sum(1 for c in concepts.values() if c.get('mesh_code'))
-    with_syns = sum(1 for c in concepts.values() if c.get('synonyms'))
+    with_defs = coverage['definitions']
+    with_mesh = coverage['mesh']
+    with_syns = coverage['synonyms']
 
     print(f"\n📊 Coverage Statistics:")
-    print(f"   Definitions: {with_defs:,} ({with_defs/len(concepts)*100:.1f}%)")
-    print(f"   MeSH codes: {with_mesh:,} ({with_mesh/len(concepts)*100:.1f}%)")
-    print(f"   Synonyms: {with_syns:,} ({with_syns/len(concepts)*100:.1f}%)")
+    print(f"   Definitions: {with_defs:,} ({with_defs/term_count*100:.1f}%)")
+    print(f"   MeSH codes: {with_mesh:,} ({with_mesh/term_count*100:.1f}%)")
+    print(f"   Synonyms: {with_syns:,} ({with_syns/term_count*100:.1f}%)")
 
     print(f"\n🎯 Target Assessment:")
-    if 150000 <= len(concepts) <= 250000:
+    if 150000 <= term_count <= 250000:
         print(f"   ✅ Within target range (150K-250K)")
-    elif len(concepts) < 150000:
+    elif term_count < 150000:
         print(f"   ⚠️  Below target (< 150K)")
         print(f"   Consider: Relaxing keyword filters or adding Priority 3 types")
     else:
@@ -422,7 +894,7 @@ def main():
         print(f"   Consider: Stricter keyword filters or Priority 1 only")
 
     print(f"\n🚀 Next Steps:")
-    print(f"   1. Review intermediate data: {INTERMEDIATE_JSON}")
+    print(f"   1. Review intermediate data: {INTERMEDIATE_FILE}")
     print(f"   2. Parse MRREL.RRF for related concepts (DEC-001 profiling)")
     print(f"   3. Map to NeuroDB-2 26-column schema")
     print(f"   4. Run validation and quality profiling")
@@ -0,0 +1,410 @@
+"""
+Per-atom MRCONSO feature table (imports/umls/atom_features/).
+
+Tuning the DEC-002 filter stages (suppression, ISPREF/TTY, broad semantic
+types and their keyword check) otherwise takes a full MRCONSO re-scan per
+experiment. The table keeps what those stages look at, one row per English
+atom of an indexed CUI (stages 1-2 already applied), so simulate_filters()
+can re-run stages 3-5 and the term deduplication with NumPy masks.
+
+Directory layout (one file per column, native byte order, no header):
+    features.json  Format version, source MRCONSO size/mtime, filter index
+                   checksum, row counts, column dtypes, dictionaries, the
+                   filter index TUI table and the keyword vocabulary
+    CUI.bin        int32 CUI ids (see cui_set.encode_cui)
+    ISPREF.bin     uint8, 1 if ISPREF=Y
+    TTY.bin        uint16 codes into the TTY dictionary
+    SAB.bin        uint16 codes into the SAB dictionary
+    SUPPRESS.bin   uint8 codes into the SUPPRESS dictionary
+    PRIORITY.bin   uint8 best filter priority of the CUI
+    TERM.bin       uint64 hash of the deduplication key (STR lowercased and
+                   stripped); 0 for an empty STR
+    TYPES.bin      uint8[type_bytes] per row, the CUI's semantic type mask
+                   (bit i = TUI table entry i)
+    KEYWORDS.bin   uint8[keyword_bytes] per row, bit i set if keyword i of
+                   the vocabulary occurs in STR
+
+Rows appear in file order. Building needs only the standard library;
+reading needs NumPy (pip install numpy), imported when a table is opened.
+"""
+
+import sys
+import json
+import shutil
+import hashlib
+from array import array
+from pathlib import Path
+
+from .keyword_matcher import KeywordMatcher
+from .rrf_reader import RRFReader, resolve_rrf
+
+FORMAT_VERSION = 1
+META_FILE = "features.json"
+
+# Column name → array typecode. Typecodes match the NumPy dtypes below.
+COLUMNS = {
+    'CUI': 'i',
+    'ISPREF': 'B',
+    'TTY': 'H',
+    'SAB': 'H',
+    'SUPPRESS': 'B',
+    'PRIORITY': 'B',
+    'TERM': 'Q',
+}
+DTYPES = {'i': 'i4', 'B': 'u1', 'H': 'u2', 'Q': 'u8'}
+DICTIONARY_COLUMNS = ('TTY', 'SAB', 'SUPPRESS')
+BITSET_COLUMNS = ('TYPES', 'KEYWORDS')
+
+# Rows buffered in memory before being appended to the column files
+FLUSH_ROWS = 1 << 20
+
+# Rows masked per step by simulate_filters()
+SIMULATE_CHUNK_ROWS = 1 << 22
+
+
+class FeatureTableError(ValueError):
+    """Raised when a feature table is missing, incomplete or out of date."""
+
+
+def _numpy():
+    try:
+        import numpy
+    except ImportError:
+        raise ImportError(
+            "Reading the atom feature table needs NumPy (pip install numpy)"
+        ) from None
+    return numpy
+
+
+def source_signature(mrconso_file, filter_index):
+    """Size and modification time of MRCONSO.RRF, and the filter index checksum."""
+    path = resolve_rrf(mrconso_file)
+    stat = path.stat()
+    return {
+        'name': path.name,
+        'size': stat.st_size,
+        'mtime_ns': stat.st_mtime_ns,
+        'filter_index': filter_index.checksum,
+    }
+
+
+def term_hash(term):
+    """64-bit hash of a term's deduplication key; 0 only for an empty term."""
+    if not term:
+        return 0
+    key = term.lower().strip().encode('utf-8')
+    return int.from_bytes(hashlib.blake2b(key, digest_size=8).digest(), 'little') or 1
+
+
+def build_atom_features(mrconso_file, filter_index, keywords, cache_dir, progress=None):
+    """
+    Scans MRCONSO.RRF into a feature table. The table is written next to
+    cache_dir and renamed into place when complete.
+
+    Args:
+        mrconso_file (str|Path): MRCONSO.RRF
+        filter_index (FilterIndex): Stage 1 CUI filter, semantic types and priorities
+        keywords (iterable): Keyword vocabulary recorded per atom; simulated
+            keyword lists must be drawn from it
+        cache_dir (str|Path): Table directory to (re)create
+        progress (callable): Optional progress(reader) callback for the scan
+
+    Returns:
+        dict: The table's features.json contents
+
+    Raises:
+        FeatureTableError: If a dictionary outgrows its column's code width
+    """
+    cache_dir = Path(cache_dir)
+    partial_dir = cache_dir.with_name(cache_dir.name + '.partial')
+    shutil.rmtree(partial_dir, ignore_errors=True)
+    partial_dir.mkdir(parents=True)
+
+    signature = source_signature(mrconso_file, filter_index)
+    matcher = KeywordMatcher(keywords)
+    keyword_bits = {keyword: 1 << i for i, keyword in enumerate(matcher.keywords)}
+    type_bytes = filter_index.mask_bytes
+    keyword_bytes = (len(matcher.keywords) + 7) // 8
+
+    dictionaries = {name: {} for name in DICTIONARY_COLUMNS}
+    tty_codes, sab_codes, suppress_codes = (dictionaries[name] for name in DICTIONARY_COLUMNS)
+    buffers = {name: array(typecode) for name, typecode in COLUMNS.items()}
+    cuis, isprefs, ttys, sabs, suppresses, priorities, terms = buffers.values()
+    bitsets = {name: bytearray() for name in BITSET_COLUMNS}
+    types, keyword_sets = bitsets.values()
+    files = {
+        name: open(partial_dir / f"{name}.bin", 'wb')
+        for name in tuple(COLUMNS) + BITSET_COLUMNS
+    }
+
+    def flush():
+        for name, buffer in buffers.items():
+            buffer.tofile(files[name])
+            del buffer[:]
+        for name, buffer in bitsets.items():
+            files[name].write(buffer)
+            del buffer[:]
+
+    reader = RRFReader(
+        mrconso_file,
+        columns=('CUI', 'ISPREF', 'SAB', 'TTY', 'SUPPRESS', 'STR'),
+        cui_filter=filter_index.cui_set(),
+        where={'LAT': 'ENG'},
+        progress=progress,
+    )
+    last_cui = None
+    stored = 0
+    try:
+        for cui, ispref, sab, tty, suppress, term_str in reader:
+            # Rows of a CUI are consecutive, so its index lookups are done once
+            if cui != last_cui:
+                last_cui = cui
+                cui_id = int(cui[1:])
+                priority = filter_index.priority(cui)
+                type_mask = filter_index.mask(cui).to_bytes(type_bytes, 'little')
+
+            hits = 0
+            for keyword in matcher.matches(term_str):
+                hits |= keyword_bits[keyword]
+
+            cuis.append(cui_id)
+            isprefs.append(ispref == 'Y')
+            ttys.append(tty_codes.setdefault(tty, len(tty_codes)))
+            sabs.append(sab_codes.setdefault(sab, len(sab_codes)))
+            suppresses.append(suppress_codes.setdefault(suppress, len(suppress_codes)))
+            priorities.append(priority)
+            terms.append(term_hash(term_str))
+            types += type_mask
+            keyword_sets += hits.to_bytes(keyword_bytes, 'little')
+            stored += 1
+            if stored % FLUSH_ROWS == 0:
+                flush()
+        flush()
+    except OverflowError:
+        raise FeatureTableError(
+            f"Too many distinct values for the feature table's code widths in {mrconso_file}"
+        ) from None
+    finally:
+        for f in files.values():
+            f.close()
+
+    meta = {
+        'format_version': FORMAT_VERSION,
+        'source': signature,
+        'release': filter_index.release,
+        'rows': reader.counts['rows'],
+        'cui_match': reader.counts['cui_match'],
+        'stored_rows': stored,
+        'byteorder': sys.byteorder,
+        'columns': {name: DTYPES[typecode] for name, typecode in COLUMNS.items()},
+        'bitset_widths': {'TYPES': type_bytes, 'KEYWORDS': keyword_bytes},
+        'dictionaries': {name: list(codes) for name, codes in dictionaries.items()},
+        'tui_table': [list(entry) for entry in filter_index.tui_table],
+        'keywords': list(matcher.keywords),
+    }
+    with open(partial_dir / META_FILE, 'w', encoding='utf-8') as f:
+        json.dump(meta, f, indent=2)
+
+    shutil.rmtree(cache_dir, ignore_errors=True)
+    partial_dir.rename(cache_dir)
+    return meta
+
+
+class AtomFeatures:
+    """
+    Read-only view of a feature table: each column as a memory-mapped NumPy
+    array (`columns['CUI']`, ...; TYPES and KEYWORDS as rows × bytes), plus
+    the dictionaries, TUI table and keyword vocabulary.
+    """
+
+    def __init__(self, cache_dir):
+        """
+        Args:
+            cache_dir (str|Path): Directory written by build_atom_features()
+
+        Raises:
+            FeatureTableError: If the table is missing or incomplete
+            ImportError: If NumPy is not installed
+        """
+        self.cache_dir = Path(cache_dir)
+        try:
+            with open(self.cache_dir / META_FILE, 'r', encoding='utf-8') as f:
+                meta = json.load(f)
+        except (OSError, ValueError):
+            raise FeatureTableError(f"No atom feature table in {self.cache_dir}") from None
+        if meta.get('format_version') != FORMAT_VERSION:
+            raise FeatureTableError(
+                f"Unsupported feature table version {meta.get('format_version')} "
+                f"(expected {FORMAT_VERSION}): {self.cache_dir}"
+            )
+
+        np = _numpy()
+        self.meta = meta
+        self.source = meta['source']
+        self.release = meta['release']
+        self.total_rows = meta['rows']
+        self.cui_match = meta['cui_match']
+        self.stored_rows = meta['stored_rows']
+        self.dictionaries = meta['dictionaries']
+        self.tui_table = [tuple(entry) for entry in meta['tui_table']]
+        self.keywords = tuple(meta['keywords'])
+
+        order = '<' if meta['byteorder'] == 'little' else '>'
+        layouts = {name: (np.dtype(order + dtype), None) for name, dtype in meta['columns'].items()}
+        for name, width in meta['bitset_widths'].items():
+            layouts[name] = (np.dtype('u1'), width)
+
+        self.columns = {}
+        for name, (dtype, width) in layouts.items():
+            path = self.cache_dir / f"{name}.bin"
+            shape = (self.stored_rows,) if width is None else (self.stored_rows, width)
+            size = self.stored_rows * (width or 1) * dtype.itemsize
+            if not path.exists() or path.stat().st_size != size:
+                raise FeatureTableError(f"Incomplete feature table: {path}")
+            if size:
+                self.columns[name] = np.memmap(path, dtype=dtype, mode='r', shape=shape)
+            else:
+                self.columns[name] = np.zeros(shape, dtype=dtype)  # mmap cannot map an empty file
+
+    def __len__(self):
+        return self.stored_rows
+
+    def is_current(self, mrconso_file, filter_index):
+        """True if the table was built from mrconso_file and filter_index as they are now."""
+        return self.source == source_signature(mrconso_file, filter_index)
+
+    def lookup_table(self, column, predicate):
+        """
+        Evaluates a predicate once per dictionary value.
+
+        Returns:
+            numpy.ndarray: bool array indexed by code, so that
+                `table[columns[column]]` masks the matching rows
+        """
+        np = _numpy()
+        return np.array(
+            [bool(predicate(value)) for value in self.dictionaries[column]], dtype=bool
+        )
+
+    def type_bits(self, semantic_types):
+        """
+        TYPES byte mask for a set of semantic type names or TUIs. Types not
+        in the TUI table are ignored, as in FilterIndex.type_mask().
+        """
+        np = _numpy()
+        mask = 0
+        for i, (tui, name, _) in enumerate(self.tui_table):
+            if tui in semantic_types or name in semantic_types:
+                mask |= 1 << i
+        return np.frombuffer(
+            mask.to_bytes(self.meta['bitset_widths']['TYPES'], 'little'), dtype='u1'
+        )
+
+    def keyword_bits(self, keywords):
+        """
+        KEYWORDS byte mask for a keyword list.
+
+        Raises:
+            FeatureTableError: If a keyword is not in the recorded vocabulary
+        """
+        np = _numpy()
+        positions = {keyword: i for i, keyword in enumerate(self.keywords)}
+        missing = sorted({k.lower() for k in keywords} - set(positions))
+        if missing:
+            raise FeatureTableError(
+                f"Keywords not recorded in the feature table: {', '.join(missing)} "
+                f"(rebuild it with these keywords added)"
+            )
+        mask = 0
+        for keyword in keywords:
+            mask |= 1 << positions[keyword.lower()]
+        return np.frombuffer(
+            mask.to_bytes(self.meta['bitset_widths']['KEYWORDS'], 'little'), dtype='u1'
+        )
+
+
+def open_atom_features(cache_dir, mrconso_file, filter_index):
+    """
+    Opens a feature table if it exists and matches mrconso_file and filter_index.
+
+    Returns:
+        AtomFeatures: The table, or None if it is missing, incomplete or stale
+    """
+    try:
+        features = AtomFeatures(cache_dir)
+    except FeatureTableError:
+        return None
+    return features if features.is_current(mrconso_file, filter_index) else None
+
+
+def simulate_filters(features, broad_semantic_types, keywords, preferred_ttys=('PN',),
+                     suppress=('N',), max_priority=None):
+    """
+    Re-runs filter stages 3-5 and the term deduplication of
+    import_umls_neuroscience.py over a feature table.
+
+    Stage 3 keeps atoms whose SUPPRESS is in `suppress`; stage 4 keeps
+    ISPREF=Y atoms and atoms with a TTY in `preferred_ttys`; stage 5 keeps
+    those of CUIs without a broad semantic type, or whose term contains a
+    keyword. Like the importer, a concept's preferred term is its first
+    atom passing all stages (with a non-empty term), and concepts are
+    deduplicated by that term.
+
+    Args:
+        features (AtomFeatures): The table
+        broad_semantic_types (iterable): Semantic type names or TUIs needing
+            the keyword check
+        keywords (iterable): Stage 5 keywords (from features.keywords)
+        preferred_ttys (iterable): TTYs treated as preferred besides ISPREF=Y
+        suppress (iterable): SUPPRESS values passing stage 3
+        max_priority (int): Drop CUIs whose best filter priority is above
+            this (None = keep every indexed CUI)
+
+    Returns:
+        dict: Stage counters named as in new_stage_counts(), plus
+            'concepts' (with a preferred term) and 'unique_terms'
+
+    Raises:
+        FeatureTableError: If a keyword is not in the recorded vocabulary
+    """
+    np = _numpy()
+    columns = features.columns
+    suppress_ok = features.lookup_table('SUPPRESS', set(suppress).__contains__)
+    preferred_tty = features.lookup_table('TTY', set(preferred_ttys).__contains__)
+    broad_bits = features.type_bits(set(broad_semantic_types))
+    keyword_bits = features.keyword_bits(list(keywords))
+
+    counts = {
+        'total_rows': features.total_rows,
+        'stage1_cui_match': features.cui_match,
+        'stage2_english': len(features),
+        'stage3_not_suppressed': 0,
+        'stage4_preferred': 0,
+        'stage5_keyword_pass': 0,
+        'stage5_keyword_fail': 0,
+    }
+    passing = []
+    for start in range(0, len(features), SIMULATE_CHUNK_ROWS):
+        chunk = slice(start, start + SIMULATE_CHUNK_ROWS)
+        kept = suppress_ok[columns['SUPPRESS'][chunk]]
+        if max_priority is not None:
+            kept &= columns['PRIORITY'][chunk] <= max_priority
+        counts['stage3_not_suppressed'] += int(kept.sum())
+
+        preferred = kept & ((columns['ISPREF'][chunk] == 1) | preferred_tty[columns['TTY'][chunk]])
+        counts['stage4_preferred'] += int(preferred.sum())
+
+        needs_keyword = preferred & (columns['TYPES'][chunk] & broad_bits).any(axis=1)
+        has_keyword = (columns['KEYWORDS'][chunk] & keyword_bits).any(axis=1)
+        counts['stage5_keyword_pass'] += int((needs_keyword & has_keyword).sum())
+        counts['stage5_keyword_fail'] += int((needs_keyword & ~has_keyword).sum())
+
+        accepted = preferred & ~(needs_keyword & ~has_keyword) & (columns['TERM'][chunk] != 0)
+        passing.append(np.flatnonzero(accepted) + start)
+
+    rows = np.concatenate(passing) if passing else np.zeros(0, dtype=np.intp)
+    # First accepted atom per CUI, in file order, is the concept's preferred term
+    _, first = np.unique(columns['CUI'][rows], return_index=True)
+    counts['concepts'] = len(first)
+    counts['unique_terms'] = len(np.unique(columns['TERM'][rows[first]]))
+    return counts
@@ -0,0 +1,164 @@
+"""
+Transparent compressed RRF input (gzip, bz2, xz, zstd).
+
+A release can be kept compressed on disk: wherever a script names
+MRCONSO.RRF, the readers fall back to MRCONSO.RRF.gz / .bz2 / .xz / .zst
+if the plain file does not exist (see resolve_rrf()).
+
+Decompression runs in a background thread (a Prefetcher, see prefetch.py)
+that fills a small queue of decompressed blocks while the caller parses
+the previous ones. zlib, bz2, lzma and zstd all release the GIL while
+decompressing, so the two overlap on separate cores; on slow (e.g.
+network) storage the scan also reads several times fewer bytes from disk.
+
+zstd needs the `zstandard` package (or Python 3.14's compression.zstd);
+without either, the `zstd` command-line tool is used as a separate
+decompressing process if it is installed.
+
+Compressed streams cannot seek, so byte ranges (parallel chunk scans) are
+not available for them, and row offsets refer to the decompressed data.
+"""
+
+import os
+import bz2
+import gzip
+import lzma
+import shutil
+import subprocess
+from pathlib import Path
+
+from .prefetch import Prefetcher
+
+# Suffixes tried, in order, when a plain RRF file is missing
+COMPRESSED_SUFFIXES = ('.gz', '.bz2', '.xz', '.zst')
+
+# Decompressed blocks buffered ahead of the parser
+QUEUE_BLOCKS = 8
+
+
+def resolve_rrf(path):
+    """
+    Finds the file to read for an RRF path: the path itself if it exists,
+    otherwise the first existing compressed variant (e.g. MRREL.RRF.gz).
+    Returns the path unchanged if nothing exists, so the caller's open()
+    reports the missing file under its usual name.
+    """
+    path = Path(path)
+    if path.exists() or path.suffix in COMPRESSED_SUFFIXES:
+        return path
+    for suffix in COMPRESSED_SUFFIXES:
+        candidate = path.with_name(path.name + suffix)
+        if candidate.exists():
+            return candidate
+    return path
+
+
+def is_compressed(path):
+    """True if the (resolved) path names a compressed file."""
+    return Path(path).suffix in COMPRESSED_SUFFIXES
+
+
+def _open_zstd(raw):
+    """
+    Opens a zstd stream over a raw file object, or returns None if no
+    zstd module is installed.
+    """
+    try:
+        from compression import zstd  # Python 3.14+
+        return zstd.ZstdFile(raw)
+    except ImportError:
+        pass
+    try:
+        import zstandard
+    except ImportError:
+        return None
+    return zstandard.ZstdDecompressor().stream_reader(raw, read_across_frames=True)
+
+
+class DecompressingStream:
+    """
+    Read-only stream of a compressed file's decompressed bytes, decompressed
+    ahead of the reader in a background thread.
+
+    read() returns the next decompressed block (of at most block_size
+    bytes), or b'' at the end. `position` is the number of compressed
+    bytes consumed so far (None when decompressing in an external process)
+    and `size` the compressed file size, for progress reporting.
+    """
+
+    def __init__(self, path, block_size):
+        """
+        Args:
+            path (str|Path): Compressed file (.gz, .bz2, .xz or .zst)
+            block_size (int): Decompressed bytes per block
+
+        Raises:
+            ValueError: For an unknown suffix, or .zst without any zstd decoder
+        """
+        self.path = Path(path)
+        self.size = os.path.getsize(self.path)
+        self.position = 0
+        self._block_size = block_size
+        self._raw = open(self.path, 'rb')
+        self._process = None
+
+        suffix = self.path.suffix
+        if suffix == '.gz':
+            self._decompressed = gzip.GzipFile(fileobj=self._raw)
+        elif suffix == '.bz2':
+            self._decompressed = bz2.BZ2File(self._raw)
+        elif suffix == '.xz':
+            self._decompressed = lzma.LZMAFile(self._raw)
+        elif suffix == '.zst':
+            self._decompressed = _open_zstd(self._raw)
+            if self._decompressed is None:
+                self._decompressed = self._start_zstd_process()
+        else:
+            self._raw.close()
+            raise ValueError(f"Not a compressed RRF file: {self.path}")
+
+        self._prefetcher = Prefetcher(self._decompress(), QUEUE_BLOCKS)
+        self._blocks = iter(self._prefetcher)
+
+    def _start_zstd_process(self):
+        if shutil.which('zstd') is None:
+            self._raw.close()
+            raise ValueError(
+                f"Reading {self.path.name} needs the zstandard package "
+                f"(pip install zstandard) or the zstd command-line tool"
+            )
+        self._process = subprocess.Popen(
+            ['zstd', '-dc'], stdin=self._raw, stdout=subprocess.PIPE
+        )
+        return self._process.stdout
+
+    def _decompress(self):
+        """Yields (block, compressed position) pairs (runs in the prefetch thread)."""
+        while True:
+            block = self._decompressed.read(self._block_size)
+            if not block:
+                return
+            yield block, None if self._process else self._raw.tell()
+
+    def read(self, size=None):
+        """Returns the next decompressed block, or b'' at the end of the file."""
+        item = next(self._blocks, None)
+        if item is None:
+            return b''
+        block, self.position = item
+        return block
+
+    def close(self):
+        """Stops the decompression thread and closes the file."""
+        self._prefetcher.close()
+        if self._process:
+            self._process.kill()
+            self._process.wait()
+        self._decompressed.close()
+        self._raw.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, traceback):
+        self.close()
@@ -0,0 +1,168 @@
+"""
+Compact per-concept record shared by the UMLS pipeline scripts.
+
+A concept used to be a dict of lists and sets (several hundred bytes of
+container overhead each, times 325K concepts in every stage). Concept is a
+__slots__ record instead:
+
+- Source vocabularies (SABs) are stored as a bitmask over a process-wide
+  intern table, so each concept holds one int instead of a set of strings
+- Synonyms and abbreviations are insertion-ordered dicts while MRCONSO is
+  scanned (O(1) dedup), then compacted to tuples
+
+to_dict() / from_dict() convert to and from the intermediate format
+(see lib/intermediate.py).
+"""
+
+import sys
+
+
+class InternTable:
+    """Assigns small integer codes to a repeating set of strings."""
+
+    __slots__ = ('names', 'codes')
+
+    def __init__(self):
+        self.names = []
+        self.codes = {}
+
+    def code(self, name):
+        """Returns the code for a name, assigning the next free code if new."""
+        code = self.codes.get(name)
+        if code is None:
+            code = len(self.names)
+            name = sys.intern(name)
+            self.names.append(name)
+            self.codes[name] = code
+        return code
+
+    def name(self, code):
+        """Returns the name assigned to a code."""
+        return self.names[code]
+
+
+# Source abbreviations (SAB) seen by this process. Codes are process-local:
+# concepts pickle their sources by name and re-encode them on unpickling.
+SOURCES = InternTable()
+
+
+class Concept:
+    """
+    One UMLS concept (the CUI is the key it is stored under, not a field).
+
+    Attributes:
+        preferred_term (str): Preferred term, or None until one is found
+        definition (str): Best definition ('' if none)
+        definition_source (str): SAB of the definition ('' if none)
+        synonyms (dict|tuple): Synonyms in first-seen order
+        abbreviations (dict|tuple): Abbreviations in first-seen order
+        mesh_code (str): MeSH descriptor code, or None
+    """
+
+    __slots__ = (
+        'preferred_term', 'definition', 'definition_source',
+        'synonyms', 'abbreviations', 'mesh_code', '_sources',
+    )
+
+    def __init__(self):
+        self.preferred_term = None
+        self.definition = ''
+        self.definition_source = ''
+        self.synonyms = {}
+        self.abbreviations = {}
+        self.mesh_code = None
+        self._sources = 0
+
+    def add_source(self, sab):
+        """Records a source vocabulary (SAB)."""
+        self._sources |= 1 << SOURCES.code(sab)
+
+    def has_source(self, sab):
+        """True if the concept has a term from the given source vocabulary."""
+        code = SOURCES.codes.get(sab)
+        return code is not None and bool(self._sources >> code & 1)
+
+    @property
+    def sources(self):
+        """Source vocabularies, sorted."""
+        mask = self._sources
+        return sorted(name for code, name in enumerate(SOURCES.names) if mask >> code & 1)
+
+    @property
+    def source_count(self):
+        """Number of source vocabularies."""
+        return bin(self._sources).count('1')
+
+    def add_synonym(self, term_str):
+        """Adds a synonym unless already present (only before compact())."""
+        self.synonyms.setdefault(term_str)
+
+    def add_abbreviation(self, term_str):
+        """Adds an abbreviation unless already present (only before compact())."""
+        self.abbreviations.setdefault(term_str)
+
+    def merge(self, other):
+        """
+        Merges a later partial record for the same CUI into this one: the
+        first preferred term / MeSH code wins, synonyms and abbreviations
+        keep first-seen order, sources are unioned.
+        """
+        self._sources |= other._sources
+
+        if not self.mesh_code and other.mesh_code is not None:
+            self.mesh_code = other.mesh_code
+
+        if not self.preferred_term and other.preferred_term is not None:
+            self.preferred_term = other.preferred_term
+
+        # dict.update keeps existing keys in place and appends new ones
+        self.synonyms.update(other.synonyms)
+        self.abbreviations.update(other.abbreviations)
+
+    def compact(self):
+        """Freezes synonyms and abbreviations into tuples once accumulation is done."""
+        self.synonyms = tuple(self.synonyms)
+        self.abbreviations = tuple(self.abbreviations)
+
+    def to_dict(self):
+        """Returns the concept in intermediate JSON form."""
+        return {
+            'preferred_term': self.preferred_term,
+            'definition': self.definition,
+            'definition_source': self.definition_source,
+            'synonyms': list(self.synonyms),
+            'abbreviations': list(self.abbreviations),
+            'mesh_code': self.mesh_code,
+            'sources': self.sources,
+        }
+
+    @classmethod
+    def from_dict(cls, data):
+        """Builds a (compacted) concept from its intermediate JSON form."""
+        concept = cls()
+        concept.preferred_term = data.get('preferred_term')
+        concept.definition = data.get('definition', '')
+        concept.definition_source = data.get('definition_source', '')
+        concept.synonyms = tuple(data.get('synonyms', ()))
+        concept.abbreviations = tuple(data.get('abbreviations', ()))
+        concept.mesh_code = data.get('mesh_code')
+        for sab in data.get('sources', ()):
+            concept.add_source(sab)
+        return concept
+
+    def __getstate__(self):
+        # Source codes are process-local; pickle source names instead
+        return (
+            self.preferred_term, self.definition, self.definition_source,
+            self.synonyms, self.abbreviations, self.mesh_code, self.sources,
+        )
+
+    def __setstate__(self, state):
+        (self.preferred_term, self.definition, self.definition_source,
+         self.synonyms, self.abbreviations, self.mesh_code, sources) = state
+        self._sources = 0
+        for sab in sources:
+            self.add_source(sab)
+
+    def __repr__(self):
+        return f"Concept({self.preferred_term!r})"
@@ -0,0 +1,471 @@
+"""
+Concept graph store (umls_concept_graph.csr).
+
+parse_mrrel_associations.py writes every non-suppressed MRREL relationship
+between two of our concepts (taxonomy included) as a directed, typed edge
+CUI1 → CUI2 in compressed sparse row (CSR) form: the edges leaving node i
+are edges offsets[i] .. offsets[i + 1] - 1. A second CSR lists each
+node's incoming edges, so shortest paths can search from both ends.
+ConceptGraph memory-maps the
+file, so loading costs no parsing and neighbourhood queries touch only the
+nodes they visit.
+
+File layout (little-endian):
+    Header      magic, version, counts, SHA-256 of the body
+    Type table  JSON {"REL": [...], "RELA": [...], "SAB": [...]}, sorted
+    CUI ids     int32[node_count], sorted ascending (node i = CUI ids[i])
+    Offsets     uint32[node_count + 1]
+    Targets     int32[edge_count], target node indexes
+    REL codes   uint8[edge_count]
+    RELA codes  uint16[edge_count] (into the RELA table; '' = no RELA)
+    SAB codes   uint16[edge_count]
+    In-offsets  uint32[node_count + 1]
+    In-edges    uint32[edge_count], edge indexes grouped by target node
+
+Each node's edges keep MRREL file order. Sections after the type table
+start on 8-byte boundaries.
+
+Edge filters (rel=, rela=, sab=) take one value or a collection of values;
+an edge matches if every given filter matches. A typed path is a list of
+such filters, one per hop, e.g. [{'rela': 'part_of'}, {'rel': 'PAR'}].
+"""
+
+import json
+import mmap
+import struct
+import hashlib
+from array import array
+from bisect import bisect_left, bisect_right
+from pathlib import Path
+
+from .cui_set import encode_cui, decode_cui
+
+MAGIC = b'NDBGRAPH'
+FORMAT_VERSION = 1
+
+# magic, version, node_count, edge_count, type_table_bytes, sha256
+HEADER = struct.Struct('<8sHIII32s')
+
+ALIGNMENT = 8
+
+EDGE_TYPES = ('REL', 'RELA', 'SAB')
+
+
+class ConceptGraphError(ValueError):
+    """Raised when a graph file is missing, truncated or corrupt."""
+
+
+def _padding(offset):
+    return -offset % ALIGNMENT
+
+
+def write_concept_graph(path, node_ids, edges, type_names):
+    """
+    Writes a graph file.
+
+    Args:
+        path (str|Path): Output path (e.g. imports/umls/umls_concept_graph.csr)
+        node_ids (iterable): Integer CUI ids of all nodes
+        edges (tuple): Parallel sequences (source ids, target ids, REL codes,
+            RELA codes, SAB codes), in MRREL file order; both ends must be nodes
+        type_names (dict): {'REL': [...], 'RELA': [...], 'SAB': [...]}
+            naming the codes used in `edges`
+
+    Returns:
+        str: Hex SHA-256 checksum of the body
+    """
+    ids = array('i', sorted(node_ids))
+    position = {cui_id: i for i, cui_id in enumerate(ids)}
+    sources, targets, rels, relas, sabs = edges
+
+    # Stored type tables hold the values used, sorted, so the file does not
+    # depend on the order values were first seen in or on unused names
+    tables = {}
+    recode = {}
+    for name, codes in zip(EDGE_TYPES, (rels, relas, sabs)):
+        names = type_names[name]
+        tables[name] = sorted({names[code] for code in set(codes)})
+        code_of = {value: code for code, value in enumerate(tables[name])}
+        recode[name] = [code_of.get(value) for value in names]
+
+    # Counting sort by source node; stable, so each node keeps file order
+    offsets = array('I', bytes(4 * (len(ids) + 1)))
+    for source_id in sources:
+        offsets[position[source_id] + 1] += 1
+    for i in range(len(ids)):
+        offsets[i + 1] += offsets[i]
+
+    edge_count = len(sources)
+    csr_targets = array('i', bytes(4 * edge_count))
+    csr_rels = array('B', bytes(edge_count))
+    csr_relas = array('H', bytes(2 * edge_count))
+    csr_sabs = array('H', bytes(2 * edge_count))
+    rel_codes, rela_codes, sab_codes = (recode[name] for name in EDGE_TYPES)
+    fill = offsets[:-1]
+    for source_id, target_id, rel, rela, sab in zip(sources, targets, rels, relas, sabs):
+        node = position[source_id]
+        slot = fill[node]
+        fill[node] = slot + 1
+        csr_targets[slot] = position[target_id]
+        csr_rels[slot] = rel_codes[rel]
+        csr_relas[slot] = rela_codes[rela]
+        csr_sabs[slot] = sab_codes[sab]
+
+    # Incoming edges: the same counting sort by target node
+    in_offsets = array('I', bytes(4 * (len(ids) + 1)))
+    for target in csr_targets:
+        in_offsets[target + 1] += 1
+    for i in range(len(ids)):
+        in_offsets[i + 1] += in_offsets[i]
+    in_edges = array('I', bytes(4 * edge_count))
+    fill = in_offsets[:-1]
+    for edge, target in enumerate(csr_targets):
+        in_edges[fill[target]] = edge
+        fill[target] += 1
+
+    table_bytes = json.dumps(tables).encode('utf-8')
+    body = bytearray(table_bytes)
+    for section in (ids, offsets, csr_targets, csr_rels, csr_relas, csr_sabs,
+                    in_offsets, in_edges):
+        body += bytes(_padding(HEADER.size + len(body)))
+        body += section.tobytes()
+
+    checksum = hashlib.sha256(body).digest()
+    header = HEADER.pack(MAGIC, FORMAT_VERSION, len(ids), edge_count, len(table_bytes), checksum)
+
+    with open(Path(path), 'wb') as f:
+        f.write(header)
+        f.write(body)
+
+    return checksum.hex()
+
+
+class ConceptGraph:
+    """
+    Read-only, memory-mapped view of a graph file.
+
+    Supports `cui in graph` and len() (nodes), plus edge listings,
+    k-hop neighbourhoods, typed paths and shortest paths by CUI.
+    """
+
+    def __init__(self, path):
+        """
+        Args:
+            path (str|Path): Graph file written by write_concept_graph()
+
+        Raises:
+            ConceptGraphError: If the file is not a valid graph file
+        """
+        self.path = Path(path)
+        if not self.path.exists():
+            raise ConceptGraphError(f"Concept graph not found: {self.path}")
+
+        with open(self.path, 'rb') as f:
+            self._mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+        if len(self._mmap) < HEADER.size:
+            raise ConceptGraphError(f"Truncated concept graph: {self.path}")
+        magic, version, node_count, edge_count, table_size, checksum = (
+            HEADER.unpack_from(self._mmap, 0)
+        )
+        if magic != MAGIC:
+            raise ConceptGraphError(f"Not a concept graph: {self.path}")
+        if version != FORMAT_VERSION:
+            raise ConceptGraphError(
+                f"Unsupported concept graph version {version} "
+                f"(expected {FORMAT_VERSION}): {self.path}"
+            )
+
+        self.checksum = checksum.hex()
+        self.edge_count = edge_count
+
+        offset = HEADER.size
+        self.type_tables = json.loads(bytes(self._mmap[offset:offset + table_size]))
+        offset += table_size
+
+        view = memoryview(self._mmap)
+        sections = []
+        for size in (node_count * 4, (node_count + 1) * 4, edge_count * 4,
+                     edge_count, edge_count * 2, edge_count * 2,
+                     (node_count + 1) * 4, edge_count * 4):
+            offset += _padding(offset)
+            sections.append(view[offset:offset + size])
+            offset += size
+        if offset > len(self._mmap):
+            raise ConceptGraphError(f"Truncated concept graph: {self.path}")
+
+        self._ids = sections[0].cast('i')
+        self._offsets = sections[1].cast('I')
+        self._targets = sections[2].cast('i')
+        self._rels = sections[3]
+        self._relas = sections[4].cast('H')
+        self._sabs = sections[5].cast('H')
+        self._in_offsets = sections[6].cast('I')
+        self._in_edges = sections[7].cast('I')
+        self._type_codes = {
+            name: {value: code for code, value in enumerate(values)}
+            for name, values in self.type_tables.items()
+        }
+
+    def __reduce__(self):
+        # Worker processes re-map the file instead of pickling its contents
+        return (ConceptGraph, (self.path,))
+
+    def verify(self):
+        """
+        Checks the body checksum.
+
+        Raises:
+            ConceptGraphError: If the stored checksum does not match
+        """
+        actual = hashlib.sha256(self._mmap[HEADER.size:]).hexdigest()
+        if actual != self.checksum:
+            raise ConceptGraphError(f"Checksum mismatch in concept graph: {self.path}")
+
+    def arrays(self):
+        """
+        The raw CSR sections, for whole-graph batch computations (e.g.
+        lib/pagerank.py). Buffers over the mapped file; wrap them with
+        numpy.frombuffer() to avoid copying.
+
+        Returns:
+            dict: {'ids', 'offsets', 'targets', 'rels', 'relas', 'sabs'}
+                memoryviews (decode codes with type_tables)
+        """
+        return {
+            'ids': self._ids,
+            'offsets': self._offsets,
+            'targets': self._targets,
+            'rels': self._rels,
+            'relas': self._relas,
+            'sabs': self._sabs,
+        }
+
+    def __len__(self):
+        return len(self._ids)
+
+    def __contains__(self, cui):
+        return self._node(cui) is not None
+
+    def __iter__(self):
+        for cui_id in self._ids:
+            yield decode_cui(cui_id)
+
+    def _node(self, cui):
+        """Node index of a CUI, or None if it is not in the graph."""
+        try:
+            cui_id = encode_cui(cui)
+        except (ValueError, TypeError):
+            return None
+        node = bisect_left(self._ids, cui_id)
+        if node < len(self._ids) and self._ids[node] == cui_id:
+            return node
+        return None
+
+    def _edge_filter(self, rel=None, rela=None, sab=None):
+        """
+        Compiles edge filters into per-column sets of codes.
+
+        Returns:
+            list: [(code column, {allowed codes}), ...] (empty = every edge)
+        """
+        checks = []
+        for name, column, wanted in (
+            ('REL', self._rels, rel), ('RELA', self._relas, rela), ('SAB', self._sabs, sab),
+        ):
+            if wanted is None:
+                continue
+            if isinstance(wanted, str):
+                wanted = (wanted,)
+            codes = self._type_codes[name]
+            checks.append((column, {codes[value] for value in wanted if value in codes}))
+        return checks
+
+    def _neighbors(self, node, checks):
+        """Target node indexes of a node's matching edges (with repeats)."""
+        start, end = self._offsets[node], self._offsets[node + 1]
+        if not checks:
+            return self._targets[start:end]
+        targets = self._targets
+        return [
+            targets[edge] for edge in range(start, end)
+            if all(column[edge] in codes for column, codes in checks)
+        ]
+
+    def degree(self, cui):
+        """Number of edges leaving a CUI (0 if it is not in the graph)."""
+        node = self._node(cui)
+        if node is None:
+            return 0
+        return self._offsets[node + 1] - self._offsets[node]
+
+    def edges(self, cui, rel=None, rela=None, sab=None):
+        """
+        Lists a CUI's matching outgoing edges, in MRREL file order.
+
+        Yields:
+            tuple: (target CUI, REL, RELA, SAB)
+        """
+        node = self._node(cui)
+        if node is None:
+            return
+        checks = self._edge_filter(rel, rela, sab)
+        tables = self.type_tables
+        for edge in range(self._offsets[node], self._offsets[node + 1]):
+            if all(column[edge] in codes for column, codes in checks):
+                yield (
+                    decode_cui(self._ids[self._targets[edge]]),
+                    tables['REL'][self._rels[edge]],
+                    tables['RELA'][self._relas[edge]],
+                    tables['SAB'][self._sabs[edge]],
+                )
+
+    def neighbors(self, cui, rel=None, rela=None, sab=None):
+        """Sorted CUIs one matching edge away from a CUI."""
+        node = self._node(cui)
+        if node is None:
+            return []
+        checks = self._edge_filter(rel, rela, sab)
+        return [decode_cui(self._ids[target])
+                for target in sorted(set(self._neighbors(node, checks)))]
+
+    def k_hop(self, cui, k, rel=None, rela=None, sab=None, limit=None):
+        """
+        Breadth-first neighbourhood of a CUI over matching edges.
+
+        Args:
+            cui (str): Start CUI
+            k (int): Maximum number of hops
+            rel, rela, sab: Edge filters (see module docstring)
+            limit (int): Stop after this many CUIs (for hub concepts)
+
+        Returns:
+            dict: {CUI: hops} for every CUI within k hops (the start CUI
+                excluded), nearest first
+        """
+        start = self._node(cui)
+        if start is None:
+            return {}
+        checks = self._edge_filter(rel, rela, sab)
+        hops = {start: 0}
+        frontier = [start]
+        for depth in range(1, k + 1):
+            next_frontier = []
+            for node in frontier:
+                for target in self._neighbors(node, checks):
+                    if target not in hops:
+                        hops[target] = depth
+                        next_frontier.append(target)
+                        if limit is not None and len(hops) > limit:
+                            del hops[start]
+                            return {decode_cui(self._ids[n]): d for n, d in hops.items()}
+            if not next_frontier:
+                break
+            frontier = next_frontier
+        del hops[start]
+        return {decode_cui(self._ids[node]): depth for node, depth in hops.items()}
+
+    def follow(self, cui, path):
+        """
+        Follows a typed path from a CUI.
+
+        Args:
+            cui (str): Start CUI
+            path (list): One filter dict per hop, e.g.
+                [{'rela': 'part_of'}, {'rel': ('PAR', 'RB')}]
+
+        Returns:
+            list: Sorted CUIs reached by the last hop
+        """
+        node = self._node(cui)
+        if node is None:
+            return []
+        current = {node}
+        for step in path:
+            checks = self._edge_filter(**step)
+            current = {target for node in current for target in self._neighbors(node, checks)}
+            if not current:
+                break
+        return [decode_cui(self._ids[node]) for node in sorted(current)]
+
+    def _predecessors(self, node, checks):
+        """Source node indexes of a node's matching incoming edges."""
+        offsets = self._offsets
+        in_edges = self._in_edges
+        return [
+            bisect_right(offsets, edge) - 1
+            for edge in (in_edges[i] for i in range(self._in_offsets[node], self._in_offsets[node + 1]))
+            if all(column[edge] in codes for column, codes in checks)
+        ]
+
+    def shortest_path(self, source, target, max_hops=6, rel=None, rela=None, sab=None):
+        """
+        Shortest directed path between two CUIs over matching edges.
+
+        Searches breadth-first from both ends, always expanding the smaller
+        frontier, so only a small part of the graph is visited even between
+        distant concepts. The result is deterministic for a given graph.
+
+        Returns:
+            list: [source, ..., target] CUIs, or None if the target is not
+                reachable within max_hops
+        """
+        start, goal = self._node(source), self._node(target)
+        if start is None or goal is None:
+            return None
+        if start == goal:
+            return [source]
+        checks = self._edge_filter(rel, rela, sab)
+
+        # node → (next node towards the search's origin, hops from the origin)
+        forward = {start: (None, 0)}
+        backward = {goal: (None, 0)}
+        forward_frontier, backward_frontier = [start], [goal]
+
+        for _ in range(max_hops):
+            if len(forward_frontier) <= len(backward_frontier):
+                forward_frontier, meetings = self._expand(
+                    forward_frontier, forward, backward, self._neighbors, checks)
+            else:
+                backward_frontier, meetings = self._expand(
+                    backward_frontier, backward, forward, self._predecessors, checks)
+            if meetings:
+                # The whole level is expanded, so the best meeting is known
+                meeting = min(meetings, key=lambda node: forward[node][1] + backward[node][1])
+                break
+            if not forward_frontier or not backward_frontier:
+                return None
+        else:
+            return None
+
+        path = []
+        node = meeting
+        while node is not None:
+            path.append(node)
+            node = forward[node][0]
+        path.reverse()
+        node = backward[meeting][0]
+        while node is not None:
+            path.append(node)
+            node = backward[node][0]
+        return [decode_cui(self._ids[node]) for node in path]
+
+    def _expand(self, frontier, visited, other, step, checks):
+        """
+        Expands one breadth-first level for shortest_path().
+
+        Returns:
+            list: The next frontier
+            list: Newly visited nodes the other search has already reached
+        """
+        next_frontier = []
+        meetings = []
+        for node in frontier:
+            hops = visited[node][1] + 1
+            for neighbor in step(node, checks):
+                if neighbor not in visited:
+                    visited[neighbor] = (node, hops)
+                    next_frontier.append(neighbor)
+                    if neighbor in other:
+                        meetings.append(neighbor)
+        return next_frontier, meetings
@@ -0,0 +1,144 @@
+"""
+Integer-encoded CUI sets for the UMLS import pipeline.
+
+UMLS CUIs are always 'C' followed by 7 digits, so every CUI maps to an
+integer id below 10,000,000. CUISet stores membership as one byte per id
+(10 MB total) instead of a Python set of ~1M CUI strings (~80-100 MB).
+
+A flag test has to parse the CUI's digits (parse_cui(), which treats a
+malformed field as no CUI), which makes it slower per call than a
+string-set lookup (17-33% in a 1M-row microbenchmark). RRFReader
+therefore tests the first CUI column once per run of rows with the same
+CUI (RRF files are sorted by it); other CUI columns, such as MRREL's CUI2,
+pay the parsing cost on every row.
+"""
+
+from pathlib import Path
+
+# 'C' + 7 digits → ids 0..9,999,999
+MAX_CUI_ID = 10 ** 7
+
+# Fixed CUI length, so RRFReader can slice a row's leading CUI without
+# searching for the first delimiter
+CUI_LENGTH = 8
+
+
+def encode_cui(cui):
+    """Encodes a CUI string ('C0006104') as its integer id (6104)."""
+    return int(cui[1:])
+
+
+def parse_cui(cui):
+    """
+    Checked encode_cui() for raw RRF fields: the integer id of a CUI, or
+    None if the field is not 'C' followed by 7 digits (e.g. empty).
+    """
+    digits = cui[1:]
+    if len(cui) == CUI_LENGTH and cui[0] == 'C' and digits.isascii() and digits.isdecimal():
+        return int(digits)
+    return None
+
+
+def decode_cui(cui_id):
+    """Decodes an integer CUI id (6104) back to its string form ('C0006104')."""
+    return f"C{cui_id:07d}"
+
+
+class CUISet:
+    """
+    Set of CUIs backed by a flag array indexed by integer CUI id.
+
+    Supports `cui in cui_set` for CUI strings, len(), and iteration (CUI
+    strings in sorted order), so it can replace a set of CUI strings.
+    """
+
+    __slots__ = ('flags', '_count')
+
+    def __init__(self, cuis=()):
+        """
+        Args:
+            cuis (iterable): Optional CUI strings to add
+        """
+        self.flags = bytearray(MAX_CUI_ID)
+        self._count = 0
+        for cui in cuis:
+            self.add(cui)
+
+    @classmethod
+    def from_flags(cls, flags, count):
+        """
+        Wraps an existing flag array without copying it (e.g. a memoryview of
+        a memory-mapped filter index).
+
+        Args:
+            flags (bytes-like): MAX_CUI_ID bytes, non-zero for member ids
+            count (int): Number of members
+
+        Returns:
+            CUISet: Read-only unless `flags` is writable
+        """
+        cui_set = cls.__new__(cls)
+        cui_set.flags = flags
+        cui_set._count = count
+        return cui_set
+
+    @classmethod
+    def from_file(cls, path):
+        """
+        Loads a CUI list file (one CUI per line, e.g. neuroscience_cuis.txt).
+
+        Args:
+            path (str|Path): CUI list file
+
+        Returns:
+            CUISet: Set holding every CUI in the file
+        """
+        cui_set = cls()
+        with open(Path(path), 'r', encoding='utf-8') as f:
+            for line in f:
+                cui = line.strip()
+                if cui:
+                    cui_set.add(cui)
+        return cui_set
+
+    def add(self, cui):
+        """Adds a CUI string."""
+        self.add_id(encode_cui(cui))
+
+    def add_id(self, cui_id):
+        """Adds an integer CUI id."""
+        if not self.flags[cui_id]:
+            self.flags[cui_id] = 1
+            self._count += 1
+
+    def contains_id(self, cui_id):
+        """Tests membership of an integer CUI id."""
+        return 0 <= cui_id < MAX_CUI_ID and self.flags[cui_id] != 0
+
+    def __contains__(self, cui):
+        try:
+            return self.contains_id(encode_cui(cui))
+        except (ValueError, TypeError):
+            return False  # Not a CUI string
+
+    def __len__(self):
+        return self._count
+
+    def __getstate__(self):
+        # Memory-mapped flags cannot be pickled; copy them for worker processes
+        return bytearray(self.flags), self._count
+
+    def __setstate__(self, state):
+        self.flags, self._count = state
+
+    def ids(self):
+        """Yields member CUI ids in ascending order."""
+        flags = self.flags
+        cui_id = flags.find(1)
+        while cui_id != -1:
+            yield cui_id
+            cui_id = flags.find(1, cui_id + 1)
+
+    def __iter__(self):
+        for cui_id in self.ids():
+            yield decode_cui(cui_id)
@@ -0,0 +1,233 @@
+"""
+Binary neuroscience CUI filter index (neuroscience_cuis.idx).
+
+Written once by build_umls_filter_index.py and memory-mapped by every
+downstream script, so loading the filter costs no parsing at all. Besides
+the CUI set itself, the index stores each CUI's semantic types (as a
+bitmask over a TUI table) and filter priority, replacing the MRSTY.RRF
+re-scan that load_cui_semantic_types used to do on every run.
+
+File layout (little-endian):
+    Header      magic, version, UMLS release, counts, SHA-256 of the body
+    TUI table   JSON list of [TUI, semantic type name, priority]
+    CUI ids     int32[cui_count], sorted ascending
+    TUI masks   uint8[cui_count * mask_bytes], bit i = TUI table entry i
+    Priorities  uint8[cui_count], best (lowest) filter priority per CUI
+    CUI flags   uint8[MAX_CUI_ID], 1 if the CUI id is in the index
+
+Sections after the TUI table start on 8-byte boundaries.
+"""
+
+import json
+import mmap
+import struct
+import hashlib
+from array import array
+from bisect import bisect_left
+from pathlib import Path
+
+from .cui_set import CUISet, MAX_CUI_ID, encode_cui, decode_cui
+
+MAGIC = b'NDBCUIX\x00'
+FORMAT_VERSION = 1
+
+# magic, version, release, cui_count, tui_count, mask_bytes, tui_table_bytes, sha256
+HEADER = struct.Struct('<8sH16sIHHI32s')
+
+ALIGNMENT = 8
+
+
+class FilterIndexError(ValueError):
+    """Raised when an index file is missing, truncated or corrupt."""
+
+
+def _padding(offset):
+    return -offset % ALIGNMENT
+
+
+def write_filter_index(path, release, cui_types, tui_table):
+    """
+    Writes a filter index file.
+
+    Args:
+        path (str|Path): Output path (e.g. imports/umls/neuroscience_cuis.idx)
+        release (str): UMLS release (e.g. '2025AB')
+        cui_types (dict): {CUI: (set of TUIs, priority)} for every indexed CUI
+        tui_table (list): [(TUI, semantic type name, priority), ...]; priority
+            is 0 for semantic types outside the neuroscience filter
+
+    Returns:
+        str: Hex SHA-256 checksum of the index body
+    """
+    tui_bits = {tui: i for i, (tui, _, _) in enumerate(tui_table)}
+    mask_bytes = max(1, (len(tui_table) + 7) // 8)
+
+    ids = array('i', sorted(encode_cui(cui) for cui in cui_types))
+    masks = bytearray(len(ids) * mask_bytes)
+    priorities = bytearray(len(ids))
+    flags = bytearray(MAX_CUI_ID)
+
+    for position, cui_id in enumerate(ids):
+        tuis, priority = cui_types[decode_cui(cui_id)]
+        mask = 0
+        for tui in tuis:
+            mask |= 1 << tui_bits[tui]
+        start = position * mask_bytes
+        masks[start:start + mask_bytes] = mask.to_bytes(mask_bytes, 'little')
+        priorities[position] = priority
+        flags[cui_id] = 1
+
+    table_bytes = json.dumps([list(entry) for entry in tui_table]).encode('utf-8')
+
+    body = bytearray(table_bytes)
+    for section in (ids.tobytes(), masks, priorities, flags):
+        body += bytes(_padding(HEADER.size + len(body)))
+        body += section
+
+    checksum = hashlib.sha256(body).digest()
+    header = HEADER.pack(
+        MAGIC, FORMAT_VERSION, release.encode('ascii'), len(ids),
+        len(tui_table), mask_bytes, len(table_bytes), checksum,
+    )
+
+    with open(Path(path), 'wb') as f:
+        f.write(header)
+        f.write(body)
+
+    return checksum.hex()
+
+
+class FilterIndex:
+    """
+    Read-only, memory-mapped view of a filter index file.
+
+    Supports `cui in index`, len() and iteration (CUI strings, sorted), plus
+    per-CUI semantic type and priority lookups.
+    """
+
+    def __init__(self, path):
+        """
+        Args:
+            path (str|Path): Index file written by write_filter_index()
+
+        Raises:
+            FilterIndexError: If the file is not a valid filter index
+        """
+        self.path = Path(path)
+        if not self.path.exists():
+            raise FilterIndexError(f"Filter index not found: {self.path}")
+
+        with open(self.path, 'rb') as f:
+            self._mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+        if len(self._mmap) < HEADER.size:
+            raise FilterIndexError(f"Truncated filter index: {self.path}")
+        (magic, version, release, cui_count, tui_count, mask_bytes,
+         table_size, checksum) = HEADER.unpack_from(self._mmap, 0)
+        if magic != MAGIC:
+            raise FilterIndexError(f"Not a filter index: {self.path}")
+        if version != FORMAT_VERSION:
+            raise FilterIndexError(
+                f"Unsupported filter index version {version} "
+                f"(expected {FORMAT_VERSION}): {self.path}"
+            )
+
+        self.release = release.rstrip(b'\x00').decode('ascii')
+        self.checksum = checksum.hex()
+        self.mask_bytes = mask_bytes
+
+        offset = HEADER.size
+        self.tui_table = [
+            tuple(entry)
+            for entry in json.loads(bytes(self._mmap[offset:offset + table_size]))
+        ]
+        offset += table_size
+
+        view = memoryview(self._mmap)
+        sections = []
+        for size in (cui_count * 4, cui_count * mask_bytes, cui_count, MAX_CUI_ID):
+            offset += _padding(offset)
+            sections.append(view[offset:offset + size])
+            offset += size
+        if offset > len(self._mmap):
+            raise FilterIndexError(f"Truncated filter index: {self.path}")
+
+        self._ids = sections[0].cast('i')
+        self._masks = sections[1]
+        self._priorities = sections[2]
+        self._cui_set = CUISet.from_flags(sections[3], cui_count)
+
+        self._tui_bits = {tui: i for i, (tui, _, _) in enumerate(self.tui_table)}
+        self._name_bits = {name: i for i, (_, name, _) in enumerate(self.tui_table)}
+
+    def __reduce__(self):
+        # Worker processes re-map the file instead of pickling its contents
+        return (FilterIndex, (self.path,))
+
+    def verify(self):
+        """
+        Checks the body checksum.
+
+        Raises:
+            FilterIndexError: If the stored checksum does not match
+        """
+        actual = hashlib.sha256(self._mmap[HEADER.size:]).hexdigest()
+        if actual != self.checksum:
+            raise FilterIndexError(f"Checksum mismatch in filter index: {self.path}")
+
+    def cui_set(self):
+        """Returns the indexed CUIs as a CUISet backed by the mapped file."""
+        return self._cui_set
+
+    def __len__(self):
+        return len(self._ids)
+
+    def __contains__(self, cui):
+        return cui in self._cui_set
+
+    def __iter__(self):
+        for cui_id in self._ids:
+            yield decode_cui(cui_id)
+
+    def _position(self, cui):
+        """Position of a CUI in the sorted id array, or None if not indexed."""
+        if cui not in self._cui_set:
+            return None
+        return bisect_left(self._ids, encode_cui(cui))
+
+    def type_mask(self, semantic_types):
+        """
+        Builds a mask for a set of semantic type names or TUIs, for use with
+        mask(). Types not present in the index are ignored.
+        """
+        mask = 0
+        for semantic_type in semantic_types:
+            bit = self._name_bits.get(semantic_type, self._tui_bits.get(semantic_type))
+            if bit is not None:
+                mask |= 1 << bit
+        return mask
+
+    def mask(self, cui):
+        """Semantic type bitmask of a CUI (0 if not indexed)."""
+        position = self._position(cui)
+        if position is None:
+            return 0
+        start = position * self.mask_bytes
+        return int.from_bytes(self._masks[start:start + self.mask_bytes], 'little')
+
+    def tuis(self, cui):
+        """Set of TUIs assigned to a CUI."""
+        mask = self.mask(cui)
+        return {tui for i, (tui, _, _) in enumerate(self.tui_table) if mask >> i & 1}
+
+    def semantic_types(self, cui):
+        """Set of semantic type names assigned to a CUI."""
+        mask = self.mask(cui)
+        return {name for i, (_, name, _) in enumerate(self.tui_table) if mask >> i & 1}
+
+    def priority(self, cui):
+        """Best (lowest) filter priority of a CUI, or None if not indexed."""
+        position = self._position(cui)
+        if position is None:
+            return None
+        return self._priorities[position]
@@ -0,0 +1,380 @@
+"""
+Hierarchy ancestor index (umls_hierarchy.idx).
+
+Built from the concept graph's taxonomy edges (lib/concept_graph.py), one
+hierarchy per source vocabulary (MSH, SNOMEDCT_US, FMA, ...). MRREL's REL
+gives CUI2's relation to CUI1, so an edge CUI1 → CUI2 makes CUI2 the
+parent for PAR and RB, and the child for CHD and RN.
+
+Each hierarchy is labelled by a depth-first walk from its roots: a
+concept's post-order number, plus the post-order range of everything
+below it. In a tree that range is one interval, so "is X under Y" is a
+single comparison and "all descendants of Y" is a slice of the concepts
+in post-order. Concepts with several parents (polyhierarchies such as
+MeSH) also inherit their other parents' subtrees as extra intervals,
+merged and sorted, so lookups stay a binary search over a few intervals
+(Agrawal, Borgida & Jagadish 1989). Taxonomy cycles (rare, mostly RB/RN)
+are broken where the walk finds them.
+
+File layout (little-endian):
+    Header      magic, version, hierarchy count, table size, SHA-256 of the body
+    Table       JSON [{"sab", "members", "intervals", "cycle_edges"}, ...], by SAB
+    Per hierarchy, in table order:
+        Members     int32[members], CUI ids, sorted ascending
+        Posts       int32[members], post-order number of each member
+        By post     int32[members], member index for each post-order number
+        Offsets     uint32[members + 1], into the intervals
+        Intervals   int32[2 × intervals], (first, last) post-order numbers
+
+Sections after the table start on 8-byte boundaries.
+"""
+
+import json
+import mmap
+import struct
+import hashlib
+from array import array
+from bisect import bisect_left, bisect_right
+from pathlib import Path
+
+from .cui_set import encode_cui, decode_cui
+
+MAGIC = b'NDBHIERX'
+FORMAT_VERSION = 1
+
+# magic, version, hierarchy_count, table_bytes, sha256
+HEADER = struct.Struct('<8sHII32s')
+
+ALIGNMENT = 8
+
+# REL → True if CUI2 is the parent of CUI1 (see module docstring)
+TAXONOMY_PARENT = {'PAR': True, 'RB': True, 'CHD': False, 'RN': False}
+
+
+class HierarchyIndexError(ValueError):
+    """Raised when a hierarchy index is missing, truncated or corrupt."""
+
+
+def _padding(offset):
+    return -offset % ALIGNMENT
+
+
+def taxonomy_children(graph):
+    """
+    Collects parent → child links per source from a concept graph.
+
+    Returns:
+        dict: {SAB: {parent node: sorted child nodes}} (graph node indexes)
+    """
+    arrays = graph.arrays()
+    offsets, targets = arrays['offsets'], arrays['targets']
+    rels, sabs = arrays['rels'], arrays['sabs']
+    rel_names = graph.type_tables['REL']
+    sab_names = graph.type_tables['SAB']
+    parent_is_target = {
+        code: TAXONOMY_PARENT[name] for code, name in enumerate(rel_names) if name in TAXONOMY_PARENT
+    }
+
+    links = {}
+    for node in range(len(offsets) - 1):
+        for edge in range(offsets[node], offsets[node + 1]):
+            direction = parent_is_target.get(rels[edge])
+            if direction is None:
+                continue
+            parent, child = (targets[edge], node) if direction else (node, targets[edge])
+            links.setdefault(sab_names[sabs[edge]], {}).setdefault(parent, set()).add(child)
+
+    return {
+        sab: {parent: sorted(children) for parent, children in children_of.items()}
+        for sab, children_of in sorted(links.items())
+    }
+
+
+def label_hierarchy(children_of):
+    """
+    Pre/post-order interval labelling of one hierarchy.
+
+    Args:
+        children_of (dict): {parent: sorted children}, any hashable sortable nodes
+
+    Returns:
+        list: Members in post order
+        dict: {member: [(first, last), ...]} sorted, disjoint post-order
+            intervals covering the member and everything below it
+        int: Edges dropped to break cycles
+    """
+    has_parent = {child for children in children_of.values() for child in children}
+    nodes = sorted(set(children_of) | has_parent)
+    roots = [node for node in nodes if node not in has_parent]
+
+    post = {}
+    entry = {}
+    by_post = []
+    for start in roots + nodes:  # Nodes left over after the roots lie on cycles
+        if start in entry:
+            continue
+        entry[start] = len(by_post)
+        stack = [(start, iter(children_of.get(start, ())))]
+        while stack:
+            node, children = stack[-1]
+            for child in children:
+                if child not in entry:
+                    entry[child] = len(by_post)
+                    stack.append((child, iter(children_of.get(child, ()))))
+                    break
+            else:
+                stack.pop()
+                post[node] = len(by_post)
+                by_post.append(node)
+
+    # In post order every child is labelled before its parents, except
+    # along cycles (a child still on the walk's stack)
+    intervals = {}
+    cycle_edges = 0
+    for node in by_post:
+        spans = [(entry[node], post[node])]
+        for child in children_of.get(node, ()):
+            if post[child] >= post[node]:  # On the stack, or the node itself
+                cycle_edges += 1
+            else:
+                spans.extend(intervals[child])
+        spans.sort()
+        merged = [spans[0]]
+        for first, last in spans[1:]:
+            if first <= merged[-1][1] + 1:
+                if last > merged[-1][1]:
+                    merged[-1] = (merged[-1][0], last)
+            else:
+                merged.append((first, last))
+        intervals[node] = merged
+
+    return by_post, intervals, cycle_edges
+
+
+def write_hierarchy_index(path, graph):
+    """
+    Builds the hierarchy index for a concept graph.
+
+    Args:
+        path (str|Path): Output path (e.g. imports/umls/umls_hierarchy.idx)
+        graph (ConceptGraph): Concept graph including taxonomy edges
+
+    Returns:
+        list: Table entries ({'sab', 'members', 'intervals', 'cycle_edges'}), by SAB
+    """
+    ids = graph.arrays()['ids']
+    table = []
+    sections = []
+    for sab, children_of in taxonomy_children(graph).items():
+        by_post, intervals, cycle_edges = label_hierarchy(children_of)
+
+        # Graph nodes are in CUI order, so sorted nodes give sorted CUI ids
+        members = sorted(by_post)
+        slot = {node: i for i, node in enumerate(members)}
+        posts = array('i', bytes(4 * len(members)))
+        for number, node in enumerate(by_post):
+            posts[slot[node]] = number
+        offsets = array('I', [0])
+        flat = array('i')
+        for node in members:
+            for first, last in intervals[node]:
+                flat.append(first)
+                flat.append(last)
+            offsets.append(len(flat) // 2)
+
+        table.append({
+            'sab': sab,
+            'members': len(members),
+            'intervals': offsets[-1],
+            'cycle_edges': cycle_edges,
+        })
+        sections.extend([
+            array('i', (ids[node] for node in members)),
+            posts,
+            array('i', (slot[node] for node in by_post)),
+            offsets,
+            flat,
+        ])
+
+    table_bytes = json.dumps(table).encode('utf-8')
+    body = bytearray(table_bytes)
+    for section in sections:
+        body += bytes(_padding(HEADER.size + len(body)))
+        body += section.tobytes()
+
+    checksum = hashlib.sha256(body).digest()
+    with open(Path(path), 'wb') as f:
+        f.write(HEADER.pack(MAGIC, FORMAT_VERSION, len(table), len(table_bytes), checksum))
+        f.write(body)
+
+    return table
+
+
+class _Hierarchy:
+    """One source's labelled hierarchy (views into the mapped file)."""
+
+    def __init__(self, entry, members, posts, by_post, offsets, intervals):
+        self.sab = entry['sab']
+        self.cycle_edges = entry['cycle_edges']
+        self.members = members
+        self.posts = posts
+        self.by_post = by_post
+        self.offsets = offsets
+        self.intervals = intervals
+
+    def slot(self, cui_id):
+        """Member index of a CUI id, or None if it is not in this hierarchy."""
+        i = bisect_left(self.members, cui_id)
+        if i < len(self.members) and self.members[i] == cui_id:
+            return i
+        return None
+
+    def spans(self, slot):
+        """(first, last) post-order intervals below a member (itself included)."""
+        intervals = self.intervals
+        return [
+            (intervals[2 * i], intervals[2 * i + 1])
+            for i in range(self.offsets[slot], self.offsets[slot + 1])
+        ]
+
+    def contains(self, ancestor_slot, number):
+        """True if post-order number `number` lies in one of the ancestor's intervals."""
+        start, end = self.offsets[ancestor_slot], self.offsets[ancestor_slot + 1]
+        intervals = self.intervals
+        if end - start == 1:  # Tree-shaped below the ancestor: one comparison
+            return intervals[2 * start] <= number <= intervals[2 * start + 1]
+        firsts = intervals[2 * start:2 * end:2]
+        i = bisect_right(firsts, number) - 1
+        return i >= 0 and number <= intervals[2 * (start + i) + 1]
+
+
+class HierarchyIndex:
+    """
+    Read-only, memory-mapped view of a hierarchy index.
+
+    `sab` arguments name one source hierarchy; None means any of them.
+    """
+
+    def __init__(self, path):
+        """
+        Args:
+            path (str|Path): Index written by write_hierarchy_index()
+
+        Raises:
+            HierarchyIndexError: If the file is not a valid hierarchy index
+        """
+        self.path = Path(path)
+        if not self.path.exists():
+            raise HierarchyIndexError(f"Hierarchy index not found: {self.path}")
+
+        with open(self.path, 'rb') as f:
+            self._mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+        if len(self._mmap) < HEADER.size:
+            raise HierarchyIndexError(f"Truncated hierarchy index: {self.path}")
+        magic, version, count, table_size, checksum = HEADER.unpack_from(self._mmap, 0)
+        if magic != MAGIC:
+            raise HierarchyIndexError(f"Not a hierarchy index: {self.path}")
+        if version != FORMAT_VERSION:
+            raise HierarchyIndexError(
+                f"Unsupported hierarchy index version {version} "
+                f"(expected {FORMAT_VERSION}): {self.path}"
+            )
+        self.checksum = checksum.hex()
+
+        offset = HEADER.size
+        self.table = json.loads(bytes(self._mmap[offset:offset + table_size]))
+        offset += table_size
+
+        view = memoryview(self._mmap)
+        self._hierarchies = {}
+        for entry in self.table:
+            members, intervals = entry['members'], entry['intervals']
+            sections = []
+            for size, typecode in ((members * 4, 'i'), (members * 4, 'i'), (members * 4, 'i'),
+                                   ((members + 1) * 4, 'I'), (intervals * 8, 'i')):
+                offset += _padding(offset)
+                sections.append(view[offset:offset + size].cast(typecode))
+                offset += size
+            self._hierarchies[entry['sab']] = _Hierarchy(entry, *sections)
+        if offset > len(self._mmap) or len(self.table) != count:
+            raise HierarchyIndexError(f"Truncated hierarchy index: {self.path}")
+
+    def __reduce__(self):
+        return (HierarchyIndex, (self.path,))
+
+    def verify(self):
+        """
+        Checks the body checksum.
+
+        Raises:
+            HierarchyIndexError: If the stored checksum does not match
+        """
+        actual = hashlib.sha256(self._mmap[HEADER.size:]).hexdigest()
+        if actual != self.checksum:
+            raise HierarchyIndexError(f"Checksum mismatch in hierarchy index: {self.path}")
+
+    @property
+    def sabs(self):
+        """Sources with a hierarchy, sorted."""
+        return [entry['sab'] for entry in self.table]
+
+    def _selected(self, sab):
+        if sab is None:
+            return list(self._hierarchies.values())
+        hierarchy = self._hierarchies.get(sab)
+        return [hierarchy] if hierarchy is not None else []
+
+    def is_under(self, cui, ancestor, sab=None):
+        """
+        True if `cui` is a (direct or indirect) descendant of `ancestor`.
+        A concept is not under itself.
+        """
+        try:
+            cui_id, ancestor_id = encode_cui(cui), encode_cui(ancestor)
+        except (ValueError, TypeError):
+            return False
+        if cui_id == ancestor_id:
+            return False
+        for hierarchy in self._selected(sab):
+            ancestor_slot = hierarchy.slot(ancestor_id)
+            if ancestor_slot is None:
+                continue
+            slot = hierarchy.slot(cui_id)
+            if slot is not None and hierarchy.contains(ancestor_slot, hierarchy.posts[slot]):
+                return True
+        return False
+
+    def descendants(self, cui, sab=None):
+        """
+        Every concept below a CUI.
+
+        Returns:
+            list: Descendant CUIs; in post order for one hierarchy, sorted
+                when merging several (sab=None)
+        """
+        try:
+            cui_id = encode_cui(cui)
+        except (ValueError, TypeError):
+            return []
+        selected = self._selected(sab)
+        found = []
+        for hierarchy in selected:
+            slot = hierarchy.slot(cui_id)
+            if slot is None:
+                continue
+            members, by_post = hierarchy.members, hierarchy.by_post
+            for first, last in hierarchy.spans(slot):
+                found.extend(members[by_post[number]] for number in range(first, last + 1))
+        if len(selected) > 1:
+            found = sorted(set(found))
+        return [decode_cui(member) for member in found if member != cui_id]
+
+    def hierarchies_of(self, cui):
+        """Sources whose hierarchy contains a CUI."""
+        try:
+            cui_id = encode_cui(cui)
+        except (ValueError, TypeError):
+            return []
+        return [sab for sab, hierarchy in self._hierarchies.items()
+                if hierarchy.slot(cui_id) is not None]
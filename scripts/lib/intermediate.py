@@ -0,0 +1,102 @@
+"""
+Streaming intermediate concept file (umls_concepts_intermediate.jsonl).
+
+JSON Lines, one concept per line, in import order:
+
+    {"cui": "C0002395", "preferred_term": "Alzheimer Disease", ...}
+
+The remaining fields are Concept.to_dict(). Unlike the previous single
+indented JSON document, the file is written as concepts are produced and
+read back one record at a time, so no stage has to hold the whole document
+(plus a parsed copy of it) in memory.
+
+Usage:
+    with IntermediateWriter(INTERMEDIATE_FILE) as writer:
+        for cui, concept in concepts.items():
+            writer.write(cui, concept)
+
+    for cui, concept in iter_intermediate(INTERMEDIATE_FILE):
+        ...
+"""
+
+import json
+from pathlib import Path
+
+from .concept import Concept
+
+
+class IntermediateWriter:
+    """Append-only writer for the intermediate concept file."""
+
+    def __init__(self, path):
+        """
+        Args:
+            path (str|Path): Output file (truncated when opened)
+        """
+        self.path = Path(path)
+        self.count = 0
+        self.bytes_written = 0
+        self._file = None
+
+    def __enter__(self):
+        # No newline translation, so bytes_written is each record's file offset
+        self._file = open(self.path, 'w', encoding='utf-8', newline='')
+        return self
+
+    def __exit__(self, exc_type, exc, traceback):
+        self._file.close()
+        self._file = None
+
+    def write(self, cui, concept):
+        """
+        Appends one concept record.
+
+        Returns:
+            int: The record's byte offset, for read_intermediate_at()
+        """
+        offset = self.bytes_written
+        record = {'cui': cui}
+        record.update(concept.to_dict())
+        # json.dumps() escapes non-ASCII characters, so characters are bytes
+        line = json.dumps(record) + '\n'
+        self._file.write(line)
+        self.bytes_written += len(line)
+        self.count += 1
+        return offset
+
+
+def iter_intermediate(path):
+    """
+    Yields (CUI, Concept) pairs from an intermediate concept file, in file order.
+
+    Raises:
+        ValueError: If a line is not a valid concept record
+    """
+    with open(Path(path), 'r', encoding='utf-8') as f:
+        for line_number, line in enumerate(f, 1):
+            if not line.strip():
+                continue
+            try:
+                record = json.loads(line)
+                cui = record.pop('cui')
+            except (ValueError, KeyError) as e:
+                raise ValueError(f"Invalid concept record at {path}:{line_number}: {e}")
+            yield cui, Concept.from_dict(record)
+
+
+def read_intermediate_at(path, offsets):
+    """
+    Yields (CUI, Concept) pairs for the records at the given byte offsets
+    (from IntermediateWriter.write()), in the order given.
+    """
+    with open(Path(path), 'rb') as f:
+        for offset in offsets:
+            f.seek(offset)
+            record = json.loads(f.readline())
+            cui = record.pop('cui')
+            yield cui, Concept.from_dict(record)
+
+
+def load_intermediate(path):
+    """Loads a whole intermediate concept file as {CUI: Concept}."""
+    return dict(iter_intermediate(path))
@@ -0,0 +1,68 @@
+"""
+Multi-keyword substring matcher for term filtering.
+
+Checking a term with `any(keyword in term for keyword in KEYWORDS)` scans
+the term once per keyword. KeywordMatcher compiles all keywords into one
+regular expression, so a term is scanned once regardless of the number of
+keywords, and it reports which keywords matched (for filter tuning), not
+just whether any did.
+
+Usage:
+    matcher = KeywordMatcher(NEURO_KEYWORDS)
+    matcher.search('Alzheimer Disease')   # True
+    matcher.matches('neurodegenerative')  # {'neuro'}
+"""
+
+import re
+
+
+class KeywordMatcher:
+    """
+    Case-insensitive substring matcher over a fixed keyword list.
+
+    Keywords that overlap in a term are all reported: 'hypothalamus' matches
+    both 'hypothalamus' and 'thalamus' if both are keywords.
+    """
+
+    def __init__(self, keywords):
+        """
+        Args:
+            keywords (iterable): Keyword substrings (matched case-insensitively)
+
+        Raises:
+            ValueError: If no non-empty keywords are given
+        """
+        self.keywords = tuple(dict.fromkeys(k.lower() for k in keywords if k))
+        if not self.keywords:
+            raise ValueError("KeywordMatcher needs at least one non-empty keyword")
+
+        # Longest alternatives first, so each position captures the longest
+        # keyword starting there; shorter keywords starting at the same
+        # position are exactly its keyword prefixes.
+        alternatives = '|'.join(
+            re.escape(k) for k in sorted(self.keywords, key=len, reverse=True)
+        )
+        self._any = re.compile(alternatives)
+        # Zero-width lookahead finds a match at every start position, so
+        # overlapping keywords are not consumed by earlier matches
+        self._each = re.compile(f'(?=({alternatives}))')
+        self._implied = {
+            keyword: [k for k in self.keywords if k != keyword and keyword.startswith(k)]
+            for keyword in self.keywords
+        }
+
+    def search(self, text):
+        """Returns True if any keyword occurs in text."""
+        return self._any.search(text.lower()) is not None
+
+    def matches(self, text):
+        """
+        Returns the set of keywords occurring in text (empty if none).
+        """
+        found = set()
+        for match in self._each.finditer(text.lower()):
+            keyword = match.group(1)
+            if keyword not in found:
+                found.add(keyword)
+                found.update(self._implied[keyword])
+        return found
@@ -0,0 +1,104 @@
+"""
+Streaming merge join over CUI-sorted RRF files.
+
+UMLS ships MRCONSO, MRDEF and MRSTY sorted by CUI, so each concept's rows
+are contiguous in every file. group_by_cui() turns a row stream into one
+(CUI, rows) group per concept, and merge_join() advances cursors over
+several such streams together, yielding each CUI once with its group from
+every stream. Only the current concept's rows are held in memory, however
+many concepts the files contain.
+
+CUIs are fixed-width ('C' + 7 digits), so comparing them as strings
+orders them numerically.
+
+Both raise UnsortedRRFError as soon as a CUI goes backwards (e.g. a
+hand-edited or concatenated file); callers fall back to their in-memory
+path for such input.
+
+Usage:
+    conso = group_by_cui(RRFReader(MRCONSO_FILE, columns=('CUI', 'STR')))
+    defs = group_by_cui(RRFReader(MRDEF_FILE, columns=('CUI', 'DEF')))
+    for cui, (conso_rows, def_rows) in merge_join(conso, defs):
+        ...  # def_rows is None for a CUI without definitions
+"""
+
+
+class UnsortedRRFError(ValueError):
+    """Raised when a stream that must be sorted by CUI is not."""
+
+
+def group_by_cui(rows, cui_column=0, strict=True):
+    """
+    Groups consecutive rows of the same CUI.
+
+    Args:
+        rows (iterable): Row tuples (e.g. an RRFReader), sorted by CUI
+        cui_column (int): Position of the CUI in each row
+        strict (bool): Raise on unsorted rows; with strict=False, unsorted
+            rows just give several groups for one CUI
+
+    Yields:
+        tuple: (CUI, [row, ...]), CUIs strictly increasing
+
+    Raises:
+        UnsortedRRFError: If a CUI is smaller than the one before it
+    """
+    current = None
+    group = []
+    for row in rows:
+        cui = row[cui_column]
+        if cui != current:
+            if group:
+                if strict and cui < current:
+                    raise UnsortedRRFError(
+                        f"Rows are not sorted by CUI ({cui} after {current}){_source(rows)}"
+                    )
+                yield current, group
+            current = cui
+            group = []
+        group.append(row)
+    if group:
+        yield current, group
+
+
+def merge_join(*streams):
+    """
+    Full outer join of CUI-keyed streams, advancing them together.
+
+    Args:
+        streams: Iterables of (CUI, value), each with strictly increasing CUIs
+            (e.g. group_by_cui() output)
+
+    Yields:
+        tuple: (CUI, [value from each stream, or None where it has no entry]),
+            in CUI order
+
+    Raises:
+        UnsortedRRFError: If a stream's CUIs do not increase
+    """
+    cursors = [iter(stream) for stream in streams]
+    heads = [next(cursor, None) for cursor in cursors]
+    while True:
+        live = [head[0] for head in heads if head is not None]
+        if not live:
+            return
+        cui = min(live)
+        values = []
+        for i, head in enumerate(heads):
+            if head is None or head[0] != cui:
+                values.append(None)
+                continue
+            values.append(head[1])
+            following = next(cursors[i], None)
+            if following is not None and following[0] <= cui:
+                raise UnsortedRRFError(
+                    f"Stream {i} is not sorted by CUI ({following[0]} after {cui})"
+                )
+            heads[i] = following
+        yield cui, values
+
+
+def _source(rows):
+    """' in <file>' for error messages, if the rows come from an RRFReader."""
+    path = getattr(rows, 'path', None)
+    return f" in {path}" if path is not None else ""
@@ -0,0 +1,251 @@
+"""
+Columnar MRREL cache (imports/umls/mrrel_columns/).
+
+Converting MRREL.RRF once into fixed-width column files lets
+parse_mrrel_associations.py re-filter relationships (e.g. after editing
+DOMAIN_SPECIFIC_RELA or TAXONOMY_REL) with NumPy masks over memory-mapped
+arrays instead of re-scanning ~80M rows of text.
+
+Directory layout (one file per column, native byte order, no header):
+    columns.json   Format version, source file size/mtime, row counts,
+                   column dtypes and the dictionaries below
+    CUI1.bin       int32 CUI ids (see cui_set.encode_cui)
+    CUI2.bin       int32 CUI ids
+    REL.bin        uint8 codes into the REL dictionary
+    RELA.bin       uint16 codes into the RELA dictionary
+    SAB.bin        uint16 codes into the SAB dictionary
+    SUPPRESS.bin   uint8 codes into the SUPPRESS dictionary
+
+Every dictionary starts with '' (code 0), so an empty RELA is code 0.
+Rows appear in file order; rows with too few columns are left out, as
+RRFReader skips them. A malformed CUI (e.g. an empty CUI2) is stored as
+MALFORMED_CUI_ID, which is never one of ours; columns.json counts the
+rows holding one.
+
+Building needs only the standard library; reading needs NumPy
+(pip install numpy), imported when a cache is opened.
+"""
+
+import sys
+import json
+import shutil
+from array import array
+from pathlib import Path
+
+from .cui_set import parse_cui
+from .rrf_reader import RRFReader, resolve_rrf
+
+FORMAT_VERSION = 1
+META_FILE = "columns.json"
+
+# Column name → array typecode. Typecodes match the NumPy dtypes below.
+COLUMNS = {
+    'CUI1': 'i',
+    'CUI2': 'i',
+    'REL': 'B',
+    'RELA': 'H',
+    'SAB': 'H',
+    'SUPPRESS': 'B',
+}
+DTYPES = {'i': 'i4', 'B': 'u1', 'H': 'u2'}
+DICTIONARY_COLUMNS = ('REL', 'RELA', 'SAB', 'SUPPRESS')
+
+# CUI1/CUI2 id stored for a field that is not a CUI (see cui_set.parse_cui)
+MALFORMED_CUI_ID = -1
+
+# Rows buffered in memory before being appended to the column files
+FLUSH_ROWS = 1 << 20
+
+
+class ColumnCacheError(ValueError):
+    """Raised when a column cache is missing, incomplete or out of date."""
+
+
+def _numpy():
+    try:
+        import numpy
+    except ImportError:
+        raise ImportError(
+            "Reading the MRREL column cache needs NumPy (pip install numpy)"
+        ) from None
+    return numpy
+
+
+def source_signature(mrrel_file):
+    """Size and modification time of MRREL.RRF (or its compressed variant)."""
+    path = resolve_rrf(mrrel_file)
+    stat = path.stat()
+    return {'name': path.name, 'size': stat.st_size, 'mtime_ns': stat.st_mtime_ns}
+
+
+def build_mrrel_columns(mrrel_file, cache_dir, progress=None):
+    """
+    Converts MRREL.RRF into a column cache. The cache is written next to
+    cache_dir and renamed into place when complete.
+
+    Args:
+        mrrel_file (str|Path): MRREL.RRF
+        cache_dir (str|Path): Cache directory to (re)create
+        progress (callable): Optional progress(reader) callback for the scan
+
+    Returns:
+        dict: The cache's columns.json contents
+
+    Raises:
+        ColumnCacheError: If a dictionary outgrows its column's code width
+    """
+    cache_dir = Path(cache_dir)
+    partial_dir = cache_dir.with_name(cache_dir.name + '.partial')
+    shutil.rmtree(partial_dir, ignore_errors=True)
+    partial_dir.mkdir(parents=True)
+
+    signature = source_signature(mrrel_file)
+    dictionaries = {name: {'': 0} for name in DICTIONARY_COLUMNS}
+    rel_codes, rela_codes, sab_codes, suppress_codes = (
+        dictionaries[name] for name in DICTIONARY_COLUMNS
+    )
+    buffers = {name: array(typecode) for name, typecode in COLUMNS.items()}
+    cui1s, cui2s, rels, relas, sabs, suppresses = buffers.values()
+    files = {name: open(partial_dir / f"{name}.bin", 'wb') for name in COLUMNS}
+
+    def flush():
+        for name, buffer in buffers.items():
+            buffer.tofile(files[name])
+            del buffer[:]
+
+    reader = RRFReader(
+        mrrel_file,
+        columns=('CUI1', 'CUI2', 'REL', 'RELA', 'SAB', 'SUPPRESS'),
+        progress=progress,
+        progress_every=10000000,
+    )
+    stored = 0
+    malformed = 0
+    try:
+        for cui1, cui2, rel, rela, sab, suppress in reader:
+            cui1_id = parse_cui(cui1)
+            cui2_id = parse_cui(cui2)
+            if cui1_id is None or cui2_id is None:
+                malformed += 1
+                cui1_id = MALFORMED_CUI_ID if cui1_id is None else cui1_id
+                cui2_id = MALFORMED_CUI_ID if cui2_id is None else cui2_id
+            cui1s.append(cui1_id)
+            cui2s.append(cui2_id)
+            rels.append(rel_codes.setdefault(rel, len(rel_codes)))
+            relas.append(rela_codes.setdefault(rela, len(rela_codes)))
+            sabs.append(sab_codes.setdefault(sab, len(sab_codes)))
+            suppresses.append(suppress_codes.setdefault(suppress, len(suppress_codes)))
+            stored += 1
+            if stored % FLUSH_ROWS == 0:
+                flush()
+        flush()
+    except OverflowError:
+        raise ColumnCacheError(
+            f"Too many distinct values for the column cache's code widths in {mrrel_file}"
+        ) from None
+    finally:
+        for f in files.values():
+            f.close()
+
+    meta = {
+        'format_version': FORMAT_VERSION,
+        'source': signature,
+        'rows': reader.counts['rows'],
+        'stored_rows': stored,
+        'malformed_cui_rows': malformed,
+        'byteorder': sys.byteorder,
+        'columns': {name: DTYPES[typecode] for name, typecode in COLUMNS.items()},
+        'dictionaries': {name: list(codes) for name, codes in dictionaries.items()},
+    }
+    with open(partial_dir / META_FILE, 'w', encoding='utf-8') as f:
+        json.dump(meta, f, indent=2)
+
+    shutil.rmtree(cache_dir, ignore_errors=True)
+    partial_dir.rename(cache_dir)
+    return meta
+
+
+class MRRELColumns:
+    """
+    Read-only view of a column cache: each column as a memory-mapped NumPy
+    array (`columns['CUI1']`, ...), plus the dictionaries decoding the
+    REL/RELA/SAB/SUPPRESS codes.
+    """
+
+    def __init__(self, cache_dir):
+        """
+        Args:
+            cache_dir (str|Path): Directory written by build_mrrel_columns()
+
+        Raises:
+            ColumnCacheError: If the cache is missing or incomplete
+            ImportError: If NumPy is not installed
+        """
+        self.cache_dir = Path(cache_dir)
+        try:
+            with open(self.cache_dir / META_FILE, 'r', encoding='utf-8') as f:
+                meta = json.load(f)
+        except (OSError, ValueError):
+            raise ColumnCacheError(f"No MRREL column cache in {self.cache_dir}") from None
+        if meta.get('format_version') != FORMAT_VERSION:
+            raise ColumnCacheError(
+                f"Unsupported column cache version {meta.get('format_version')} "
+                f"(expected {FORMAT_VERSION}): {self.cache_dir}"
+            )
+
+        np = _numpy()
+        self.meta = meta
+        self.source = meta['source']
+        self.total_rows = meta['rows']
+        self.stored_rows = meta['stored_rows']
+        self.dictionaries = meta['dictionaries']
+
+        order = '<' if meta['byteorder'] == 'little' else '>'
+        self.columns = {}
+        for name, dtype in meta['columns'].items():
+            path = self.cache_dir / f"{name}.bin"
+            dtype = np.dtype(order + dtype)
+            if not path.exists() or path.stat().st_size != self.stored_rows * dtype.itemsize:
+                raise ColumnCacheError(f"Incomplete column cache: {path}")
+            if self.stored_rows:
+                self.columns[name] = np.memmap(path, dtype=dtype, mode='r')
+            else:
+                self.columns[name] = np.zeros(0, dtype=dtype)  # mmap cannot map an empty file
+
+    def __len__(self):
+        return self.stored_rows
+
+    def is_current(self, mrrel_file):
+        """True if the cache was built from mrrel_file as it is now."""
+        return self.source == source_signature(mrrel_file)
+
+    def lookup_table(self, column, predicate):
+        """
+        Evaluates a predicate once per dictionary value.
+
+        Args:
+            column (str): Dictionary-encoded column ('REL', 'RELA', 'SAB', 'SUPPRESS')
+            predicate (callable): predicate(value) → bool
+
+        Returns:
+            numpy.ndarray: bool array indexed by code, so that
+                `table[columns[column]]` masks the matching rows
+        """
+        np = _numpy()
+        return np.array(
+            [bool(predicate(value)) for value in self.dictionaries[column]], dtype=bool
+        )
+
+
+def open_mrrel_columns(cache_dir, mrrel_file):
+    """
+    Opens a column cache if it exists and matches mrrel_file.
+
+    Returns:
+        MRRELColumns: The cache, or None if it is missing, incomplete or stale
+    """
+    try:
+        columns = MRRELColumns(cache_dir)
+    except ColumnCacheError:
+        return None
+    return columns if columns.is_current(mrrel_file) else None
@@ -0,0 +1,527 @@
+"""
+Content-hash-cached build pipeline for the import scripts.
+
+Each Stage runs one script and declares the files it reads, the files it
+writes, and the module-level parameters (e.g. NEURO_KEYWORDS) it depends
+on. Stage dependencies follow from matching outputs to inputs.
+
+A stage is skipped when its cache key is unchanged since it last ran and
+its outputs are still what it produced. The key hashes:
+- the contents of its input files (including upstream stages' outputs, so a
+  stage reruns only if something it reads actually changed)
+- the declared parameters (by value, so reformatting does not count)
+- its script and the scripts/lib modules (and sibling scripts) it imports
+
+Outputs of every successful run are kept in a content-addressed store, so
+returning to an earlier key (e.g. reverting a parameter) restores the
+outputs instead of re-running the stage. Independent stages run
+concurrently.
+
+Usage:
+    pipeline = Pipeline(root, [Stage(...), ...])
+    pipeline.build(jobs=4)
+"""
+
+import ast
+import json
+import os
+import shutil
+import subprocess
+import sys
+import threading
+import time
+import hashlib
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait
+from pathlib import Path
+
+# Cache directory (relative to the pipeline root)
+CACHE_DIR = ".neurodb_cache"
+
+# Cache keys kept per stage (older outputs are removed from the store)
+HISTORY_SIZE = 3
+
+# Lines of a failed stage's log echoed to the console
+LOG_TAIL_LINES = 15
+
+HASH_BLOCK_SIZE = 1024 * 1024
+
+
+class PipelineError(RuntimeError):
+    """Raised for invalid stage graphs and missing source inputs."""
+
+
+class Stage:
+    """
+    One build step: a script run with fixed arguments.
+
+    Attributes:
+        name (str): Stage name (used on the command line and in logs)
+        script (str): Script path, relative to the pipeline root
+        inputs (tuple): Files read (relative paths)
+        outputs (tuple): Files written (relative paths); a stage without
+            outputs (e.g. a validator) is cached on its inputs alone
+        params (tuple): Module-level names in the script whose values are
+            part of the cache key (reported by name when they change)
+        args (tuple): Extra command-line arguments (not part of the cache
+            key; use only for arguments that do not change outputs)
+    """
+
+    def __init__(self, name, script, inputs=(), outputs=(), params=(), args=()):
+        self.name = name
+        self.script = script
+        self.inputs = tuple(inputs)
+        self.outputs = tuple(outputs)
+        self.params = tuple(params)
+        self.args = tuple(args)
+        self.deps = set()
+
+    def __repr__(self):
+        return f"Stage({self.name!r})"
+
+
+def hash_file(path):
+    """Returns the hex SHA-256 of a file's contents."""
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(HASH_BLOCK_SIZE), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def _assigned_names(node):
+    """Names bound by a top-level assignment statement (empty for other statements)."""
+    if isinstance(node, ast.Assign):
+        return [t.id for t in node.targets if isinstance(t, ast.Name)]
+    if isinstance(node, ast.AnnAssign) and isinstance(node.target, ast.Name):
+        return [node.target.id]
+    return []
+
+
+def _digest(text):
+    return hashlib.sha256(text.encode('utf-8')).hexdigest()
+
+
+def script_digests(path, params=()):
+    """
+    Hashes a script by its syntax tree, without importing it, so comments
+    and formatting do not count as changes.
+
+    The top-level assignments of the named parameters are hashed separately
+    (and left out of the code digest), so editing e.g. NEURO_KEYWORDS is
+    reported as a parameter change rather than a code change.
+
+    Args:
+        path (str|Path): Python source file
+        params (iterable): Module-level names to hash separately
+
+    Returns:
+        tuple: (code digest, {param name: digest of its assigned value})
+
+    Raises:
+        PipelineError: If a parameter is not assigned at the top level
+    """
+    params = set(params)
+    tree = ast.parse(Path(path).read_text(encoding='utf-8'))
+    values = {}
+    code = []
+    for node in tree.body:
+        names = [name for name in _assigned_names(node) if name in params]
+        if names:
+            for name in names:
+                values[name] = _digest(ast.dump(node.value))
+        else:
+            code.append(ast.dump(node))
+
+    missing = params - values.keys()
+    if missing:
+        raise PipelineError(f"Parameters not found in {path}: {sorted(missing)}")
+    return _digest('\n'.join(code)), values
+
+
+def code_files(path):
+    """
+    Returns the script plus every scripts/lib module and sibling script it
+    imports (recursively), as resolved file paths.
+    """
+    path = Path(path)
+    lib_dir = path.parent / 'lib' if path.parent.name != 'lib' else path.parent
+    seen = set()
+    pending = [path]
+    while pending:
+        current = pending.pop()
+        if current in seen or not current.exists():
+            continue
+        seen.add(current)
+        for node in ast.walk(ast.parse(current.read_text(encoding='utf-8'))):
+            if isinstance(node, ast.Import) and current.parent != lib_dir:
+                # e.g. `import parse_mrrel_associations as mrrel`
+                pending.extend(current.parent / (alias.name + '.py') for alias in node.names)
+            elif isinstance(node, ast.ImportFrom) and node.module:
+                if node.level == 0 and node.module.startswith('lib.'):
+                    pending.append(lib_dir / (node.module[len('lib.'):] + '.py'))
+                elif node.level == 1 and current.parent == lib_dir:
+                    pending.append(lib_dir / (node.module + '.py'))
+    return sorted(seen)
+
+
+class Pipeline:
+    """Dependency graph of stages sharing one build cache."""
+
+    def __init__(self, root, stages):
+        """
+        Args:
+            root (str|Path): Directory the scripts run in (paths are relative to it)
+            stages (list): Stage objects
+
+        Raises:
+            PipelineError: If two stages write the same file or the graph has a cycle
+        """
+        self.root = Path(root)
+        self.stages = {stage.name: stage for stage in stages}
+        self.cache_dir = self.root / CACHE_DIR
+        self._state_file = self.cache_dir / 'state.json'
+        self._lock = threading.Lock()
+        self._state = None
+
+        producers = {}
+        for stage in stages:
+            for output in stage.outputs:
+                if output in producers:
+                    raise PipelineError(
+                        f"{output} is written by both {producers[output]} and {stage.name}"
+                    )
+                producers[output] = stage.name
+        for stage in stages:
+            stage.deps = {producers[i] for i in stage.inputs if i in producers}
+        self._producers = producers
+        self.order = self._topological_order()
+
+    def _topological_order(self):
+        order = []
+        visiting = set()
+        done = set()
+
+        def visit(name):
+            if name in done:
+                return
+            if name in visiting:
+                raise PipelineError(f"Dependency cycle through stage {name}")
+            visiting.add(name)
+            for dep in sorted(self.stages[name].deps):
+                visit(dep)
+            visiting.discard(name)
+            done.add(name)
+            order.append(name)
+
+        for name in self.stages:
+            visit(name)
+        return order
+
+    def select(self, targets=None):
+        """Returns the named stages plus everything they depend on, in build order."""
+        if not targets:
+            return list(self.order)
+        unknown = [t for t in targets if t not in self.stages]
+        if unknown:
+            raise PipelineError(f"Unknown stages: {unknown}. Stages: {self.order}")
+
+        selected = set()
+        pending = list(targets)
+        while pending:
+            name = pending.pop()
+            if name not in selected:
+                selected.add(name)
+                pending.extend(self.stages[name].deps)
+        return [name for name in self.order if name in selected]
+
+    # Cache state
+
+    def _load_state(self):
+        if self._state is None:
+            if self._state_file.exists():
+                self._state = json.loads(self._state_file.read_text(encoding='utf-8'))
+            else:
+                self._state = {'file_hashes': {}, 'stages': {}}
+        return self._state
+
+    def _save_state(self):
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        temp = self._state_file.with_suffix('.tmp')
+        temp.write_text(json.dumps(self._state, indent=2), encoding='utf-8')
+        os.replace(temp, self._state_file)
+
+    def file_hash(self, relative_path):
+        """
+        Content hash of a file under the root, memoised on (size, mtime) so
+        large unchanged inputs (e.g. RRF files) are not re-read every build.
+
+        Returns:
+            str: Hex SHA-256, or None if the file does not exist
+        """
+        path = self.root / relative_path
+        try:
+            stat = path.stat()
+        except FileNotFoundError:
+            return None
+        signature = [stat.st_size, stat.st_mtime_ns]
+        with self._lock:
+            known = self._load_state()['file_hashes'].get(relative_path)
+        if known and known[:2] == signature:
+            return known[2]
+        digest = hash_file(path)
+        with self._lock:
+            self._load_state()['file_hashes'][relative_path] = signature + [digest]
+        return digest
+
+    def components(self, stage):
+        """
+        Everything the stage's cache key is made of.
+
+        Returns:
+            dict: {'inputs': {path: hash}, 'params': {name: hash}, 'code': {path: hash}}
+
+        Raises:
+            PipelineError: If an input is missing
+        """
+        inputs = {}
+        for relative_path in stage.inputs:
+            digest = self.file_hash(relative_path)
+            if digest is None:
+                raise PipelineError(f"Stage {stage.name}: input not found: {relative_path}")
+            inputs[relative_path] = digest
+
+        script = self.root / stage.script
+        code = {}
+        params = {}
+        for path in code_files(script):
+            digest, values = script_digests(path, stage.params if path == script else ())
+            code[str(path.relative_to(self.root))] = digest
+            params.update(values)
+        return {'inputs': inputs, 'params': params, 'code': code}
+
+    @staticmethod
+    def cache_key(components):
+        blob = json.dumps(components, sort_keys=True)
+        return hashlib.sha256(blob.encode('utf-8')).hexdigest()
+
+    def stale_reasons(self, stage, components):
+        """Describes what changed since the stage's last successful run."""
+        previous = self._load_state()['stages'].get(stage.name)
+        if previous is None:
+            return ["never built"]
+        reasons = []
+        for kind, label in (('inputs', 'input'), ('params', 'param'), ('code', 'code')):
+            before = previous['components'].get(kind, {})
+            now = components[kind]
+            for name in sorted(before.keys() | now.keys()):
+                if before.get(name) != now.get(name):
+                    reasons.append(f"{label} {name}")
+        return reasons or ["outputs modified"]
+
+    def _outputs_current(self, recorded):
+        return all(self.file_hash(path) == digest for path, digest in recorded.items())
+
+    def _object_path(self, digest):
+        return self.cache_dir / 'objects' / digest[:2] / digest
+
+    def _store_outputs(self, stage):
+        recorded = {}
+        for relative_path in stage.outputs:
+            digest = self.file_hash(relative_path)
+            if digest is None:
+                raise PipelineError(f"Stage {stage.name} did not write {relative_path}")
+            target = self._object_path(digest)
+            if not target.exists():
+                target.parent.mkdir(parents=True, exist_ok=True)
+                shutil.copy2(self.root / relative_path, target)
+            recorded[relative_path] = digest
+        return recorded
+
+    def _restore_outputs(self, recorded):
+        if not all(self._object_path(digest).exists() for digest in recorded.values()):
+            return False
+        for relative_path, digest in recorded.items():
+            destination = self.root / relative_path
+            destination.parent.mkdir(parents=True, exist_ok=True)
+            shutil.copy2(self._object_path(digest), destination)
+        return True
+
+    def _record(self, stage, key, components, recorded):
+        with self._lock:
+            state = self._load_state()
+            entry = state['stages'].setdefault(stage.name, {'history': {}})
+            entry['key'] = key
+            entry['components'] = components
+            entry['outputs'] = recorded
+            history = entry['history']
+            history.pop(key, None)
+            history[key] = recorded
+            while len(history) > HISTORY_SIZE:
+                history.pop(next(iter(history)))
+            self._save_state()
+
+    def _collect_garbage(self):
+        """Removes stored outputs no stage history refers to any more."""
+        objects_dir = self.cache_dir / 'objects'
+        if not objects_dir.exists():
+            return
+        referenced = {
+            digest
+            for entry in self._load_state()['stages'].values()
+            for recorded in entry['history'].values()
+            for digest in recorded.values()
+        }
+        for path in objects_dir.glob('*/*'):
+            if path.name not in referenced:
+                path.unlink()
+
+    # Running
+
+    def _run_script(self, stage, log_path):
+        command = [sys.executable, stage.script, *stage.args]
+        env = dict(os.environ, PYTHONHASHSEED='0')  # Reproducible set/dict ordering
+        with open(log_path, 'w', encoding='utf-8') as log:
+            result = subprocess.run(
+                command, cwd=self.root, stdout=log, stderr=subprocess.STDOUT, env=env
+            )
+        return result.returncode
+
+    def _build_stage(self, stage, force, report):
+        """
+        Brings one stage up to date (its dependencies are already built).
+
+        Returns:
+            str: 'cached', 'restored' or 'built'
+        """
+        components = self.components(stage)
+        key = self.cache_key(components)
+
+        with self._lock:
+            previous = self._load_state()['stages'].get(stage.name)
+        if not force and previous:
+            if previous['key'] == key and self._outputs_current(previous['outputs']):
+                return 'cached'
+            recorded = previous['history'].get(key)
+            if recorded is not None and self._restore_outputs(recorded):
+                self._record(stage, key, components, recorded)
+                return 'restored'
+
+        reasons = ["forced"] if force else self.stale_reasons(stage, components)
+        log_path = self.cache_dir / 'logs' / f"{stage.name}.log"
+        log_path.parent.mkdir(parents=True, exist_ok=True)
+
+        report(f"▶️  {stage.name}: running ({', '.join(reasons)})")
+        started = time.perf_counter()
+        returncode = self._run_script(stage, log_path)
+        if returncode != 0:
+            tail = log_path.read_text(encoding='utf-8', errors='replace').splitlines()[-LOG_TAIL_LINES:]
+            raise PipelineError(
+                f"exit code {returncode}, log: {log_path.relative_to(self.root)}\n" + '\n'.join(f"   {line}" for line in tail)
+            )
+
+        recorded = self._store_outputs(stage)
+        self._record(stage, key, components, recorded)
+        report(f"✅ {stage.name}: built in {time.perf_counter() - started:.1f}s")
+        return 'built'
+
+    def build(self, targets=None, jobs=1, force=(), report=print):
+        """
+        Builds the selected stages (and their dependencies), running
+        independent stages concurrently.
+
+        Args:
+            targets (list): Stage names; all stages if empty
+            jobs (int): Maximum stages running at once
+            force (iterable): Stage names to rebuild even if cached
+            report (callable): Receives one progress line per stage event
+
+        Returns:
+            dict: {stage name: status}
+
+        Raises:
+            PipelineError: If a stage fails (running stages are finished first)
+        """
+        names = self.select(targets)
+        force = set(force)
+        unknown = force - self.stages.keys()
+        if unknown:
+            raise PipelineError(f"Unknown stages: {sorted(unknown)}. Stages: {self.order}")
+        status = {}
+        failures = {}
+        remaining = list(names)
+        running = {}
+
+        with ThreadPoolExecutor(max_workers=max(1, jobs)) as executor:
+            while remaining or running:
+                if not failures:
+                    for name in list(remaining):
+                        if len(running) >= max(1, jobs):
+                            break
+                        if all(dep in status for dep in self.stages[name].deps if dep in names):
+                            remaining.remove(name)
+                            running[executor.submit(
+                                self._build_stage, self.stages[name], name in force, report
+                            )] = name
+                if not running:
+                    break
+
+                done, _ = wait(running, return_when=FIRST_COMPLETED)
+                for future in done:
+                    name = running.pop(future)
+                    try:
+                        status[name] = future.result()
+                    except (PipelineError, OSError) as e:
+                        failures[name] = e
+                        report(f"❌ {name}: {e}")
+                        continue
+                    if status[name] != 'built':
+                        report(f"✅ {name}: {status[name]}")
+
+        with self._lock:
+            self._load_state()
+            self._collect_garbage()
+            self._save_state()
+
+        if failures:
+            skipped = [name for name in names if name not in status and name not in failures]
+            if skipped:
+                report(f"⏭️  Not run: {', '.join(skipped)}")
+            raise PipelineError(f"Failed stages: {', '.join(failures)}")
+        return status
+
+    def status(self, targets=None):
+        """
+        Reports which selected stages would run, without running anything.
+
+        Stages downstream of a stale stage are reported as waiting on it,
+        since their keys depend on outputs not yet produced.
+
+        Returns:
+            list: [(stage name, 'fresh'|'stale'|'blocked', [reasons])]
+        """
+        rows = []
+        stale = set()
+        for name in self.select(targets):
+            stage = self.stages[name]
+            blocked_by = sorted(stage.deps & stale)
+            if blocked_by:
+                stale.add(name)
+                rows.append((name, 'blocked', [f"after {', '.join(blocked_by)}"]))
+                continue
+            try:
+                components = self.components(stage)
+            except PipelineError as e:
+                stale.add(name)
+                rows.append((name, 'stale', [str(e)]))
+                continue
+            key = self.cache_key(components)
+            previous = self._load_state()['stages'].get(name)
+            if previous and previous['key'] == key and self._outputs_current(previous['outputs']):
+                rows.append((name, 'fresh', []))
+            elif previous and key in previous['history']:
+                stale.add(name)
+                rows.append((name, 'stale', ["outputs restorable from cache"]))
+            else:
+                stale.add(name)
+                rows.append((name, 'stale', self.stale_reasons(stage, components)))
+        return rows
@@ -0,0 +1,137 @@
+"""
+Bounded producer/consumer stages for the RRF scans.
+
+A scan used to alternate between waiting for the disk and parsing, so the
+two were never busy at the same time. This module provides the two stages
+the scans are now built from, both bounded so a fast producer cannot run
+ahead of a slow consumer by more than a fixed amount of memory:
+
+- Prefetcher runs a producer (e.g. the raw block reads of an RRF file) in
+  a background thread that fills a bounded queue while the caller parses
+  the previous items. File reads release the GIL, so disk and parser
+  overlap; when the queue is full the producer waits (backpressure).
+- ordered_imap() feeds a process pool (e.g. byte-range scans of
+  MRCONSO/MRREL chunks) with at most `window` tasks in flight and yields
+  their results in submission order to the aggregating caller. Unlike
+  Pool.imap(), which submits every task at once and buffers results
+  without limit, it stops submitting while the caller is behind.
+
+Parsing itself stays in processes (the byte-range workers) rather than
+threads, since splitting and filtering rows holds the GIL.
+
+Usage:
+    with Prefetcher(raw_blocks(f)) as blocks:
+        for block in blocks:
+            parse(block)
+
+    for result in ordered_imap(pool, scan_chunk, byte_ranges, window=2 * workers):
+        aggregate(result)
+"""
+
+import queue
+import threading
+from collections import deque
+
+# Items buffered ahead of the consumer
+PREFETCH_DEPTH = 16
+
+# Pool tasks in flight per worker process in ordered_imap()
+TASKS_PER_WORKER = 2
+
+_END = object()
+
+
+class Prefetcher:
+    """
+    Iterates over a producer iterable that runs ahead in a background
+    thread, through a queue of at most `depth` items.
+
+    Exceptions raised by the producer are re-raised to the consumer. The
+    producer must only be consumed through the Prefetcher; close() (or
+    leaving the with block) stops it, and must happen before the resources
+    it reads from are closed.
+    """
+
+    def __init__(self, producer, depth=PREFETCH_DEPTH):
+        """
+        Args:
+            producer (iterable): Items to produce (iterated in the thread)
+            depth (int): Maximum items buffered ahead of the consumer
+        """
+        self._producer = producer
+        self._queue = queue.Queue(depth)
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._fill, daemon=True)
+        self._thread.start()
+
+    def _fill(self):
+        """Produces items into the queue (runs in the background thread)."""
+        try:
+            for item in self._producer:
+                if not self._put(item):
+                    return
+        except Exception as e:
+            self._put(_Failure(e))
+        self._put(_END)
+
+    def _put(self, item):
+        # Give up (instead of blocking forever) once the consumer has closed
+        while not self._stop.is_set():
+            try:
+                self._queue.put(item, timeout=0.1)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    def __iter__(self):
+        while True:
+            item = self._queue.get()
+            if item is _END:
+                self._queue.put(_END)  # Later iterations also see the end
+                return
+            if isinstance(item, _Failure):
+                raise item.error
+            yield item
+
+    def close(self):
+        """Stops the producer thread and waits for it to finish."""
+        self._stop.set()
+        self._thread.join()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, traceback):
+        self.close()
+
+
+class _Failure:
+    """Wraps a producer exception on its way through the queue."""
+
+    def __init__(self, error):
+        self.error = error
+
+
+def ordered_imap(pool, func, items, window):
+    """
+    Like pool.imap(func, items), but with at most `window` tasks submitted
+    and not yet consumed, so results never pile up faster than the caller
+    aggregates them.
+
+    Args:
+        pool (multiprocessing.Pool): Worker pool
+        func (callable): Picklable task function, called as func(item)
+        items (iterable): Task arguments, submitted in order
+        window (int): Maximum tasks in flight (e.g. TASKS_PER_WORKER × workers)
+
+    Yields:
+        Each task's result, in the order of `items`
+    """
+    pending = deque()
+    for item in items:
+        if len(pending) >= window:
+            yield pending.popleft().get()
+        pending.append(pool.apply_async(func, (item,)))
+    while pending:
+        yield pending.popleft().get()
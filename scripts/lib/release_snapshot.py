@@ -0,0 +1,142 @@
+"""
+Per-CUI content hashes of a UMLS release, for incremental re-imports.
+
+A release snapshot holds two 64-bit digests per neuroscience CUI:
+
+- concept: every MRCONSO, MRDEF and MRSTY row for the CUI that the importer
+  reads, in file order (MRCONSO row order decides the preferred term and
+  synonym order, so reordering counts as a change)
+- relationships: every MRREL row with the CUI at either end (CUI1/CUI2)
+
+Only the columns the import scripts actually consume are hashed, so edits
+to columns nobody reads (e.g. CVF) do not trigger reprocessing. Comparing
+the snapshots of two releases gives the CUIs whose concepts or
+relationships must be re-extracted (see import_umls_delta.py).
+
+Snapshots are stored as gzipped JSON:
+    {"release": "2025AB", "concepts": {CUI: hex}, "relationships": {CUI: hex}}
+"""
+
+import gzip
+import json
+from hashlib import blake2b
+from pathlib import Path
+
+from .rrf_reader import RRFReader
+
+# Columns hashed per table: what import_umls_neuroscience.py and
+# parse_mrrel_associations.py read (plus the row filters they apply)
+CONCEPT_COLUMNS = ('CUI', 'ISPREF', 'SAB', 'TTY', 'CODE', 'STR')
+DEFINITION_COLUMNS = ('CUI', 'SAB', 'DEF')
+SEMANTIC_TYPE_COLUMNS = ('CUI', 'TUI')
+RELATIONSHIP_COLUMNS = ('CUI1', 'REL', 'CUI2', 'RELA', 'SAB')
+
+
+def fold_row(digest, row):
+    """Folds one row (tuple of strings) into a running 8-byte digest."""
+    return blake2b(digest + '|'.join(row).encode('utf-8'), digest_size=8).digest()
+
+
+def hash_release(meta_dir, cui_filter, progress=None):
+    """
+    Hashes the rows of a release that matter for the given CUIs.
+
+    Args:
+        meta_dir (str|Path): Release META directory (holding MRCONSO.RRF etc.)
+        cui_filter (CUISet): Neuroscience CUIs (from the release's filter index)
+        progress (callable): Optional progress(table_name) before each table
+
+    Returns:
+        dict: {
+            'concepts': {CUI: digest bytes},
+            'relationships': {CUI: digest bytes},
+            'order': [CUI, ...] in first-seen MRCONSO order (the order the
+                importer creates concept records in)
+        }
+    """
+    meta_dir = Path(meta_dir)
+    concepts = {}
+    relationships = {}
+    empty = b''
+
+    if progress:
+        progress('MRCONSO.RRF')
+    reader = RRFReader(
+        meta_dir / 'MRCONSO.RRF',
+        columns=CONCEPT_COLUMNS,
+        cui_filter=cui_filter,
+        where={'LAT': 'ENG', 'SUPPRESS': 'N'},
+    )
+    for row in reader:
+        cui = row[0]
+        concepts[cui] = fold_row(concepts.get(cui, empty), row)
+    order = list(concepts)
+
+    for table, columns, where in (
+        ('MRDEF.RRF', DEFINITION_COLUMNS, {'SUPPRESS': 'N'}),
+        ('MRSTY.RRF', SEMANTIC_TYPE_COLUMNS, None),
+    ):
+        if progress:
+            progress(table)
+        reader = RRFReader(meta_dir / table, columns=columns, cui_filter=cui_filter, where=where)
+        for row in reader:
+            cui = row[0]
+            concepts[cui] = fold_row(concepts.get(cui, empty), row)
+
+    if progress:
+        progress('MRREL.RRF')
+    reader = RRFReader(
+        meta_dir / 'MRREL.RRF',
+        columns=RELATIONSHIP_COLUMNS,
+        cui_filter=cui_filter,
+        cui_columns=('CUI1', 'CUI2'),
+        where={'SUPPRESS': 'N'},
+        progress_every=10000000,
+    )
+    for row in reader:
+        cui1, cui2 = row[0], row[2]
+        if cui1 in cui_filter:
+            relationships[cui1] = fold_row(relationships.get(cui1, empty), row)
+        if cui2 in cui_filter and cui2 != cui1:
+            relationships[cui2] = fold_row(relationships.get(cui2, empty), row)
+
+    return {'concepts': concepts, 'relationships': relationships, 'order': order}
+
+
+def diff_digests(old, new):
+    """
+    Compares two {CUI: digest} maps.
+
+    Returns:
+        tuple: (added, removed, changed) sets of CUIs
+    """
+    added = new.keys() - old.keys()
+    removed = old.keys() - new.keys()
+    changed = {cui for cui in new.keys() & old.keys() if new[cui] != old[cui]}
+    return added, removed, changed
+
+
+def save_snapshot(path, release, hashes):
+    """Writes a release snapshot (gzipped JSON) from hash_release() output."""
+    snapshot = {
+        'release': release,
+        'concepts': {cui: digest.hex() for cui, digest in hashes['concepts'].items()},
+        'relationships': {cui: digest.hex() for cui, digest in hashes['relationships'].items()},
+    }
+    with gzip.open(Path(path), 'wt', encoding='utf-8') as f:
+        json.dump(snapshot, f)
+
+
+def load_snapshot(path):
+    """
+    Reads a release snapshot.
+
+    Returns:
+        dict: {'release': str, 'concepts': {CUI: digest bytes},
+               'relationships': {CUI: digest bytes}}
+    """
+    with gzip.open(Path(path), 'rt', encoding='utf-8') as f:
+        snapshot = json.load(f)
+    for key in ('concepts', 'relationships'):
+        snapshot[key] = {cui: bytes.fromhex(digest) for cui, digest in snapshot[key].items()}
+    return snapshot
@@ -0,0 +1,507 @@
+"""
+Streaming reader for UMLS Rich Release Format (RRF) files.
+
+RRF files are pipe-delimited, one row per line, with a trailing '|' on every
+row. Every UMLS script used to re-read these files with its own
+`line.strip().split('|')` loop. This module gives them one shared reader that:
+
+- Reads and decodes large blocks instead of one line at a time, with the
+  disk reads running ahead in a background thread (see prefetch.py) so
+  reading and parsing overlap
+- Splits only as far as the right-most column the caller needs
+- Applies pushed-down predicates (CUI-set membership, column equality)
+  before any row tuple is built
+- Reads gzip/bz2/xz/zstd-compressed files (e.g. MRREL.RRF.gz) in place of
+  missing plain ones, decompressing in a background thread
+  (see compressed_rrf.py)
+
+Usage:
+    reader = RRFReader(MRCONSO_FILE, columns=('CUI', 'SAB', 'STR'),
+                       cui_filter=neuro_cuis,
+                       where={'LAT': 'ENG', 'SUPPRESS': 'N'})
+    for cui, sab, term_str in reader:
+        ...
+    print(reader.counts)
+"""
+
+import os
+from collections import defaultdict
+from itertools import accumulate
+from operator import itemgetter
+from pathlib import Path
+
+from .cui_set import CUI_LENGTH, CUISet, parse_cui
+from .compressed_rrf import DecompressingStream, is_compressed, resolve_rrf
+from .prefetch import Prefetcher
+
+# Column layouts (UMLS Reference Manual, section 3.3)
+RRF_COLUMNS = {
+    'MRCONSO': (
+        'CUI', 'LAT', 'TS', 'LUI', 'STT', 'SUI', 'ISPREF', 'AUI', 'SAUI',
+        'SCUI', 'SDUI', 'SAB', 'TTY', 'CODE', 'STR', 'SRL', 'SUPPRESS', 'CVF',
+    ),
+    'MRSTY': ('CUI', 'TUI', 'STN', 'STY', 'ATUI', 'CVF'),
+    'MRDEF': ('CUI', 'AUI', 'ATUI', 'SATUI', 'SAB', 'DEF', 'SUPPRESS', 'CVF'),
+    'MRREL': (
+        'CUI1', 'AUI1', 'STYPE1', 'REL', 'CUI2', 'AUI2', 'STYPE2', 'RELA',
+        'RUI', 'SRUI', 'SAB', 'SL', 'RG', 'DIR', 'SUPPRESS', 'CVF',
+    ),
+}
+
+# Bytes read (and decoded) per block
+BLOCK_SIZE = 256 * 1024
+
+
+def layout_for(path):
+    """
+    Returns the column layout for an RRF file, inferred from its name.
+
+    Args:
+        path (str|Path): RRF file path (e.g. .../META/MRCONSO.RRF)
+
+    Returns:
+        tuple: Column names in file order
+
+    Raises:
+        ValueError: If the file name is not a known RRF table
+    """
+    table = Path(path).name.split('.')[0].upper()
+    if table not in RRF_COLUMNS:
+        raise ValueError(
+            f"Unknown RRF table '{table}'. "
+            f"Known tables: {list(RRF_COLUMNS.keys())}"
+        )
+    return RRF_COLUMNS[table]
+
+
+def split_byte_ranges(path, chunks):
+    """
+    Splits an RRF file into byte ranges that start and end on row boundaries.
+
+    Args:
+        path (str|Path): RRF file to split
+        chunks (int): Desired number of ranges (fewer are returned for
+            files with too few rows)
+
+    Returns:
+        list: [(start, end), ...] covering the whole file, in file order;
+            a single (0, None) range for a compressed file, which cannot
+            be split
+    """
+    path = resolve_rrf(path)
+    if is_compressed(path):
+        return [(0, None)]
+    size = Path(path).stat().st_size
+    if size == 0:
+        return []
+
+    boundaries = [0]
+    with open(path, 'rb') as f:
+        for i in range(1, chunks):
+            target = max(size * i // chunks, boundaries[-1])
+            f.seek(target)
+            if target > 0:
+                f.readline()  # Advance to the start of the next row
+            position = f.tell()
+            if position >= size:
+                break
+            if position > boundaries[-1]:
+                boundaries.append(position)
+    boundaries.append(size)
+
+    return list(zip(boundaries[:-1], boundaries[1:]))
+
+
+def input_size(path):
+    """Size on disk of an RRF file, or of its compressed variant (see resolve_rrf())."""
+    return resolve_rrf(path).stat().st_size
+
+
+def open_rrf(path, block_size=BLOCK_SIZE):
+    """
+    Opens an RRF file for block reads: the plain file, or a
+    DecompressingStream over its compressed variant.
+    """
+    path = resolve_rrf(path)
+    if is_compressed(path):
+        return DecompressingStream(path, block_size)
+    return open(path, 'rb')
+
+
+def _raw_blocks(f, block_size=BLOCK_SIZE, byte_range=None):
+    """Yields the undecoded bytes of an open file (or of its byte range) block by block."""
+    start, end = byte_range if byte_range else (0, None)
+    remaining = None if end is None else end - start
+
+    if start:
+        if isinstance(f, DecompressingStream):
+            raise ValueError(f"Byte ranges need an uncompressed file: {f.path}")
+        f.seek(start)
+    while remaining is None or remaining > 0:
+        size = block_size if remaining is None else min(block_size, remaining)
+        block = f.read(size)
+        if not block:
+            break
+        if remaining is not None:
+            remaining -= len(block)
+        yield block
+
+
+def _split_blocks(raw_blocks, offset=0):
+    """
+    Cuts raw blocks from _raw_blocks() at newlines and decodes them, as
+    (byte offset of the block's first row, list of rows); `offset` is the
+    position of the first raw block.
+    """
+    tail = b''
+    for block in raw_blocks:
+        if tail:
+            block = tail + block
+        cut = block.rfind(b'\n') + 1
+        if cut == 0:
+            tail = block
+            continue
+        tail = block[cut:]
+        lines = block[:cut].decode('utf-8').split('\n')
+        lines.pop()  # Empty string after the final newline
+        yield offset, lines
+        offset += cut
+    if tail:
+        yield offset, [tail.decode('utf-8')]
+
+
+def _read_blocks(f, block_size=BLOCK_SIZE, byte_range=None):
+    """iter_blocks() over an open file from open_rrf()."""
+    start = byte_range[0] if byte_range else 0
+    return _split_blocks(_raw_blocks(f, block_size, byte_range), start)
+
+
+def iter_blocks(path, block_size=BLOCK_SIZE, byte_range=None):
+    """
+    Yields the rows of an RRF file one block at a time, as
+    (byte offset of the block's first row, list of rows without the
+    trailing newline).
+
+    Blocks are cut at the last newline before decoding, so multi-byte UTF-8
+    characters are never split. Compressed files are read through
+    open_rrf(); their offsets count decompressed bytes.
+
+    Args:
+        path (str|Path): RRF file to read
+        block_size (int): Bytes read per block
+        byte_range (tuple): Optional (start, end) from split_byte_ranges();
+            only rows inside the range are yielded
+    """
+    with open_rrf(path, block_size) as f:
+        yield from _read_blocks(f, block_size, byte_range)
+
+
+def iter_lines(path, block_size=BLOCK_SIZE, byte_range=None):
+    """
+    Yields the rows of an RRF file one block at a time, as lists of strings
+    without the trailing newline (see iter_blocks()).
+    """
+    for _, lines in iter_blocks(path, block_size, byte_range):
+        yield lines
+
+
+def line_offsets(lines, offset):
+    """Byte offsets of each row in a block from iter_blocks()."""
+    return list(accumulate(
+        (len(line) + 1 if line.isascii() else len(line.encode('utf-8')) + 1
+         for line in lines[:-1]),
+        initial=offset,
+    ))
+
+
+def _flagged(cui_flags, cui):
+    """Whether a raw CUI field is set in a CUISet flag array (False if malformed)."""
+    cui_id = parse_cui(cui)
+    return cui_id is not None and bool(cui_flags[cui_id])
+
+
+class RRFReader:
+    """
+    Column-projecting, predicate-filtering iterator over an RRF file.
+
+    Yields one tuple per matching row holding the requested columns, in the
+    order they were requested.
+
+    Filters run cheapest-first:
+    1. CUI-set membership (on the first column, checked before splitting;
+       a CUISet is tested on its flag array without building a CUI string)
+    2. Column equality predicates from `where`, in the order given
+
+    `counts` records how many rows survived each filter so callers can report
+    their filter-stage statistics without counting rows themselves:
+        {'rows': ..., 'cui_match': ..., 'LAT': ..., 'SUPPRESS': ...}
+
+    `bytes_read` (out of `total_bytes`) tracks how far into the file (or
+    byte range) the scan has got, to the nearest block, for progress ETAs.
+
+    With row_offsets=True each tuple is prefixed with the row's byte offset,
+    so a caller can keep just the offset of a row it wants and re-read it
+    later with read_rows_at().
+    """
+
+    def __init__(self, path, columns, where=None, cui_filter=None,
+                 cui_columns=None, layout=None, byte_range=None,
+                 progress=None, progress_every=1000000, row_offsets=False):
+        """
+        Args:
+            path (str|Path): RRF file to read
+            columns (tuple): Column names to project, e.g. ('CUI', 'STR')
+            where (dict): {column: value} equality predicates, applied in order
+            cui_filter (container): Only keep rows whose CUI is in this
+                container (a CUISet, or any object supporting `in`)
+            cui_columns (tuple): Columns tested against cui_filter; a row
+                passes if any of them matches. Defaults to the first column.
+            layout (tuple): Column layout; inferred from the file name if omitted
+            byte_range (tuple): Optional (start, end) from split_byte_ranges()
+                to read only part of the file (e.g. in a worker process)
+            progress (callable): Called as progress(reader) roughly every
+                `progress_every` rows
+            progress_every (int): Row interval for progress callbacks
+            row_offsets (bool): Prefix each tuple with the row's byte offset
+        """
+        self.path = Path(path)
+        self.layout = tuple(layout) if layout else layout_for(self.path)
+        self.columns = tuple(columns)
+        self.where = dict(where or {})
+        self.cui_filter = cui_filter
+        self.cui_columns = tuple(cui_columns or self.layout[:1])
+        self.byte_range = byte_range
+        self.progress = progress
+        self.progress_every = progress_every
+        self.row_offsets = row_offsets
+        self.counts = {'rows': 0}
+        self.bytes_read = 0
+        self.total_bytes = None
+
+        index = {name: i for i, name in enumerate(self.layout)}
+        for name in self.columns + tuple(self.where) + self.cui_columns:
+            if name not in index:
+                raise ValueError(
+                    f"Unknown column '{name}' for {self.path.name}. "
+                    f"Valid columns: {list(self.layout)}"
+                )
+
+        projection = [index[name] for name in self.columns]
+        self._project = (
+            itemgetter(*projection) if len(projection) > 1
+            else lambda cols, i=projection[0]: (cols[i],)
+        )
+        self._predicates = [(name, index[name], value) for name, value in self.where.items()]
+        self._cui_indexes = [index[name] for name in self.cui_columns]
+        self._max_index = max(
+            projection
+            + [i for _, i, _ in self._predicates]
+            + self._cui_indexes
+        )
+
+    def __iter__(self):
+        cui_filter = self.cui_filter
+        cui_flags = cui_filter.flags if isinstance(cui_filter, CUISet) else None
+        first_column_cui = cui_filter is not None and self._cui_indexes == [0]
+        other_column_cuis = (
+            self._cui_indexes if cui_filter is not None and not first_column_cui
+            else None
+        )
+        # RRF files are sorted by their first column, so a CUI there is only
+        # looked up in the flag array once per run of rows with that CUI
+        run_column_cui = (
+            cui_flags is not None and other_column_cuis is not None
+            and 0 in other_column_cuis
+        )
+        if run_column_cui:
+            other_column_cuis = [i for i in other_column_cuis if i != 0]
+        project = self._project
+        max_index = self._max_index
+        maxsplit = max_index + 1
+
+        # All predicates are tested with one tuple comparison; the failing
+        # stage is only looked up for rows that do not pass.
+        predicates = [(i, value) for _, i, value in self._predicates]
+        predicate_values = itemgetter(*[i for i, _ in predicates]) if predicates else None
+        expected = tuple(value for _, value in predicates)
+        if len(predicates) == 1:
+            expected = expected[0]
+        failed_at = [0] * len(predicates)
+
+        row_offsets = self.row_offsets
+        offsets = None
+
+        rows = 0
+        candidates = 0
+        next_progress = self.progress_every
+
+        run_cui = None
+        run_kept = False
+
+        for block_offset, lines in self._blocks():
+            if row_offsets:
+                # offsets[rows - first_row] is the offset of the current row
+                offsets = line_offsets(lines, block_offset)
+                first_row = rows + 1
+            for line in lines:
+                rows += 1
+                # Stage: CUI membership on the first column, before splitting
+                if first_column_cui:
+                    if cui_flags is not None:
+                        cui = line[:CUI_LENGTH]
+                        if cui != run_cui:
+                            run_cui = cui
+                            run_kept = _flagged(cui_flags, cui)
+                        if not run_kept:
+                            continue
+                    elif line[:CUI_LENGTH] not in cui_filter:
+                        continue
+
+                cols = line.split('|', maxsplit)
+                if len(cols) <= max_index:
+                    continue
+
+                # Stage: CUI membership on other columns (e.g. CUI1/CUI2)
+                if other_column_cuis is not None:
+                    if cui_flags is not None:
+                        if run_column_cui:
+                            cui = cols[0]
+                            if cui != run_cui:
+                                run_cui = cui
+                                run_kept = _flagged(cui_flags, cui)
+                        if not run_kept:
+                            for i in other_column_cuis:
+                                if _flagged(cui_flags, cols[i]):
+                                    break
+                            else:
+                                continue
+                    else:
+                        for i in other_column_cuis:
+                            if cols[i] in cui_filter:
+                                break
+                        else:
+                            continue
+
+                candidates += 1
+
+                # Stage: column equality predicates
+                if predicate_values is not None and predicate_values(cols) != expected:
+                    for stage, (i, value) in enumerate(predicates):
+                        if cols[i] != value:
+                            failed_at[stage] += 1
+                            break
+                    continue
+
+                if offsets is None:
+                    yield project(cols)
+                else:
+                    yield (offsets[rows - first_row],) + project(cols)
+
+            self._update_counts(rows, candidates, failed_at)
+            if self.progress and rows >= next_progress:
+                self.progress(self)
+                next_progress = (rows // self.progress_every + 1) * self.progress_every
+
+        self._update_counts(rows, candidates, failed_at)
+        self.bytes_read = self.total_bytes
+
+    def _blocks(self):
+        """
+        iter_blocks() over the reader's file and byte range, keeping
+        total_bytes / bytes_read up to date. Progress is measured in bytes
+        on disk: for a compressed file, the compressed bytes consumed.
+
+        Plain files are read ahead by a Prefetcher thread; compressed ones
+        already are, by their DecompressingStream.
+        """
+        with open_rrf(self.path) as f:
+            if isinstance(f, DecompressingStream):
+                self.total_bytes = f.size
+                for block in _read_blocks(f, byte_range=self.byte_range):
+                    self.bytes_read = f.position or self.bytes_read
+                    yield block
+                return
+
+            start, end = self.byte_range if self.byte_range else (0, None)
+            if end is None:
+                end = os.fstat(f.fileno()).st_size
+            self.total_bytes = end - start
+            with Prefetcher(_raw_blocks(f, byte_range=self.byte_range)) as raw_blocks:
+                for block_offset, lines in _split_blocks(raw_blocks, start):
+                    self.bytes_read = block_offset - start
+                    yield block_offset, lines
+
+    def _update_counts(self, rows, candidates, failed_at):
+        """Refresh `counts` from the running per-stage counters."""
+        self.counts['rows'] = rows
+        if self.cui_filter is not None:
+            self.counts['cui_match'] = candidates
+        remaining = candidates
+        for (name, _, _), failed in zip(self._predicates, failed_at):
+            remaining -= failed
+            self.counts[name] = remaining
+
+    @property
+    def rows_read(self):
+        """Total rows read so far (including filtered-out rows)."""
+        return self.counts['rows']
+
+
+def read_rows_at(path, offsets, columns, layout=None):
+    """
+    Re-reads individual rows by byte offset (as recorded by
+    RRFReader(row_offsets=True)), seeking in ascending offset order (or,
+    for a compressed file, in one sequential pass).
+
+    Args:
+        path (str|Path): RRF file the offsets refer to
+        offsets (iterable): Byte offsets of row starts
+        columns (tuple): Column names to project
+        layout (tuple): Column layout; inferred from the file name if omitted
+
+    Yields:
+        tuple: (offset, row tuple with the requested columns)
+    """
+    layout = tuple(layout) if layout else layout_for(path)
+    index = {name: i for i, name in enumerate(layout)}
+    projection = [index[name] for name in columns]
+    maxsplit = max(projection) + 1
+
+    path = resolve_rrf(path)
+    if is_compressed(path):
+        # No seeking in a compressed stream: one pass, picking out the rows
+        wanted = set(offsets)
+        remaining = len(wanted)
+        for block_offset, lines in iter_blocks(path):
+            if not remaining:
+                break
+            for offset, line in zip(line_offsets(lines, block_offset), lines):
+                if offset in wanted:
+                    cols = line.split('|', maxsplit)
+                    yield offset, tuple(cols[i] for i in projection)
+                    remaining -= 1
+        return
+
+    with open(path, 'rb') as f:
+        for offset in sorted(offsets):
+            f.seek(offset)
+            cols = f.readline().decode('utf-8').rstrip('\n').split('|', maxsplit)
+            yield offset, tuple(cols[i] for i in projection)
+
+
+def load_semantic_types(mrsty_path, cui_filter=None):
+    """
+    Builds a CUI → semantic type names mapping from MRSTY.RRF.
+
+    Args:
+        mrsty_path (str|Path): Path to MRSTY.RRF
+        cui_filter (container): Optional CUI set to restrict the mapping to
+
+    Returns:
+        defaultdict: {CUI: {semantic_type_name, ...}}
+    """
+    cui_types = defaultdict(set)
+    reader = RRFReader(mrsty_path, columns=('CUI', 'STY'), cui_filter=cui_filter)
+    for cui, semantic_type in reader:
+        cui_types[cui].add(semantic_type)
+    return cui_types
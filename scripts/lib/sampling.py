@@ -0,0 +1,194 @@
+"""
+Deterministic CUI sampling for fast development runs (--sample).
+
+A full import runs over all 325K concepts, which is slow when iterating on
+a later stage (map_umls_to_schema.py, convert_umls_to_lexstream.py, ...).
+With `--sample FRACTION`, every pipeline script works on a hash-selected
+fraction of the CUIs instead. The selection depends only on the CUI (and
+the fraction), so MRSTY, MRCONSO, MRDEF and MRREL keep the same concepts
+and a sampled run is internally consistent end to end; it is also the same
+selection across runs, machines and UMLS releases.
+
+Sampled runs live in a workspace, .neurodb_sample/<fraction>/, that mirrors
+the repository layout: the sampled RRF files are written under the same
+relative META path, and the scripts change into the workspace, so their
+imports/umls/ outputs never overwrite the full ones. Each RRF file is
+sampled once and re-sampled only when its source changes. MRREL rows are
+kept by CUI1, so each sampled concept keeps all of its relationships and
+row counts scale linearly with the fraction (for extrapolating timings).
+
+Usage:
+    add_sample_argument(parser)
+    args = parser.parse_args()
+    if args.sample:
+        enter_sample(args.sample, UMLS_META_DIR, ['MRCONSO.RRF', 'MRDEF.RRF'])
+"""
+
+import os
+import json
+import hashlib
+import argparse
+from pathlib import Path
+
+from .compressed_rrf import resolve_rrf
+from .rrf_reader import iter_lines, layout_for
+
+# Workspace root (relative to the repository root / working directory)
+SAMPLE_ROOT = Path(".neurodb_sample")
+SAMPLE_META_FILE = "sample.json"
+
+# Column whose CUI selects a row, per RRF table
+SAMPLE_COLUMNS = {
+    'MRCONSO': 'CUI',
+    'MRSTY': 'CUI',
+    'MRDEF': 'CUI',
+    'MRREL': 'CUI1',
+}
+
+HASH_RANGE = 1 << 64
+
+
+class CUISample:
+    """
+    Stable hash selection of a fraction of CUIs: `cui in sample` is true for
+    about `fraction` of all CUIs, always the same ones.
+    """
+
+    def __init__(self, fraction):
+        if not 0 < fraction <= 1:
+            raise ValueError(f"Sample fraction must be in (0, 1], got {fraction}")
+        self.fraction = fraction
+        self._threshold = int(fraction * HASH_RANGE)
+
+    def __contains__(self, cui):
+        digest = hashlib.blake2b(cui.encode('ascii'), digest_size=8).digest()
+        return int.from_bytes(digest, 'little') < self._threshold
+
+
+def sample_fraction(value):
+    """argparse type for --sample: a fraction in (0, 1], or a percentage like '1%'."""
+    try:
+        fraction = float(value[:-1]) / 100 if value.endswith('%') else float(value)
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"invalid sample fraction: {value!r}") from None
+    if not 0 < fraction <= 1:
+        raise argparse.ArgumentTypeError(f"sample fraction must be in (0, 1]: {value!r}")
+    return fraction
+
+
+def add_sample_argument(parser):
+    """Adds the shared --sample option to a script's argument parser."""
+    parser.add_argument(
+        '--sample', type=sample_fraction, metavar='FRACTION',
+        help=f"Run on a stable hash-selected fraction of CUIs (e.g. 0.01 or 1%%), "
+             f"in the {SAMPLE_ROOT}/<fraction>/ workspace"
+    )
+
+
+def sample_workspace(fraction, root='.'):
+    """Workspace directory of a sample fraction (e.g. .neurodb_sample/0.01)."""
+    return Path(root) / SAMPLE_ROOT / f"{fraction:g}"
+
+
+def sampled_meta_dir(meta_dir):
+    """Where a META directory's sampled files go, relative to the workspace."""
+    meta_dir = Path(meta_dir)
+    return meta_dir if not meta_dir.is_absolute() else Path("META")
+
+
+def _source_signature(path):
+    stat = path.stat()
+    return {'name': path.name, 'size': stat.st_size, 'mtime_ns': stat.st_mtime_ns}
+
+
+def sample_rrf(source, destination, sample):
+    """
+    Writes the rows of an RRF file whose CUI is in the sample.
+
+    Args:
+        source (str|Path): RRF file (or its compressed variant, see resolve_rrf())
+        destination (str|Path): Sampled, uncompressed RRF file
+        sample (CUISample): The selection
+
+    Returns:
+        dict: {'rows': rows read, 'kept': rows written}
+    """
+    column = layout_for(source).index(SAMPLE_COLUMNS[Path(source).name.split('.')[0].upper()])
+    partial = Path(str(destination) + '.partial')
+    rows = kept = 0
+    last_cui = None
+    keep = False
+    with open(partial, 'w', encoding='utf-8', newline='\n') as out:
+        for lines in iter_lines(source):
+            for line in lines:
+                rows += 1
+                cui = line.split('|', column + 1)[column]
+                # Rows of a CUI are mostly consecutive, so it is hashed once per run
+                if cui != last_cui:
+                    last_cui = cui
+                    keep = cui in sample
+                if keep:
+                    out.write(line)
+                    out.write('\n')
+                    kept += 1
+    os.replace(partial, destination)
+    return {'rows': rows, 'kept': kept}
+
+
+def prepare_sample(fraction, meta_dir, rrf_files, root='.'):
+    """
+    Makes sure the sample workspace holds up-to-date sampled copies of
+    rrf_files, and an imports/umls/ directory.
+
+    Args:
+        fraction (float): Sample fraction
+        meta_dir (str|Path): META directory of the full release (relative to root)
+        rrf_files (iterable): File names to sample (e.g. 'MRCONSO.RRF')
+        root (str|Path): Repository root / working directory of the full run
+
+    Returns:
+        Path: The workspace directory
+    """
+    workspace = sample_workspace(fraction, root)
+    target_dir = workspace / sampled_meta_dir(meta_dir)
+    target_dir.mkdir(parents=True, exist_ok=True)
+    (workspace / "imports/umls").mkdir(parents=True, exist_ok=True)
+
+    meta_path = workspace / SAMPLE_META_FILE
+    try:
+        with open(meta_path, 'r', encoding='utf-8') as f:
+            meta = json.load(f)
+    except (OSError, ValueError):
+        meta = {'fraction': fraction, 'files': {}}
+
+    sample = CUISample(fraction)
+    for name in rrf_files:
+        source = resolve_rrf(Path(root) / meta_dir / name)
+        key = str(target_dir.relative_to(workspace) / name)
+        signature = _source_signature(source)
+        recorded = meta['files'].get(key)
+        if recorded and recorded['source'] == signature and (target_dir / name).exists():
+            continue
+
+        print(f"🎲 Sampling {fraction:.2%} of CUIs from {source}...")
+        counts = sample_rrf(source, target_dir / name, sample)
+        print(f"   ✅ Kept {counts['kept']:,} of {counts['rows']:,} rows")
+        meta['files'][key] = dict(counts, source=signature)
+        with open(meta_path, 'w', encoding='utf-8') as f:
+            json.dump(meta, f, indent=2)
+    return workspace
+
+
+def enter_sample(fraction, meta_dir=None, rrf_files=()):
+    """
+    Prepares the sample workspace (see prepare_sample()) and makes it the
+    working directory, so the script's relative input and output paths
+    resolve inside it.
+
+    Returns:
+        Path: The sampled META directory, relative to the new working directory
+    """
+    workspace = prepare_sample(fraction, meta_dir or '.', rrf_files)
+    os.chdir(workspace)
+    print(f"🎲 Sample mode: {fraction:.2%} of CUIs, working in {workspace}/")
+    return sampled_meta_dir(meta_dir) if meta_dir else None
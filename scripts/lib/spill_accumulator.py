@@ -0,0 +1,191 @@
+"""
+Per-CUI accumulator that spills to disk past a memory budget.
+
+Stages that build per-CUI state while scanning an RRF file (partial
+concepts from MRCONSO, relationships from MRREL) keep it in a dict, which
+grows with the filter: relaxing it (Priority 3 types, looser keywords) can
+push a 1M-concept import past the RAM of a small machine.
+
+SpillAccumulator is that dict with a budget. Once the estimated size of the
+state it holds passes the budget, the state is hash-partitioned by key into
+on-disk run files (one pickle stream per partition) and the dict is
+cleared. items() then merges the runs one partition at a time, so only
+about 1/partitions of the total state is in memory at once, and yields
+every key in first-seen order, like the dict would: results do not depend
+on the budget or on where the spills happened.
+
+`merge(older, newer)` combines two partial values for one key, the later
+one second. It must give the same result as if the later additions had
+been made to the older value directly (Concept.merge() does this for
+MRCONSO chunks; list concatenation does it for any append-only state).
+
+Usage:
+    with SpillAccumulator(merge_state, budget_bytes=512 << 20, sizeof=state_size) as state:
+        for cui, partial in scan():
+            state.add(cui, partial)
+        for cui, value in state.items():
+            ...
+"""
+
+import heapq
+import pickle
+import shutil
+import tempfile
+import weakref
+import zlib
+from pathlib import Path
+
+DEFAULT_PARTITIONS = 64
+DEFAULT_ENTRY_BYTES = 256  # Estimate per add() without a sizeof function
+
+
+class SpillAccumulator:
+    """Dict of per-key partial state that spills to run files past a memory budget."""
+
+    def __init__(self, merge, budget_bytes=None, sizeof=None,
+                 partitions=DEFAULT_PARTITIONS, spill_dir=None):
+        """
+        Args:
+            merge (callable): merge(older, newer) → combined value
+            budget_bytes (int): Estimated state size that triggers a spill
+                (None = never spill)
+            sizeof (callable): Estimated in-memory size of an added value
+            partitions (int): Hash partitions; merging needs about
+                1/partitions of the total state in memory
+            spill_dir (str|Path): Where to create the run files (default:
+                the system temp directory)
+        """
+        self.merge = merge
+        self.budget_bytes = budget_bytes
+        self.sizeof = sizeof
+        self.partitions = partitions
+        self.spill_dir = spill_dir
+        self.spills = 0
+        self.spilled_bytes = 0
+        self._state = {}  # {key: [first-seen sequence number, value]}
+        self._held_bytes = 0
+        self._next_seq = 0
+        self._dir = None
+        self._cleanup = None
+        self._merged_counts = None  # Keys per partition, once runs are merged
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, traceback):
+        self.close()
+
+    def close(self):
+        """Deletes the run files (also done when the accumulator is garbage collected)."""
+        if self._cleanup is not None:
+            self._cleanup()
+
+    def add(self, key, value):
+        """
+        Adds a partial value for a key, merging it into the key's state.
+
+        Raises:
+            RuntimeError: After items() has merged spilled runs
+        """
+        if self._merged_counts is not None:
+            raise RuntimeError("SpillAccumulator is read-only once its runs are merged")
+
+        entry = self._state.get(key)
+        if entry is None:
+            self._state[key] = [self._next_seq, value]
+            self._next_seq += 1
+        else:
+            entry[1] = self.merge(entry[1], value)
+
+        self._held_bytes += self.sizeof(value) if self.sizeof else DEFAULT_ENTRY_BYTES
+        if self.budget_bytes is not None and self._held_bytes > self.budget_bytes:
+            self.spill()
+
+    def spill(self):
+        """Appends the held state to the partition run files and clears it."""
+        if not self._state:
+            return
+        if self._dir is None:
+            self._dir = Path(tempfile.mkdtemp(prefix='spill-', dir=self.spill_dir))
+            self._cleanup = weakref.finalize(self, shutil.rmtree, self._dir, ignore_errors=True)
+
+        files = [open(self._run_path(p), 'ab') for p in range(self.partitions)]
+        try:
+            for key, (seq, value) in self._state.items():
+                pickle.dump((seq, key, value), files[self._partition(key)], pickle.HIGHEST_PROTOCOL)
+        finally:
+            for f in files:
+                self.spilled_bytes += f.tell()
+                f.close()
+
+        self._state = {}
+        self._held_bytes = 0
+        self.spills += 1
+
+    def items(self):
+        """
+        Yields (key, merged value) for every key, in first-seen order. Can
+        be called again; spilled state is read back from disk each time.
+        """
+        if not self.spills:
+            for key, (_, value) in self._state.items():
+                yield key, value
+            return
+
+        self._merge_runs()
+        sorted_runs = [self._read(self._sorted_path(p)) for p in range(self.partitions)]
+        for _, key, value in heapq.merge(*sorted_runs, key=lambda record: record[0]):
+            yield key, value
+
+    def __len__(self):
+        if not self.spills:
+            return len(self._state)
+        self._merge_runs()
+        return sum(self._merged_counts)
+
+    def _merge_runs(self):
+        """
+        Merges each partition's runs into one record per key, written back
+        sorted by first-seen sequence number for items()' k-way merge.
+        """
+        if self._merged_counts is not None:
+            return
+        self.spill()
+
+        self._merged_counts = []
+        for p in range(self.partitions):
+            merged = {}
+            for seq, key, value in self._read(self._run_path(p)):
+                entry = merged.get(key)
+                if entry is None:
+                    merged[key] = [seq, value]
+                else:
+                    # Runs are read in the order they were spilled
+                    entry[1] = self.merge(entry[1], value)
+
+            with open(self._sorted_path(p), 'wb') as f:
+                for key, (seq, value) in sorted(merged.items(), key=lambda item: item[1][0]):
+                    pickle.dump((seq, key, value), f, pickle.HIGHEST_PROTOCOL)
+            self._merged_counts.append(len(merged))
+            self._run_path(p).unlink()
+
+    def _partition(self, key):
+        return zlib.crc32(str(key).encode('utf-8')) % self.partitions
+
+    def _run_path(self, partition):
+        return self._dir / f"run-{partition:03d}.pkl"
+
+    def _sorted_path(self, partition):
+        return self._dir / f"merged-{partition:03d}.pkl"
+
+    @staticmethod
+    def _read(path):
+        """Yields the records of a pickle stream."""
+        if not path.exists():
+            return
+        with open(path, 'rb') as f:
+            while True:
+                try:
+                    yield pickle.load(f)
+                except EOFError:
+                    return
@@ -0,0 +1,306 @@
+"""
+Per-stage performance telemetry for the import scripts.
+
+Each script records its steps (MRSTY/MRCONSO/MRREL scans, deduplication,
+writing outputs, ...) as stages. For every stage it keeps:
+
+- wall and CPU time (CPU includes worker processes that have exited)
+- rows and bytes processed, and the resulting rows/s and bytes/s
+- peak resident memory (per stage where the OS allows resetting the
+  high-water mark, i.e. Linux; the process-wide peak otherwise)
+- the script's own filter counters (stage_counts, stats, ...)
+
+Telemetry.save() writes everything as JSON next to filter_statistics.json
+(imports/umls/<script>_telemetry.json) and appends the run to
+telemetry_history.jsonl there, so import performance can be compared
+across runs and UMLS releases.
+
+While a stage runs, StageMetrics.eta() turns the byte offset reached in
+the input file into a progress / throughput / ETA suffix for the existing
+progress lines (byte offsets are known up front, row counts are not).
+
+Usage:
+    telemetry = Telemetry('import_umls_neuroscience', IMPORTS_DIR)
+    with telemetry.stage('parse_mrconso', total_bytes=size) as metrics:
+        for row in reader:
+            ...
+            print(f"Processed {reader.rows_read:,} rows{metrics.track(reader)}")
+        metrics.count(stage_counts)
+    telemetry.save()
+"""
+
+import os
+import sys
+import json
+import time
+import platform
+from pathlib import Path
+from datetime import datetime
+from contextlib import contextmanager
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+HISTORY_FILE = "telemetry_history.jsonl"
+FILTER_STATS_FILE = "filter_statistics.json"
+
+# ru_maxrss is in bytes on macOS, kilobytes on Linux
+MAXRSS_UNIT = 1 if sys.platform == 'darwin' else 1024
+
+
+def _children_cpu():
+    """CPU seconds used by exited child processes (e.g. a finished Pool)."""
+    if resource is None:
+        return 0.0
+    usage = resource.getrusage(resource.RUSAGE_CHILDREN)
+    return usage.ru_utime + usage.ru_stime
+
+
+def _reset_peak_rss():
+    """
+    Resets the process's peak RSS high-water mark (Linux only).
+
+    Returns:
+        bool: True if the peak now covers only what follows
+    """
+    try:
+        with open('/proc/self/clear_refs', 'w') as f:
+            f.write('5')
+        return True
+    except OSError:
+        return False
+
+
+def _peak_rss():
+    """Peak resident memory of this process in bytes, or None if unavailable."""
+    try:
+        with open('/proc/self/status', 'r') as f:
+            for line in f:
+                if line.startswith('VmHWM:'):
+                    return int(line.split()[1]) * 1024
+    except OSError:
+        pass
+    if resource is None:
+        return None
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * MAXRSS_UNIT
+
+
+def _children_peak_rss():
+    """Largest peak RSS of any exited child process in bytes, or None."""
+    if resource is None:
+        return None
+    return resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss * MAXRSS_UNIT
+
+
+def format_duration(seconds):
+    """Formats seconds as e.g. '42s', '3m05s' or '1h02m'."""
+    seconds = int(seconds)
+    if seconds < 60:
+        return f"{seconds}s"
+    if seconds < 3600:
+        return f"{seconds // 60}m{seconds % 60:02d}s"
+    return f"{seconds // 3600}h{seconds % 3600 // 60:02d}m"
+
+
+def format_bytes(count):
+    """Formats a byte count as e.g. '512 KB' or '2.1 GB'."""
+    for unit in ('B', 'KB', 'MB', 'GB'):
+        if count < 1024 or unit == 'GB':
+            return f"{count:.0f} {unit}" if unit in ('B', 'KB') else f"{count:.1f} {unit}"
+        count /= 1024
+
+
+class StageMetrics:
+    """
+    Measurements for one stage. Also usable on its own (not attached to a
+    Telemetry run) just for the ETA of a progress line.
+
+    Attributes:
+        name (str): Stage name
+        total_bytes (int): Input size, if known (enables percentages/ETA)
+        rows (int): Rows processed so far
+        bytes (int): Input bytes processed so far
+        counters (dict): Filter/statistics counters recorded with count()
+    """
+
+    def __init__(self, name, total_bytes=None):
+        self.name = name
+        self.total_bytes = total_bytes
+        self.rows = 0
+        self.bytes = 0
+        self.counters = {}
+        self.result = {}
+        self._started = time.perf_counter()
+        self._cpu_started = time.process_time()
+        self._children_cpu_started = _children_cpu()
+        self._peak_is_per_stage = _reset_peak_rss()
+
+    def advance(self, rows=None, bytes_done=None):
+        """Records progress: total rows and input bytes processed so far."""
+        if rows is not None:
+            self.rows = rows
+        if bytes_done is not None:
+            self.bytes = bytes_done
+
+    def track(self, reader):
+        """
+        Records an RRFReader's progress.
+
+        Returns:
+            str: Progress suffix for a print line (see eta())
+        """
+        if self.total_bytes is None:
+            self.total_bytes = reader.total_bytes
+        self.advance(reader.rows_read, reader.bytes_read)
+        return self.eta()
+
+    def eta(self):
+        """
+        Formats progress from the byte offset reached so far.
+
+        Returns:
+            str: e.g. ' (42.0%, 38.5 MB/s, ETA 1m12s)', or '' before any
+                input has been read or when the input size is unknown
+        """
+        elapsed = time.perf_counter() - self._started
+        if not self.total_bytes or not self.bytes or elapsed <= 0:
+            return ''
+        rate = self.bytes / elapsed
+        remaining = max(self.total_bytes - self.bytes, 0) / rate
+        percent = self.bytes / self.total_bytes * 100
+        return f" ({percent:.1f}%, {format_bytes(rate)}/s, ETA {format_duration(remaining)})"
+
+    def count(self, counters):
+        """Records scalar counters (nested Counters, e.g. per-RELA totals, are skipped)."""
+        for key, value in counters.items():
+            if isinstance(value, (int, float)) and not isinstance(value, bool):
+                self.counters[key] = value
+
+    def finish(self):
+        """Stops the clocks and returns the stage's measurements."""
+        wall = time.perf_counter() - self._started
+        cpu = time.process_time() - self._cpu_started
+        workers_cpu = _children_cpu() - self._children_cpu_started
+
+        result = {
+            'name': self.name,
+            'wall_seconds': round(wall, 3),
+            'cpu_seconds': round(cpu + workers_cpu, 3),
+            'rows': self.rows,
+            'bytes': self.bytes,
+            'rows_per_second': round(self.rows / wall, 1) if wall > 0 else None,
+            'bytes_per_second': round(self.bytes / wall, 1) if wall > 0 else None,
+            'peak_rss_bytes': _peak_rss(),
+            'peak_rss_scope': 'stage' if self._peak_is_per_stage else 'process',
+        }
+        if workers_cpu > 0:
+            result['workers_cpu_seconds'] = round(workers_cpu, 3)
+            result['workers_peak_rss_bytes'] = _children_peak_rss()
+        result['counters'] = dict(self.counters)
+        self.result = result
+        return result
+
+
+class Telemetry:
+    """Collects the stages of one script run and saves them as JSON."""
+
+    def __init__(self, script, output_dir, release=None, sample=None):
+        """
+        Args:
+            script (str): Script name (names the output file)
+            output_dir (str|Path): Directory holding filter_statistics.json
+            release (str): UMLS release; read from filter_statistics.json
+                in output_dir when omitted
+            sample (float): CUI fraction of a --sample run (see sampling.py),
+                for extrapolating its timings to a full run
+        """
+        self.script = script
+        self.output_dir = Path(output_dir)
+        self.release = release
+        self.sample = sample
+        self.stages = []
+        self._started_at = datetime.now().isoformat(timespec='seconds')
+        self._started = time.perf_counter()
+        self._cpu_started = time.process_time()
+        self._children_cpu_started = _children_cpu()
+
+    @contextmanager
+    def stage(self, name, total_bytes=None, path=None):
+        """
+        Measures the enclosed block as one stage.
+
+        Args:
+            name (str): Stage name (e.g. 'parse_mrconso')
+            total_bytes (int): Input size for ETA/throughput
+            path (str|Path): Input file; its size is used as total_bytes
+
+        Yields:
+            StageMetrics
+        """
+        if path is not None and total_bytes is None:
+            total_bytes = os.path.getsize(path)
+        metrics = StageMetrics(name, total_bytes)
+        try:
+            yield metrics
+        finally:
+            self.stages.append(metrics.finish())
+
+    @property
+    def output_file(self):
+        return self.output_dir / f"{self.script}_telemetry.json"
+
+    def _release(self):
+        if self.release:
+            return self.release
+        try:
+            with open(self.output_dir / FILTER_STATS_FILE, 'r', encoding='utf-8') as f:
+                return json.load(f).get('umls_release')
+        except (OSError, ValueError):
+            return None
+
+    def to_dict(self):
+        return {
+            'script': self.script,
+            'umls_release': self._release(),
+            'sample_fraction': self.sample,
+            'started_at': self._started_at,
+            'wall_seconds': round(time.perf_counter() - self._started, 3),
+            'cpu_seconds': round(
+                time.process_time() - self._cpu_started
+                + _children_cpu() - self._children_cpu_started, 3
+            ),
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'cpu_count': os.cpu_count(),
+            'stages': self.stages,
+        }
+
+    def save(self):
+        """
+        Writes <script>_telemetry.json and appends the run to the history file.
+
+        Returns:
+            Path: The telemetry file written
+        """
+        run = self.to_dict()
+        self.output_dir.mkdir(parents=True, exist_ok=True)
+        with open(self.output_file, 'w', encoding='utf-8') as f:
+            json.dump(run, f, indent=2)
+        with open(self.output_dir / HISTORY_FILE, 'a', encoding='utf-8') as f:
+            f.write(json.dumps(run) + '\n')
+        return self.output_file
+
+    def print_summary(self):
+        """Prints one line per stage (time, throughput, memory)."""
+        print(f"\n⏱️  Performance ({self.output_file}):")
+        for stage in self.stages:
+            line = f"   {stage['name']}: {stage['wall_seconds']:.1f}s wall, {stage['cpu_seconds']:.1f}s CPU"
+            if stage['rows'] and stage['rows_per_second']:
+                line += f", {stage['rows_per_second']:,.0f} rows/s"
+            if stage['bytes'] and stage['bytes_per_second']:
+                line += f", {format_bytes(stage['bytes_per_second'])}/s"
+            if stage['peak_rss_bytes']:
+                line += f", peak {format_bytes(stage['peak_rss_bytes'])}"
+            print(line)
@@ -7,20 +7,32 @@ Maps extracted UMLS data to NeuroDB-2 26-column CSV schema:
 - 4 metadata columns (source, source_priority, sources_contributing, date_added)
 
 Input:
-- imports/umls/umls_concepts_intermediate.json (325K concepts)
-- imports/umls/umls_associations.json (294K with associations)
+- imports/umls/umls_concepts_intermediate.jsonl (325K concepts, streamed)
+- imports/umls/umls_associations.json (294K with associations), or another
+  file in its format given with --associations (e.g. the personalized
+  PageRank associations from compute_ppr_associations.py)
 
 Output:
 - imports/umls/umls_neuroscience_terms.csv (26 columns)
+- imports/umls/map_umls_to_schema_telemetry.json (timings, see lib/telemetry.py)
 """
 
+import sys
 import json
 import csv
+import argparse
 from pathlib import Path
 from datetime import date
 
+# Add lib to path
+sys.path.insert(0, str(Path(__file__).parent))
+
+from lib.intermediate import iter_intermediate
+from lib.sampling import add_sample_argument, enter_sample
+from lib.telemetry import Telemetry
+
 # File paths
-CONCEPTS_FILE = Path("imports/umls/umls_concepts_intermediate.json")
+CONCEPTS_FILE = Path("imports/umls/umls_concepts_intermediate.jsonl")
 ASSOCIATIONS_FILE = Path("imports/umls/umls_associations.json")
 OUTPUT_CSV = Path("imports/umls/umls_neuroscience_terms.csv")
 
@@ -57,29 +69,25 @@ SCHEMA_COLUMNS = [
 ]
 
 
-def load_data():
-    """Load concepts and associations."""
+def load_associations(path=ASSOCIATIONS_FILE):
+    """Load associations (concepts are streamed from CONCEPTS_FILE while mapping)."""
     print(f"\n📥 Loading data...")
 
-    with open(CONCEPTS_FILE, 'r', encoding='utf-8') as f:
-        concepts = json.load(f)
-
-    with open(ASSOCIATIONS_FILE, 'r', encoding='utf-8') as f:
+    with open(path, 'r', encoding='utf-8') as f:
         associations = json.load(f)
 
-    print(f"   ✅ Loaded {len(concepts):,} concepts")
     print(f"   ✅ Loaded {len(associations):,} association sets")
 
-    return concepts, associations
+    return associations
 
 
-def map_concept_to_row(cui, concept_data, associations):
+def map_concept_to_row(cui, concept, associations):
     """
     Map a single UMLS concept to NeuroDB-2 26-column row.
 
     Args:
         cui: UMLS CUI
-        concept_data: Concept metadata from intermediate JSON
+        concept: Concept record loaded from intermediate JSON
         associations: Association data for this CUI
 
     Returns:
@@ -88,29 +96,29 @@ def map_concept_to_row(cui, concept_data, associations):
     row = {}
 
     # Column 1: Term
-    row['Term'] = concept_data.get('preferred_term', '')
+    row['Term'] = concept.preferred_term
 
     # Column 2: Term Two (alternate representation)
     # Leave empty - UMLS doesn't distinguish ASCII-safe versions
     row['Term Two'] = ''
 
     # Column 3: Definition
-    definition = concept_data.get('definition', '')
+    definition = concept.definition
     if not definition or not definition.strip():
         definition = '(pending enrichment)'  # Mark for future backfill
     row['Definition'] = definition
 
     # Column 4: Closest MeSH term
-    row['Closest MeSH term'] = concept_data.get('mesh_code', '')
+    row['Closest MeSH term'] = concept.mesh_code
 
     # Columns 5-7: Synonym 1-3
-    synonyms = concept_data.get('synonyms', [])
+    synonyms = concept.synonyms
     row['Synonym 1'] = synonyms[0] if len(synonyms) > 0 else ''
     row['Synonym 2'] = synonyms[1] if len(synonyms) > 1 else ''
     row['Synonym 3'] = synonyms[2] if len(synonyms) > 2 else ''
 
     # Column 8: Abbreviation
-    abbreviations = concept_data.get('abbreviations', [])
+    abbreviations = concept.abbreviations
     row['Abbreviation'] = abbreviations[0] if abbreviations else ''
 
     # Columns 9-10: UK/US Spelling
@@ -126,6 +134,7 @@ def map_concept_to_row(cui, concept_data, associations):
     row['Adverb Form of Word'] = ''
 
     # Columns 15-22: Commonly Associated Term 1-8
+    # (associated_terms is ranked best first by parse_mrrel_associations.py)
     assoc_data = associations.get(cui, {})
     associated_terms = assoc_data.get('associated_terms', [])
 
@@ -140,8 +149,8 @@ def map_concept_to_row(cui, concept_data, associations):
     row['Source Priority'] = 'High'  # UMLS is authoritative medical terminology
 
     # Metadata Column 25: Sources Contributing
-    sources = concept_data.get('sources', [])
-    row['Sources Contributing'] = ';'.join(sorted(sources)) if sources else ''
+    sources = concept.sources
+    row['Sources Contributing'] = ';'.join(sources) if sources else ''
 
     # Metadata Column 26: Date Added
     row['Date Added'] = date.today().isoformat()
@@ -149,23 +158,20 @@ def map_concept_to_row(cui, concept_data, associations):
     return row
 
 
-def map_all_concepts(concepts, associations):
-    """Map all concepts to NeuroDB-2 rows."""
-    print(f"\n🗺️  Mapping {len(concepts):,} concepts to NeuroDB-2 schema...")
+def map_all_concepts(concepts, associations, stats):
+    """
+    Map concepts to NeuroDB-2 rows one at a time.
 
-    rows = []
-    stats = {
-        'total': 0,
-        'with_definitions': 0,
-        'with_mesh': 0,
-        'with_synonyms': 0,
-        'with_abbreviations': 0,
-        'with_associations': 0,
-    }
+    Args:
+        concepts: Iterable of (CUI, Concept) pairs
+        associations: Association data by CUI
+        stats (dict): Coverage counters, updated as rows are produced
 
-    for cui, concept_data in concepts.items():
-        row = map_concept_to_row(cui, concept_data, associations)
-        rows.append(row)
+    Yields:
+        dict: Row data with 26 columns
+    """
+    for cui, concept in concepts:
+        row = map_concept_to_row(cui, concept, associations)
 
         # Track statistics
         stats['total'] += 1
@@ -180,20 +186,24 @@ def map_all_concepts(concepts, associations):
         if any(row[f'Commonly Associated Term {i}'] for i in range(1, 9)):
             stats['with_associations'] += 1
 
-    print(f"   ✅ Mapped {len(rows):,} rows")
-    return rows, stats
+        yield row
 
 
 def write_csv(rows):
-    """Write rows to CSV file."""
-    print(f"\n💾 Writing {len(rows):,} rows to {OUTPUT_CSV}...")
+    """Write rows to CSV file as they are produced."""
+    print(f"\n🗺️  Mapping concepts from {CONCEPTS_FILE} to NeuroDB-2 schema...")
 
+    row_count = 0
     with open(OUTPUT_CSV, 'w', newline='', encoding='utf-8') as f:
         writer = csv.DictWriter(f, fieldnames=SCHEMA_COLUMNS)
         writer.writeheader()
-        writer.writerows(rows)
+        for row in rows:
+            writer.writerow(row)
+            row_count += 1
 
-    print(f"   ✅ Wrote {OUTPUT_CSV}")
+    print(f"   ✅ Mapped {row_count:,} rows")
+    print(f"\n💾 Wrote {row_count:,} rows to {OUTPUT_CSV}")
+    return row_count
 
 
 def print_statistics(stats):
@@ -210,23 +220,54 @@ def print_statistics(stats):
     print(f"   - Associated Terms: {stats['with_associations']:,} ({stats['with_associations']/stats['total']*100:.1f}%)")
 
 
+def parse_args():
+    """Parses command-line options."""
+    parser = argparse.ArgumentParser(description="Map UMLS concepts to the NeuroDB-2 CSV schema")
+    parser.add_argument(
+        '--associations', type=Path, default=ASSOCIATIONS_FILE,
+        help=f"Associated terms per CUI (default: {ASSOCIATIONS_FILE})"
+    )
+    add_sample_argument(parser)
+    return parser.parse_args()
+
+
 def main():
+    args = parse_args()
+    if args.sample:
+        enter_sample(args.sample)
+
     print("="*70)
     print("UMLS TO NEURODB-2 SCHEMA MAPPER")
     print("="*70)
 
-    # Step 1: Load data
-    concepts, associations = load_data()
+    telemetry = Telemetry('map_umls_to_schema', OUTPUT_CSV.parent, sample=args.sample)
 
-    # Step 2: Map to schema
-    rows, stats = map_all_concepts(concepts, associations)
+    # Step 1: Load associations
+    with telemetry.stage('load_associations', path=args.associations) as metrics:
+        associations = load_associations(args.associations)
+        metrics.advance(len(associations), metrics.total_bytes)
 
-    # Step 3: Write CSV
-    write_csv(rows)
+    # Step 2-3: Map concepts to schema and write CSV, streaming
+    stats = {
+        'total': 0,
+        'with_definitions': 0,
+        'with_mesh': 0,
+        'with_synonyms': 0,
+        'with_abbreviations': 0,
+        'with_associations': 0,
+    }
+    with telemetry.stage('map_and_write_csv', path=CONCEPTS_FILE) as metrics:
+        rows = map_all_concepts(iter_intermediate(CONCEPTS_FILE), associations, stats)
+        row_count = write_csv(rows)
+        metrics.advance(row_count, metrics.total_bytes)
+        metrics.count(stats)
 
     # Step 4: Print statistics
     print_statistics(stats)
 
+    telemetry.save()
+    telemetry.print_summary()
+
     # Summary
     print("\n" + "="*70)
     print("SCHEMA MAPPING COMPLETE")
@@ -234,7 +275,7 @@ def main():
 
     print(f"\n✅ Output: {OUTPUT_CSV}")
     print(f"✅ Format: 26-column CSV (22 standard + 4 metadata)")
-    print(f"✅ Rows: {len(rows):,}")
+    print(f"✅ Rows: {row_count:,}")
 
     print(f"\n🎯 Next Steps:")
     print(f"   1. Run structural validation: lib/validators.py")
@@ -0,0 +1,292 @@
+#!/usr/bin/env python3
+"""
+NeuroDB Build Runner
+
+Runs the UMLS import and LexStream export scripts as one dependency graph
+(lib/pipeline.py). A stage re-runs only when a file it reads, a filter
+parameter it declares (NEURO_KEYWORDS, DOMAIN_SPECIFIC_RELA, ...) or its
+code changed; otherwise its outputs are reused, or restored from the
+build cache (.neurodb_cache/) when an earlier configuration comes back.
+Independent stages run concurrently.
+
+    filter_index -> import -> mrrel -> map -> lexstream_umls
+                          \\_____________/   \\-> validate_umls_csv
+    lexstream_wikipedia -> validate_lexstream
+
+With --ppr-associations, a pagerank stage (mrrel -> pagerank -> map)
+ranks the associated terms by personalized PageRank over the concept
+graph instead (compute_ppr_associations.py, needs numpy).
+
+With --sample FRACTION, the UMLS stages run on a stable hash-selected
+fraction of CUIs in the .neurodb_sample/<fraction>/ workspace
+(lib/sampling.py), for end-to-end development runs in seconds.
+
+For example, editing DOMAIN_SPECIFIC_RELA re-runs mrrel and whatever its
+new outputs change downstream; filter_index and import stay cached.
+
+merge_umls_enrichments.py is not a stage: it rewrites the mapper's output
+in place from hand-made backups, so its result is not a function of its
+inputs. Run it by hand after a build if needed.
+
+Usage:
+    python scripts/neurodb.py build                  # Everything
+    python scripts/neurodb.py build mrrel --jobs 2   # One stage + its dependencies
+    python scripts/neurodb.py build map --force map  # Re-run a stage regardless
+    python scripts/neurodb.py status                 # What would run, and why
+    python scripts/neurodb.py build --sample 0.01    # 1% of CUIs, separate outputs
+"""
+
+import sys
+import argparse
+from pathlib import Path
+
+# Add lib to path
+sys.path.insert(0, str(Path(__file__).parent))
+
+from lib.pipeline import Pipeline, PipelineError, Stage
+from lib.compressed_rrf import resolve_rrf
+from lib.sampling import add_sample_argument, prepare_sample, sample_workspace
+
+REPO_ROOT = Path(__file__).resolve().parent.parent
+
+UMLS_META_DIR = "downloads/umls/2025AB/2025AB/META"
+IMPORTS_DIR = "imports/umls"
+
+FILTER_INDEX = f"{IMPORTS_DIR}/neuroscience_cuis.idx"
+FILTER_STATS = f"{IMPORTS_DIR}/filter_statistics.json"
+INTERMEDIATE = f"{IMPORTS_DIR}/umls_concepts_intermediate.jsonl"
+CANDIDATES = f"{IMPORTS_DIR}/umls_concepts_candidates.jsonl"
+ASSOCIATIONS = f"{IMPORTS_DIR}/umls_associations.json"
+RELATIONSHIPS = f"{IMPORTS_DIR}/umls_relationships.jsonl"
+MRREL_PROFILE = f"{IMPORTS_DIR}/mrrel_relationship_profile.md"
+CONCEPT_GRAPH = f"{IMPORTS_DIR}/umls_concept_graph.csr"
+HIERARCHY_INDEX = f"{IMPORTS_DIR}/umls_hierarchy.idx"
+PPR_ASSOCIATIONS = f"{IMPORTS_DIR}/umls_ppr_associations.json"
+TERMS_CSV = f"{IMPORTS_DIR}/umls_neuroscience_terms.csv"
+
+RRF_FILES = ("MRSTY.RRF", "MRCONSO.RRF", "MRDEF.RRF", "MRREL.RRF")
+
+# Stages derived from UMLS, which --sample runs in the sample workspace
+UMLS_STAGES = {'filter_index', 'import', 'mrrel', 'pagerank', 'map', 'validate_umls_csv', 'lexstream_umls'}
+
+
+def meta_file(name):
+    """A META file's path, or its compressed variant's if only that exists (e.g. MRREL.RRF.gz)."""
+    return resolve_rrf(REPO_ROOT / UMLS_META_DIR / name).relative_to(REPO_ROOT).as_posix()
+
+
+def lexstream_version():
+    """Reads the Wikipedia/NINDS database version (names the export file)."""
+    return (REPO_ROOT / "VERSION.txt").read_text(encoding='utf-8').strip()
+
+
+def sample_stages(stages, fraction):
+    """
+    Moves the UMLS stages' files into the sample workspace and runs their
+    scripts with --sample (which changes into the workspace). The sampled
+    META files are plain RRF even where the full release is compressed.
+    """
+    workspace = sample_workspace(fraction).as_posix()
+
+    def relocate(path):
+        if path.startswith(UMLS_META_DIR):
+            path = f"{UMLS_META_DIR}/{Path(path).name.split('.')[0]}.RRF"
+        return f"{workspace}/{path}"
+
+    for stage in stages:
+        if stage.name in UMLS_STAGES:
+            stage.inputs = tuple(relocate(path) for path in stage.inputs)
+            stage.outputs = tuple(relocate(path) for path in stage.outputs)
+            stage.args += ('--sample', f"{fraction:g}")
+    return stages
+
+
+def build_stages(workers=1, mrrel_columns=False, ppr_associations=False, sample=None):
+    """
+    Declares the build graph.
+
+    Args:
+        workers (int): --workers for the MRCONSO/MRREL scans and PageRank
+            (does not change outputs)
+        mrrel_columns (bool): Filter MRREL through its column cache (does not
+            change outputs either)
+        ppr_associations (bool): Map personalized PageRank associations
+            instead of MRREL's direct ones
+        sample (float): Run the UMLS stages on this fraction of CUIs
+            (see sample_stages())
+
+    Returns:
+        list: Stage objects
+    """
+    scan_args = ('--workers', str(workers)) if workers > 1 else ()
+    version = lexstream_version()
+    associations = PPR_ASSOCIATIONS if ppr_associations else ASSOCIATIONS
+
+    stages = [
+        Stage(
+            'filter_index', 'scripts/build_umls_filter_index.py',
+            inputs=[meta_file("MRSTY.RRF")],
+            outputs=[FILTER_INDEX, FILTER_STATS],
+            params=['UMLS_RELEASE', 'NEURO_SEMANTIC_TYPES'],
+        ),
+        Stage(
+            'import', 'scripts/import_umls_neuroscience.py',
+            inputs=[FILTER_INDEX, meta_file("MRCONSO.RRF"), meta_file("MRDEF.RRF")],
+            outputs=[INTERMEDIATE, CANDIDATES],
+            params=[
+                'BROAD_SEMANTIC_TYPES', 'NEURO_KEYWORDS', 'DEFINITION_SOURCE_PRIORITY',
+                'SYNONYM_TTYS', 'ABBREVIATION_TTYS',
+            ],
+            args=scan_args,
+        ),
+        Stage(
+            'mrrel', 'scripts/parse_mrrel_associations.py',
+            inputs=[INTERMEDIATE, meta_file("MRREL.RRF")],
+            outputs=[ASSOCIATIONS, RELATIONSHIPS, MRREL_PROFILE, CONCEPT_GRAPH, HIERARCHY_INDEX],
+            params=[
+                'DOMAIN_SPECIFIC_RELA', 'TAXONOMY_REL', 'RELA_WEIGHTS', 'DOMAIN_RELA_WEIGHT',
+                'OTHER_RELA_WEIGHT', 'SOURCE_WEIGHTS', 'DEFAULT_SOURCE_WEIGHT',
+                'ASSOCIATED_TERMS_LIMIT',
+            ],
+            args=('--columns',) if mrrel_columns else scan_args,
+        ),
+        Stage(
+            'map', 'scripts/map_umls_to_schema.py',
+            inputs=[INTERMEDIATE, associations],
+            outputs=[TERMS_CSV],
+            params=['SCHEMA_COLUMNS'],
+            args=('--associations', associations),
+        ),
+        Stage(
+            'validate_umls_csv', 'scripts/validate_umls_csv.py',
+            inputs=[TERMS_CSV],
+        ),
+        Stage(
+            'lexstream_umls', 'convert_umls_to_lexstream.py',
+            inputs=[TERMS_CSV],
+            outputs=["neuro_terms_v3.0.0_umls.json"],
+        ),
+        Stage(
+            'lexstream_wikipedia', 'convert_to_lexstream.py',
+            inputs=["neuro_terms.csv", "VERSION.txt"],
+            outputs=[f"neuro_terms_v{version}_wikipedia-ninds.json"],
+        ),
+        Stage(
+            'validate_lexstream', 'validate_lexstream_db.py',
+            inputs=[f"neuro_terms_v{version}_wikipedia-ninds.json", "VERSION.txt"],
+        ),
+    ]
+    if ppr_associations:
+        stages.insert(3, Stage(
+            'pagerank', 'scripts/compute_ppr_associations.py',
+            inputs=[INTERMEDIATE, CONCEPT_GRAPH],
+            outputs=[PPR_ASSOCIATIONS],
+            args=scan_args,
+        ))
+    if sample:
+        sample_stages(stages, sample)
+    return stages
+
+
+def run_build(pipeline, args):
+    print("=" * 60)
+    print("NeuroDB Build")
+    print("=" * 60)
+    print()
+
+    try:
+        status = pipeline.build(
+            args.targets, jobs=args.jobs,
+            force=pipeline.select(args.targets) if args.force_all else args.force,
+        )
+    except PipelineError as e:
+        print(f"\n❌ Build failed: {e}")
+        return 1
+
+    built = sum(1 for result in status.values() if result == 'built')
+    print()
+    print(f"✅ {len(status)} stages up to date ({built} run, {len(status) - built} reused)")
+    return 0
+
+
+def run_status(pipeline, args):
+    try:
+        rows = pipeline.status(args.targets)
+    except PipelineError as e:
+        print(f"❌ {e}")
+        return 1
+
+    symbols = {'fresh': '✅', 'stale': '🔄', 'blocked': '⏳'}
+    for name, state, reasons in rows:
+        detail = f" ({'; '.join(reasons)})" if reasons else ""
+        print(f"{symbols[state]} {name:<20} {state}{detail}")
+    return 0
+
+
+def parse_args():
+    """Parses command-line options."""
+    parser = argparse.ArgumentParser(description="Build NeuroDB outputs with cached stages")
+    subparsers = parser.add_subparsers(dest='command', required=True)
+
+    build = subparsers.add_parser('build', help="Run stale stages")
+    build.add_argument('targets', nargs='*', help="Stages to build (default: all)")
+    build.add_argument(
+        '--jobs', type=int, default=2,
+        help="Stages to run concurrently (default: 2)"
+    )
+    build.add_argument(
+        '--workers', type=int, default=1,
+        help="Worker processes for the MRCONSO/MRREL scans (default: 1)"
+    )
+    build.add_argument(
+        '--mrrel-columns', action='store_true',
+        help="Filter MRREL through its columnar cache (fast re-runs after RELA edits)"
+    )
+    build.add_argument(
+        '--ppr-associations', action='store_true',
+        help="Rank associated terms by personalized PageRank over the concept graph (needs numpy)"
+    )
+    add_sample_argument(build)
+    build.add_argument(
+        '--force', nargs='+', default=[], metavar='STAGE',
+        help="Re-run these stages even if cached"
+    )
+    build.add_argument(
+        '--force-all', action='store_true',
+        help="Re-run every selected stage even if cached"
+    )
+
+    status = subparsers.add_parser('status', help="Show which stages would run")
+    status.add_argument('targets', nargs='*', help="Stages to check (default: all)")
+    status.add_argument('--workers', type=int, default=1, help=argparse.SUPPRESS)
+    status.add_argument('--mrrel-columns', action='store_true', help=argparse.SUPPRESS)
+    status.add_argument(
+        '--ppr-associations', action='store_true',
+        help="Check the build with personalized PageRank associations"
+    )
+    add_sample_argument(status)
+
+    return parser.parse_args()
+
+
+def main():
+    args = parse_args()
+    if args.sample:
+        prepare_sample(args.sample, UMLS_META_DIR, RRF_FILES, root=REPO_ROOT)
+
+    try:
+        pipeline = Pipeline(REPO_ROOT, build_stages(
+            workers=args.workers, mrrel_columns=args.mrrel_columns,
+            ppr_associations=args.ppr_associations, sample=args.sample,
+        ))
+    except PipelineError as e:
+        print(f"❌ {e}")
+        return 1
+
+    if args.command == 'build':
+        return run_build(pipeline, args)
+    return run_status(pipeline, args)
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -22,15 +22,54 @@ Key columns:
 Goal: Extract domain-specific relationships for "Commonly Associated Terms" mapping
 """
 
+import os
+import sys
 import json
+import heapq
+import argparse
+import multiprocessing
+from array import array
 from pathlib import Path
 from collections import defaultdict, Counter
 
+# Add lib to path
+sys.path.insert(0, str(Path(__file__).parent))
+
+from lib.cui_set import CUISet, decode_cui, parse_cui
+from lib.concept_graph import ConceptGraph, write_concept_graph
+from lib.hierarchy_index import write_hierarchy_index
+from lib.intermediate import iter_intermediate
+from lib.mrrel_columns import MALFORMED_CUI_ID, MRRELColumns, build_mrrel_columns, open_mrrel_columns
+from lib.prefetch import ordered_imap, TASKS_PER_WORKER
+from lib.rrf_reader import BLOCK_SIZE, RRFReader, input_size, split_byte_ranges
+from lib.sampling import add_sample_argument, enter_sample
+from lib.spill_accumulator import SpillAccumulator
+from lib.telemetry import Telemetry, StageMetrics
+
 # File paths
 MRREL_FILE = Path("downloads/umls/2025AB/2025AB/META/MRREL.RRF")
-INTERMEDIATE_JSON = Path("imports/umls/umls_concepts_intermediate.json")
+INTERMEDIATE_FILE = Path("imports/umls/umls_concepts_intermediate.jsonl")
 OUTPUT_ASSOCIATIONS = Path("imports/umls/umls_associations.json")
+OUTPUT_RELATIONSHIPS = Path("imports/umls/umls_relationships.jsonl")
 OUTPUT_PROFILE = Path("imports/umls/mrrel_relationship_profile.md")
+OUTPUT_GRAPH = Path("imports/umls/umls_concept_graph.csr")
+OUTPUT_HIERARCHY = Path("imports/umls/umls_hierarchy.idx")
+MRREL_COLUMNS_DIR = Path("imports/umls/mrrel_columns")
+
+# Byte-range chunks per worker process for parallel MRREL parsing
+CHUNKS_PER_WORKER = 4
+
+# Rows masked per step when filtering the MRREL column cache
+COLUMN_CHUNK_ROWS = 1 << 23
+
+# Estimated in-memory size of one (related CUI, score, RELA) edge held under
+# --memory-budget (tuple, float and list slot; the strings are shared)
+SPILL_EDGE_BYTES = 120
+
+# Upper bound on a compact edge shard's size per byte of MRREL scanned into
+# it (at most two stored edges and one graph edge, ~40 bytes, per ~80-byte
+# row); --memory-budget sizes the scan's byte-range chunks with it
+SHARD_BYTES_PER_INPUT_BYTE = 0.5
 
 # Relationship types to extract (domain-specific, not generic taxonomy)
 # Based on UMLS documentation: https://www.ncbi.nlm.nih.gov/books/NBK9685/
@@ -61,36 +100,90 @@ TAXONOMY_REL = {
     'RN',   # Narrower
 }
 
+# Association ranking: each stored MRREL edge scores RELA weight × source
+# weight; a related concept's score sums its edges (so concepts linked by
+# several relationships/sources rank higher) and is scaled by the related
+# concept's quality (see concept_quality). The top ASSOCIATED_TERMS_LIMIT
+# become the associated terms, best first.
+RELA_WEIGHTS = {
+    # Functional and clinical relationships carry the most meaning
+    'causes': 1.0, 'caused_by': 1.0, 'treats': 1.0, 'treated_by': 1.0,
+    'prevents': 1.0, 'prevented_by': 1.0, 'manifestation_of': 1.0,
+    'has_mechanism_of_action': 1.0, 'mechanism_of_action_of': 1.0,
+    'has_physiologic_effect': 1.0, 'physiologic_effect_of': 1.0,
+    # Neuroanatomical connectivity
+    'innervates': 1.0, 'innervated_by': 1.0, 'afferent_to': 1.0, 'efferent_to': 1.0,
+    'receives_input_from': 1.0, 'sends_output_to': 1.0, 'synapse_with': 1.0,
+    # Hierarchy is context rather than association
+    'isa': 0.4, 'inverse_isa': 0.4,
+}
+DOMAIN_RELA_WEIGHT = 0.8  # Other DOMAIN_SPECIFIC_RELA values
+OTHER_RELA_WEIGHT = 0.3   # No RELA, or one outside DOMAIN_SPECIFIC_RELA
 
-def load_concepts():
-    """Load our 325K extracted concepts."""
-    print(f"\n📥 Loading concepts from {INTERMEDIATE_JSON}...")
+SOURCE_WEIGHTS = {
+    'MSH': 1.0, 'SNOMEDCT_US': 1.0, 'FMA': 1.0, 'UWDA': 0.9, 'GO': 0.9,
+    'NCI': 0.8, 'HPO': 0.8, 'OMIM': 0.7, 'MEDLINEPLUS': 0.7,
+}
+DEFAULT_SOURCE_WEIGHT = 0.5
 
-    with open(INTERMEDIATE_JSON, 'r', encoding='utf-8') as f:
-        concepts = json.load(f)
+ASSOCIATED_TERMS_LIMIT = 20
 
-    print(f"   ✅ Loaded {len(concepts):,} concepts")
-    return set(concepts.keys())
+# Concept graph edge arrays in a shard (see scan_mrrel) → array typecode
+GRAPH_EDGE_ARRAYS = {
+    'graph_sources': 'i', 'graph_targets': 'i',
+    'graph_rels': 'B', 'graph_relas': 'H', 'graph_sabs': 'H',
+}
 
 
-def parse_mrrel(our_cuis):
+def rela_weight(rela):
+    """Ranking weight of a relationship attribute (RELA, may be empty)."""
+    rela = rela.lower()
+    if rela in RELA_WEIGHTS:
+        return RELA_WEIGHTS[rela]
+    return DOMAIN_RELA_WEIGHT if rela in DOMAIN_SPECIFIC_RELA else OTHER_RELA_WEIGHT
+
+
+def concept_quality(concept):
     """
-    Parse MRREL.RRF to extract relationships for our concepts.
+    Ranking multiplier for a related concept, from 0.5 (bare term) to 1.0:
+    concepts with a definition, a MeSH code and several source
+    vocabularies make better associated terms.
+    """
+    quality = 0.5
+    if concept.definition:
+        quality += 0.2
+    if concept.mesh_code:
+        quality += 0.2
+    quality += 0.1 * min(concept.source_count, 3) / 3
+    return quality
+
+
+def load_concepts():
+    """
+    Stream our 325K extracted concepts, keeping only what this script needs.
 
     Returns:
-        dict: {CUI: {related_concepts: [CUI2, ...], relationships: {CUI2: [RELA, ...]}}}
-        dict: Relationship type statistics
+        CUISet: CUIs of our concepts (MRREL filter)
+        dict: {CUI: preferred term} for mapping associations to term names
+        dict: {CUI: concept_quality()} for ranking associations
     """
-    print(f"\n🔍 Parsing MRREL.RRF (5.7 GB, ~80M rows)...")
-    print(f"   Looking for relationships involving {len(our_cuis):,} neuroscience CUIs...")
+    print(f"\n📥 Loading concepts from {INTERMEDIATE_FILE}...")
 
-    associations = defaultdict(lambda: {
-        'related_cuis': set(),
-        'relationships': defaultdict(list)
-    })
+    our_cuis = CUISet()
+    concept_terms = {}
+    concept_qualities = {}
+    for cui, concept in iter_intermediate(INTERMEDIATE_FILE):
+        our_cuis.add(cui)
+        concept_terms[cui] = concept.preferred_term
+        concept_qualities[cui] = concept_quality(concept)
 
-    # Statistics
-    stats = {
+    print(f"   ✅ Loaded {len(concept_terms):,} concepts")
+    return our_cuis, concept_terms, concept_qualities
+
+
+def new_stats():
+    """Empty MRREL statistics counters."""
+    return {
         'total_rows': 0,
         'our_cui_matches': 0,
         'relationships_extracted': 0,
@@ -101,68 +194,565 @@ def parse_mrrel(our_cuis):
         'taxonomy': 0,
     }
 
-    with open(MRREL_FILE, 'r', encoding='utf-8') as f:
-        for line in f:
-            stats['total_rows'] += 1
 
-            cols = line.strip().split('|')
-            if len(cols) < 16:
-                continue
+def merge_stats(stats, other):
+    """Add one scan's statistics counters into `stats` in place."""
+    for key, value in other.items():
+        if isinstance(value, Counter):
+            stats[key].update(value)
+        else:
+            stats[key] += value
 
-            cui1 = cols[0]
-            rel = cols[3]      # Relationship type (RB, RN, RO, etc.)
-            cui2 = cols[4]
-            rela = cols[7]     # Additional relationship attribute
-            sab = cols[10]     # Source vocabulary
-            suppress = cols[14]  # Suppression flag
 
-            # Only process if one of the CUIs is in our set
-            if cui1 not in our_cuis and cui2 not in our_cuis:
-                continue
+def scan_mrrel(our_cuis, byte_range=None, progress=None, mrrel_file=MRREL_FILE):
+    """
+    Scan MRREL.RRF (or one byte range of it) into a compact edge shard.
+
+    `our_cuis` is a CUISet of the extracted concepts.
+
+    The shard holds one entry per stored (directed) relationship, in row
+    order: integer CUI ids for both ends plus interned RELA and SAB codes.
+    reduce_shards() turns shards back into per-CUI associations.
 
-            stats['our_cui_matches'] += 1
+    It also holds the concept graph's edges (see save_concept_graph()):
+    every relationship between two of our concepts, taxonomy included, as
+    CUI1 → CUI2 with REL/RELA/SAB codes.
 
-            # Skip suppressed relationships
-            if suppress != 'N':
+    Returns:
+        dict: {'cuis': array, 'related': array, 'rela_codes': array,
+               'relas': [RELA, ...], 'sab_codes': array, 'sabs': [SAB, ...],
+               'graph_sources': array, 'graph_targets': array, 'graph_rels': array,
+               'graph_relas': array, 'graph_sabs': array, 'rels': [REL, ...]}
+        dict: Relationship type statistics for the scanned rows
+    """
+    cuis = array('i')
+    related = array('i')
+    rela_codes = array('H')
+    rela_table = {'': 0}  # RELA string → code; code 0 means no RELA
+    sab_codes = array('H')
+    sab_table = {}
+    rel_table = {}
+    graph = {key: array(typecode) for key, typecode in GRAPH_EDGE_ARRAYS.items()}
+    graph_sources, graph_targets, graph_rels, graph_relas, graph_sabs = graph.values()
+
+    stats = new_stats()
+    our_cui_flags = our_cuis.flags  # CUISet flag array, indexed by CUI id
+
+    def report_progress(reader):
+        progress(reader, len(cuis))
+
+    # Only process if one of the CUIs is in our set; skip suppressed relationships
+    reader = RRFReader(
+        mrrel_file,
+        columns=('CUI1', 'REL', 'CUI2', 'RELA', 'SAB'),
+        cui_filter=our_cuis,
+        cui_columns=('CUI1', 'CUI2'),
+        where={'SUPPRESS': 'N'},
+        byte_range=byte_range,
+        progress=report_progress if progress else None,
+        progress_every=10000000,
+    )
+
+    for cui1, rel, cui2, rela, sab in reader:
+        # Track statistics
+        stats['rel_types'][rel] += 1
+        if rela:
+            stats['rela_types'][rela] += 1
+        stats['sources'][sab] += 1
+
+        rela_code = rela_table.get(rela)
+        if rela_code is None:
+            rela_code = rela_table[rela] = len(rela_table)
+        sab_code = sab_table.get(sab)
+        if sab_code is None:
+            sab_code = sab_table[sab] = len(sab_table)
+
+        # A malformed CUI (e.g. an empty field) is not one of ours; the
+        # edge to it is dropped, as a partner without a term would be
+        cui1_id = parse_cui(cui1)
+        cui2_id = parse_cui(cui2)
+        well_formed = cui1_id is not None and cui2_id is not None
+
+        # Concept graph: every relationship between two of our concepts
+        if well_formed and our_cui_flags[cui1_id] and our_cui_flags[cui2_id] and cui1_id != cui2_id:
+            rel_code = rel_table.get(rel)
+            if rel_code is None:
+                rel_code = rel_table[rel] = len(rel_table)
+            graph_sources.append(cui1_id)
+            graph_targets.append(cui2_id)
+            graph_rels.append(rel_code)
+            graph_relas.append(rela_code)
+            graph_sabs.append(sab_code)
+
+        # Determine if this is domain-specific or taxonomy
+        is_domain_specific = rela and rela.lower() in DOMAIN_SPECIFIC_RELA
+        is_taxonomy = rel in TAXONOMY_REL
+
+        if is_taxonomy:
+            stats['taxonomy'] += 1
+            # Skip pure taxonomy relationships (we want domain-specific)
+            if not is_domain_specific:
                 continue
 
-            # Track statistics
-            stats['rel_types'][rel] += 1
-            if rela:
-                stats['rela_types'][rela] += 1
-            stats['sources'][sab] += 1
+        if is_domain_specific:
+            stats['domain_specific'] += 1
+
+        if not well_formed:
+            continue
+
+        # Store relationship (bidirectional)
+
+        if our_cui_flags[cui1_id]:
+            cuis.append(cui1_id)
+            related.append(cui2_id)
+            rela_codes.append(rela_code)
+            sab_codes.append(sab_code)
+            stats['relationships_extracted'] += 1
+
+        if our_cui_flags[cui2_id] and cui2_id != cui1_id:
+            cuis.append(cui2_id)
+            related.append(cui1_id)
+            rela_codes.append(rela_code)
+            sab_codes.append(sab_code)
+            stats['relationships_extracted'] += 1
+
+    stats['total_rows'] = reader.counts['rows']
+    stats['our_cui_matches'] = reader.counts['cui_match']
+
+    shard = {
+        'cuis': cuis,
+        'related': related,
+        'rela_codes': rela_codes,
+        'relas': list(rela_table),
+        'sab_codes': sab_codes,
+        'sabs': list(sab_table),
+        'rels': list(rel_table),
+    }
+    shard.update(graph)
+    return shard, stats
+
+
+def shard_edges(shards):
+    """
+    Yields the shards' stored relationships in file order, with each edge's
+    score (RELA weight × source weight).
+
+    Yields:
+        tuple: (CUI, related CUI, score, RELA or '')
+    """
+    for shard in shards:
+        relas = shard['relas']
+        rela_weights = [rela_weight(rela) for rela in relas]
+        source_weights = [SOURCE_WEIGHTS.get(sab, DEFAULT_SOURCE_WEIGHT) for sab in shard['sabs']]
+        for cui_id, related_id, rela_code, sab_code in zip(
+            shard['cuis'], shard['related'], shard['rela_codes'], shard['sab_codes']
+        ):
+            yield (decode_cui(cui_id), decode_cui(related_id),
+                   rela_weights[rela_code] * source_weights[sab_code], relas[rela_code])
+
+
+def reduce_shards(shards):
+    """
+    Merge edge shards (in file order) into per-CUI associations, summing
+    each related concept's edge scores (RELA weight × source weight).
+
+    Returns:
+        dict: {CUI: {scores: {CUI2: score, ...}, relationships: {CUI2: [RELA, ...]}}}
+    """
+    associations = defaultdict(lambda: {
+        'scores': defaultdict(float),
+        'relationships': defaultdict(list)
+    })
 
-            # Determine if this is domain-specific or taxonomy
-            is_domain_specific = rela and rela.lower() in DOMAIN_SPECIFIC_RELA
-            is_taxonomy = rel in TAXONOMY_REL
+    for cui, related_cui, score, rela in shard_edges(shards):
+        associations[cui]['scores'][related_cui] += score
+        if rela:
+            associations[cui]['relationships'][related_cui].append(rela)
 
-            if is_taxonomy:
-                stats['taxonomy'] += 1
-                # Skip pure taxonomy relationships (we want domain-specific)
-                if not is_domain_specific:
-                    continue
+    return dict(associations)
 
-            if is_domain_specific:
-                stats['domain_specific'] += 1
 
-            # Store relationship (bidirectional)
-            if cui1 in our_cuis:
-                associations[cui1]['related_cuis'].add(cui2)
-                if rela:
-                    associations[cui1]['relationships'][cui2].append(rela)
-                stats['relationships_extracted'] += 1
+def extend_edges(edges, later_edges):
+    """SpillAccumulator merge for per-CUI edge lists."""
+    edges.extend(later_edges)
+    return edges
 
-            if cui2 in our_cuis and cui2 != cui1:
-                associations[cui2]['related_cuis'].add(cui1)
+
+class SpilledAssociations:
+    """
+    reduce_shards() under a memory budget: edges are collected per CUI in a
+    SpillAccumulator (lib/spill_accumulator.py), which moves them to run
+    files under imports/umls/ when they outgrow the budget, and each CUI's
+    scores are summed only when it is read back.
+
+    Shards are added one at a time as the scan produces them (add_shard()),
+    so they can be dropped right after. Gives the same items, in the same
+    order and with the same sums, as reduce_shards() over the same shards.
+    The edges held in memory stay around the budget while adding; items()
+    holds one partition of the run files at a time. Supports len() and
+    items(), which is all the later steps use.
+    """
+
+    def __init__(self, budget_bytes):
+        self.edges = SpillAccumulator(
+            extend_edges,
+            budget_bytes=budget_bytes,
+            sizeof=lambda edges: len(edges) * SPILL_EDGE_BYTES,
+            spill_dir=OUTPUT_ASSOCIATIONS.parent,
+        )
+
+    def add_shard(self, shard):
+        """Adds the next edge shard (in file order)."""
+        for cui, related_cui, score, rela in shard_edges([shard]):
+            self.edges.add(cui, [(related_cui, score, rela)])
+
+    def __len__(self):
+        return len(self.edges)
+
+    def items(self):
+        for cui, edges in self.edges.items():
+            association = {'scores': defaultdict(float), 'relationships': defaultdict(list)}
+            for related_cui, score, rela in edges:
+                association['scores'][related_cui] += score
                 if rela:
-                    associations[cui2]['relationships'][cui1].append(rela)
-                stats['relationships_extracted'] += 1
+                    association['relationships'][related_cui].append(rela)
+            yield cui, association
+
+    def close(self):
+        """Deletes the run files."""
+        self.edges.close()
+
+
+def scan_mrrel_columns(our_cuis, columns):
+    """
+    scan_mrrel() over the MRREL column cache, as NumPy masks and gathers.
+
+    Produces the same shard (edges in the same order) and statistics as
+    scanning MRREL.RRF, for the current DOMAIN_SPECIFIC_RELA/TAXONOMY_REL.
 
-            # Progress indicator
-            if stats['total_rows'] % 10000000 == 0:
-                print(f"   Processed {stats['total_rows']:,} rows, " +
-                      f"{stats['our_cui_matches']:,} relevant, " +
-                      f"{len(associations):,} CUIs with relationships...")
+    Args:
+        our_cuis (CUISet): CUIs of our concepts
+        columns (MRRELColumns): Column cache of MRREL.RRF
+
+    Returns:
+        dict: Edge shard (see scan_mrrel())
+        dict: Relationship type statistics
+    """
+    import numpy as np
+
+    stats = new_stats()
+    # One extra, unset flag at the end: MALFORMED_CUI_ID (-1) indexes it,
+    # so a malformed CUI is never one of ours
+    our_cui_flags = np.append(np.frombuffer(our_cuis.flags, dtype=np.uint8).view(bool), False)
+    not_suppressed = columns.lookup_table('SUPPRESS', lambda value: value == 'N')
+    is_taxonomy = columns.lookup_table('REL', lambda rel: rel in TAXONOMY_REL)
+    is_domain_specific = columns.lookup_table(
+        'RELA', lambda rela: rela and rela.lower() in DOMAIN_SPECIFIC_RELA
+    )
+    dictionaries = columns.dictionaries
+
+    # Per-code counts, plus the kept row where each code first appeared:
+    # the statistics Counters list values in that order, as the text scan
+    # would (most_common() breaks ties by it)
+    counted = {'rel_types': 'REL', 'rela_types': 'RELA', 'sources': 'SAB'}
+    counts = {counter: np.zeros(len(dictionaries[column]), dtype=np.int64)
+              for counter, column in counted.items()}
+    first_seen = {counter: {} for counter in counted}
+    kept_before = 0
+
+    def count(counter, codes):
+        counts[counter] += np.bincount(codes, minlength=len(counts[counter]))
+        seen = first_seen[counter]
+        values, positions = np.unique(codes, return_index=True)
+        for code, position in zip(values.tolist(), positions.tolist()):
+            seen.setdefault(code, kept_before + position)
+
+    cui_parts, related_parts, rela_parts, sab_parts = [], [], [], []
+    graph_parts = {key: [] for key in GRAPH_EDGE_ARRAYS}
+
+    for start in range(0, len(columns), COLUMN_CHUNK_ROWS):
+        chunk = slice(start, start + COLUMN_CHUNK_ROWS)
+        cui1 = columns.columns['CUI1'][chunk]
+        cui2 = columns.columns['CUI2'][chunk]
+        cui1_ours = our_cui_flags[cui1]
+        cui2_ours = our_cui_flags[cui2]
+
+        # Same filter stages as RRFReader: CUI membership, then SUPPRESS
+        matched = cui1_ours | cui2_ours
+        stats['our_cui_matches'] += int(np.count_nonzero(matched))
+        kept = np.flatnonzero(matched & not_suppressed[columns.columns['SUPPRESS'][chunk]])
+
+        # Concept graph: every kept relationship between two of our concepts
+        in_graph = kept[cui1_ours[kept] & cui2_ours[kept] & (cui1[kept] != cui2[kept])]
+        for key, column in (('graph_sources', 'CUI1'), ('graph_targets', 'CUI2'),
+                            ('graph_rels', 'REL'), ('graph_relas', 'RELA'),
+                            ('graph_sabs', 'SAB')):
+            graph_parts[key].append(columns.columns[column][chunk][in_graph])
+
+        rel = columns.columns['REL'][chunk][kept]
+        rela = columns.columns['RELA'][chunk][kept]
+        count('rel_types', rel)
+        count('rela_types', rela)
+        count('sources', columns.columns['SAB'][chunk][kept])
+        kept_before += len(kept)
+
+        taxonomy = is_taxonomy[rel]
+        domain_specific = is_domain_specific[rela]
+        stats['taxonomy'] += int(np.count_nonzero(taxonomy))
+        stats['domain_specific'] += int(np.count_nonzero(domain_specific))
+
+        # Pure taxonomy relationships are skipped; the rest are stored in
+        # both directions, interleaved per row as the text scan appends them
+        stored = kept[~taxonomy | domain_specific]
+        rela = columns.columns['RELA'][chunk][stored]
+        sab = columns.columns['SAB'][chunk][stored]
+        cui1 = cui1[stored]
+        cui2 = cui2[stored]
+        # Edges to a malformed CUI are dropped, as in the text scan
+        well_formed = (cui1 != MALFORMED_CUI_ID) & (cui2 != MALFORMED_CUI_ID)
+        directions = np.stack([cui1_ours[stored] & well_formed,
+                               cui2_ours[stored] & (cui2 != cui1) & well_formed], axis=1)
+        cui_parts.append(np.stack([cui1, cui2], axis=1)[directions])
+        related_parts.append(np.stack([cui2, cui1], axis=1)[directions])
+        rela_parts.append(np.stack([rela, rela], axis=1)[directions])
+        sab_parts.append(np.stack([sab, sab], axis=1)[directions])
+
+    def edges(parts):
+        return np.concatenate(parts).tolist() if parts else []
+
+    shard = {
+        'cuis': edges(cui_parts),
+        'related': edges(related_parts),
+        'rela_codes': edges(rela_parts),
+        'relas': dictionaries['RELA'],
+        'sab_codes': edges(sab_parts),
+        'sabs': dictionaries['SAB'],
+        'rels': dictionaries['REL'],
+    }
+    shard.update({key: edges(parts) for key, parts in graph_parts.items()})
+
+    for counter, column in counted.items():
+        names = dictionaries[column]
+        seen = first_seen[counter]
+        for code in sorted(seen, key=seen.get):
+            if counter != 'rela_types' or names[code]:  # Empty RELAs are not counted
+                stats[counter][names[code]] = int(counts[counter][code])
+
+    stats['total_rows'] = columns.total_rows
+    stats['relationships_extracted'] = len(shard['cuis'])
+    return shard, stats
+
+
+def load_mrrel_columns(metrics):
+    """
+    Opens the MRREL column cache, (re)building it first if it is missing or
+    MRREL.RRF changed since it was built.
+
+    Returns:
+        MRRELColumns
+    """
+    columns = open_mrrel_columns(MRREL_COLUMNS_DIR, MRREL_FILE)
+    if columns is not None:
+        print(f"   Using column cache {MRREL_COLUMNS_DIR} ({len(columns):,} rows)")
+        return columns
+
+    print(f"   Building column cache {MRREL_COLUMNS_DIR} (one-time full scan)...")
+
+    def report_progress(reader):
+        print(f"   Converted {reader.rows_read:,} rows..." + metrics.track(reader))
+
+    build_mrrel_columns(MRREL_FILE, MRREL_COLUMNS_DIR, progress=report_progress)
+    return MRRELColumns(MRREL_COLUMNS_DIR)
+
+
+class GraphEdges:
+    """
+    The shards' concept graph edges, concatenated in file order as shards
+    are added, with their shard-local REL/RELA/SAB codes recoded into
+    shared tables.
+    """
+
+    def __init__(self):
+        self.edges = {key: array(typecode) for key, typecode in GRAPH_EDGE_ARRAYS.items()}
+        self.tables = {'REL': {}, 'RELA': {}, 'SAB': {}}
+
+    def add_shard(self, shard):
+        """Appends the next edge shard's graph edges (in file order)."""
+        edges = self.edges
+        edges['graph_sources'].extend(shard['graph_sources'])
+        edges['graph_targets'].extend(shard['graph_targets'])
+        for key, name, names in (('graph_rels', 'REL', shard['rels']),
+                                 ('graph_relas', 'RELA', shard['relas']),
+                                 ('graph_sabs', 'SAB', shard['sabs'])):
+            codes = self.tables[name]
+            recode = [codes.setdefault(value, len(codes)) for value in names]
+            edges[key].extend(recode[code] for code in shard[key])
+
+    def result(self):
+        """
+        Returns:
+            tuple: (sources, targets, REL codes, RELA codes, SAB codes) arrays
+            dict: {'REL': [...], 'RELA': [...], 'SAB': [...]} naming the codes
+        """
+        return (tuple(self.edges.values()),
+                {name: list(codes) for name, codes in self.tables.items()})
+
+
+def save_concept_graph(our_cuis, graph_edges):
+    """
+    Write the concept graph (lib/concept_graph.py): our concepts as nodes,
+    their MRREL relationships to each other as typed edges.
+
+    Returns:
+        int: Number of edges written
+    """
+    print(f"\n💾 Saving concept graph to {OUTPUT_GRAPH}...")
+
+    edges, type_names = graph_edges
+    write_concept_graph(OUTPUT_GRAPH, our_cuis.ids(), edges, type_names)
+
+    print(f"   ✅ Saved {len(our_cuis):,} concepts, {len(edges[0]):,} edges")
+    return len(edges[0])
+
+
+def save_hierarchy_index():
+    """
+    Write the hierarchy ancestor index (lib/hierarchy_index.py) from the
+    taxonomy edges (PAR/CHD/RB/RN) in the concept graph, one hierarchy per
+    source. These are the relationships left out of the associations.
+
+    Returns:
+        list: Per-source table entries (members, intervals, cycle edges)
+    """
+    print(f"\n💾 Saving hierarchy index to {OUTPUT_HIERARCHY}...")
+
+    table = write_hierarchy_index(OUTPUT_HIERARCHY, ConceptGraph(OUTPUT_GRAPH))
+
+    members = sum(entry['members'] for entry in table)
+    print(f"   ✅ Saved {len(table):,} source hierarchies ({members:,} concept placements)")
+    largest = sorted(table, key=lambda entry: (-entry['members'], entry['sab']))[:5]
+    for entry in largest:
+        print(f"      {entry['sab']}: {entry['members']:,} concepts, "
+              f"{entry['intervals']:,} intervals, {entry['cycle_edges']:,} cycle edges dropped")
+    return table
+
+
+# CUI filter shared with MRREL worker processes (set by init_mrrel_worker)
+_worker_filters = {}
+
+
+def init_mrrel_worker(our_cuis):
+    """Process pool initializer: keep the CUI filter per worker."""
+    _worker_filters['our_cuis'] = our_cuis
+
+
+def scan_mrrel_chunk(byte_range):
+    """Process pool task: scan one MRREL byte range."""
+    return scan_mrrel(_worker_filters['our_cuis'], byte_range=byte_range)
+
+
+def scan_mrrel_chunks(our_cuis, byte_ranges, workers):
+    """
+    Scans MRREL byte ranges, in a process pool if workers > 1.
+
+    Yields:
+        tuple: (shard, stats) of each range, in file order (see scan_mrrel())
+    """
+    if workers <= 1:
+        for byte_range in byte_ranges:
+            yield scan_mrrel(our_cuis, byte_range=byte_range)
+        return
+
+    with multiprocessing.Pool(
+        workers,
+        initializer=init_mrrel_worker,
+        initargs=(our_cuis,),
+    ) as pool:
+        yield from ordered_imap(pool, scan_mrrel_chunk, byte_ranges, TASKS_PER_WORKER * workers)
+
+
+def parse_mrrel(our_cuis, workers=1, metrics=None, use_columns=False, memory_budget=None):
+    """
+    Parse MRREL.RRF to extract relationships for our concepts.
+
+    With workers > 1, newline-aligned byte ranges are scanned in a process
+    pool; each worker returns an edge shard that is reduced in file order, so
+    associations and statistics match the serial scan exactly.
+
+    With use_columns, relationships are filtered from the MRREL column cache
+    (lib/mrrel_columns.py) instead, building it on first use; the result is
+    again identical.
+
+    With memory_budget (bytes), MRREL.RRF is scanned in byte-range chunks
+    small enough that the shards in flight take at most half the budget, and
+    each shard is added to a SpilledAssociations (which spills past the
+    other half) and dropped as soon as it arrives. The concept graph edges
+    (between our concepts only) are still kept in memory, and so is the
+    single shard of the column cache or of a compressed MRREL, which cannot
+    be split.
+
+    Returns:
+        dict: {CUI: {scores: {CUI2: score, ...}, relationships: {CUI2: [RELA, ...]}}}
+        dict: Relationship type statistics
+        tuple: Concept graph edges and type names (see GraphEdges.result())
+    """
+    print(f"\n🔍 Parsing MRREL.RRF (5.7 GB, ~80M rows)...")
+    print(f"   Looking for relationships involving {len(our_cuis):,} neuroscience CUIs...")
+    metrics = metrics or StageMetrics('parse_mrrel')
+    metrics.total_bytes = input_size(MRREL_FILE)
+
+    stats = new_stats()
+    shards = []
+    graph = GraphEdges()
+    spilled = None if memory_budget is None else SpilledAssociations(memory_budget // 2)
+
+    def consume(shard):
+        graph.add_shard(shard)
+        if spilled is None:
+            shards.append(shard)
+        else:
+            spilled.add_shard(shard)
+
+    # Several chunks per worker keeps the pool busy when chunks are uneven
+    chunks = workers * CHUNKS_PER_WORKER if workers > 1 else 1
+    if memory_budget is not None:
+        # Shards in flight: the pool's task window, plus the one being consumed
+        in_flight = TASKS_PER_WORKER * workers + 1 if workers > 1 else 1
+        chunk_bytes = max(BLOCK_SIZE, int(memory_budget / 2 / in_flight / SHARD_BYTES_PER_INPUT_BYTE))
+        chunks = max(chunks, -(-metrics.total_bytes // chunk_bytes))
+
+    if use_columns:
+        columns = load_mrrel_columns(metrics)
+        shard, stats = scan_mrrel_columns(our_cuis, columns)
+        consume(shard)
+    elif chunks > 1:
+        byte_ranges = split_byte_ranges(MRREL_FILE, chunks)
+        print(f"   Scanning {len(byte_ranges)} chunks with {workers} worker process(es)...")
+
+        for i, (shard, chunk_stats) in enumerate(
+            scan_mrrel_chunks(our_cuis, byte_ranges, workers), 1
+        ):
+            consume(shard)
+            del shard  # Spilled or merged; don't keep it alive until the next chunk
+            merge_stats(stats, chunk_stats)
+            # Chunks complete in file order, so the last one done marks the offset reached
+            metrics.advance(stats['total_rows'], byte_ranges[i - 1][1])
+            print(f"   Chunk {i}/{len(byte_ranges)}: " +
+                  f"{stats['total_rows']:,} rows, " +
+                  f"{stats['our_cui_matches']:,} relevant..." + metrics.eta())
+    else:
+        def report_progress(reader, relationships):
+            print(f"   Processed {reader.rows_read:,} rows, " +
+                  f"{reader.counts['cui_match']:,} relevant, " +
+                  f"{relationships:,} relationships..." + metrics.track(reader))
+
+        shard, stats = scan_mrrel(our_cuis, progress=report_progress)
+        consume(shard)
+
+    associations = reduce_shards(shards) if spilled is None else spilled
+    graph_edges = graph.result()
+    metrics.advance(stats['total_rows'], metrics.total_bytes)
+    metrics.count(stats)
 
     print(f"\n   ✅ Parsing complete!")
     print(f"\n   📊 Statistics:")
@@ -172,56 +762,123 @@ def parse_mrrel(our_cuis):
     print(f"      Domain-specific relationships: {stats['domain_specific']:,}")
     print(f"      Taxonomy relationships (excluded): {stats['taxonomy']:,}")
     print(f"      CUIs with associations: {len(associations):,}")
+    if memory_budget is not None and associations.edges.spills:
+        print(f"      Spilled to disk: {associations.edges.spills:,} runs, " +
+              f"{associations.edges.spilled_bytes / 1024 / 1024:.1f} MB")
 
-    return dict(associations), stats
+    return associations, stats, graph_edges
 
 
-def map_cui_to_terms(associations, concepts_data):
+def rank_related(scores, concept_terms, concept_qualities, limit=ASSOCIATED_TERMS_LIMIT):
+    """
+    Picks a CUI's best related concepts with a bounded heap.
+
+    Only related concepts that are among our concepts (and have a term)
+    are candidates. Ties are broken by CUI, so the ranking never depends
+    on set or hash order.
+
+    Args:
+        scores (dict): {CUI2: summed edge score} (see reduce_shards())
+        concept_terms (dict): {CUI: preferred term}
+        concept_qualities (dict): {CUI: concept_quality()}
+        limit (int): Related concepts to keep
+
+    Returns:
+        list: Up to `limit` related CUIs, best first
+        int: Number of candidates
+    """
+    # Scores are compared as saved by save_relationships() (6 decimals), so
+    # a delta re-import ranks exactly like a full import
+    candidates = [
+        (-round(round(score, 6) * concept_qualities.get(related_cui, 1.0), 6), related_cui)
+        for related_cui, score in scores.items()
+        if concept_terms.get(related_cui)
+    ]
+    return [related_cui for _, related_cui in heapq.nsmallest(limit, candidates)], len(candidates)
+
+
+def map_cui_to_terms(associations, concept_terms, concept_qualities):
     """
     Map CUI associations to term names for "Commonly Associated Terms".
 
+    Args:
+        associations (dict): Output of parse_mrrel(), or relationships
+            loaded with load_relationships()
+        concept_terms (dict): {CUI: preferred term} from load_concepts()
+        concept_qualities (dict): {CUI: concept_quality()} from load_concepts()
+
     Returns:
         dict: {CUI: {'associated_terms': [term1, term2, ...], 'relationship_details': {...}}}
+            with the top ASSOCIATED_TERMS_LIMIT terms, best first
     """
     print(f"\n🗺️  Mapping CUI associations to term names...")
 
-    # Load full concepts data to get term names
-    with open(INTERMEDIATE_JSON, 'r', encoding='utf-8') as f:
-        concepts = json.load(f)
-
     mapped_associations = {}
     cuis_with_terms = 0
 
     for cui, assoc_data in associations.items():
-        related_cuis = assoc_data['related_cuis']
+        top_cuis, total = rank_related(assoc_data['scores'], concept_terms, concept_qualities)
+        if not top_cuis:
+            continue
 
-        # Map CUIs to term names
         associated_terms = []
         relationship_details = {}
+        for related_cui in top_cuis:
+            term_name = concept_terms[related_cui]
+            associated_terms.append(term_name)
+            # Store relationship types for this term
+            relas = assoc_data['relationships'].get(related_cui, [])
+            if relas:
+                relationship_details[term_name] = relas
 
-        for related_cui in related_cuis:
-            if related_cui in concepts:
-                term_name = concepts[related_cui].get('preferred_term', '')
-                if term_name:
-                    associated_terms.append(term_name)
-                    # Store relationship types for this term
-                    relas = assoc_data['relationships'].get(related_cui, [])
-                    if relas:
-                        relationship_details[term_name] = relas
-
-        if associated_terms:
-            mapped_associations[cui] = {
-                'associated_terms': associated_terms[:20],  # Limit to top 20
-                'relationship_details': relationship_details,
-                'total_associations': len(associated_terms)
-            }
-            cuis_with_terms += 1
+        mapped_associations[cui] = {
+            'associated_terms': associated_terms,
+            'relationship_details': relationship_details,
+            'total_associations': total
+        }
+        cuis_with_terms += 1
 
     print(f"   ✅ Mapped {cuis_with_terms:,} CUIs to associated term names")
 
     return mapped_associations
 
 
+def save_relationships(associations):
+    """
+    Stream the per-CUI relationships (before term mapping) as JSON Lines, so
+    an incremental re-import (import_umls_delta.py) can re-map associations
+    without re-scanning MRREL for unchanged CUIs.
+    """
+    print(f"\n💾 Saving relationships to {OUTPUT_RELATIONSHIPS}...")
+
+    with open(OUTPUT_RELATIONSHIPS, 'w', encoding='utf-8') as f:
+        for cui, data in associations.items():
+            f.write(json.dumps({
+                'cui': cui,
+                'scores': {
+                    related_cui: round(data['scores'][related_cui], 6)
+                    for related_cui in sorted(data['scores'])
+                },
+                'relationships': data['relationships'],
+            }))
+            f.write('\n')
+
+    print(f"   ✅ Saved relationships for {len(associations):,} CUIs")
+
+
+def load_relationships(path=OUTPUT_RELATIONSHIPS):
+    """
+    Stream relationships saved by save_relationships().
+
+    Yields:
+        tuple: (CUI, {'scores': {CUI2: score, ...}, 'relationships': {CUI2: [RELA, ...]}})
+    """
+    with open(path, 'r', encoding='utf-8') as f:
+        for line in f:
+            record = json.loads(line)
+            yield record.pop('cui'), record
+
+
 def generate_profile_report(stats, associations, mapped_associations):
     """Generate markdown report profiling MRREL relationships."""
     print(f"\n📝 Generating relationship profile report...")
@@ -364,24 +1021,75 @@ def generate_profile_report(stats, associations, mapped_associations):
     print(f"   ✅ Profile report saved to {OUTPUT_PROFILE}")
 
 
+def parse_args():
+    parser = argparse.ArgumentParser(description="Extract UMLS associations from MRREL.RRF")
+    parser.add_argument(
+        '--workers', type=int, default=1,
+        help="Worker processes for MRREL parsing (1 = serial, 0 = all CPU cores)"
+    )
+    parser.add_argument(
+        '--columns', action='store_true',
+        help=f"Filter relationships from the columnar MRREL cache ({MRREL_COLUMNS_DIR}, "
+             "built on first use; needs numpy) instead of re-scanning MRREL.RRF"
+    )
+    parser.add_argument(
+        '--memory-budget', type=int, metavar='MB',
+        help="Keep the scanned relationships within about this many MB while "
+             "parsing MRREL: chunks are scanned and consumed one at a time and "
+             "per-CUI associations spill to disk (default: keep them all in "
+             "memory); output is identical"
+    )
+    add_sample_argument(parser)
+    return parser.parse_args()
+
+
 def main():
+    args = parse_args()
+    workers = args.workers or os.cpu_count() or 1
+    if args.sample:
+        enter_sample(args.sample, MRREL_FILE.parent, [MRREL_FILE.name])
+
     print("="*70)
     print("UMLS MRREL RELATIONSHIP PARSER")
     print("="*70)
     print("\nDEC-001: Profiling domain-specific vs taxonomic relationships")
 
+    telemetry = Telemetry('parse_mrrel_associations', OUTPUT_ASSOCIATIONS.parent, sample=args.sample)
+
     # Step 1: Load our concepts
-    our_cuis = load_concepts()
+    with telemetry.stage('load_concepts', path=INTERMEDIATE_FILE) as metrics:
+        our_cuis, concept_terms, concept_qualities = load_concepts()
+        metrics.advance(len(concept_terms), metrics.total_bytes)
 
     # Step 2: Parse MRREL for relationships
-    associations, stats = parse_mrrel(our_cuis)
+    with telemetry.stage('parse_mrrel') as metrics:
+        try:
+            associations, stats, graph_edges = parse_mrrel(
+                our_cuis, workers=workers, metrics=metrics, use_columns=args.columns,
+                memory_budget=args.memory_budget and args.memory_budget * 1024 * 1024,
+            )
+        except ImportError as e:
+            print(f"\n❌ ERROR: {e}")
+            sys.exit(1)
 
     if not associations:
         print("\n❌ ERROR: No associations found")
         return
 
+    with telemetry.stage('save_concept_graph') as metrics:
+        edge_count = save_concept_graph(our_cuis, graph_edges)
+        metrics.advance(edge_count, OUTPUT_GRAPH.stat().st_size)
+    with telemetry.stage('save_hierarchy_index') as metrics:
+        hierarchies = save_hierarchy_index()
+        metrics.advance(len(hierarchies), OUTPUT_HIERARCHY.stat().st_size)
+
     # Step 3: Map CUIs to term names
-    mapped_associations = map_cui_to_terms(associations, INTERMEDIATE_JSON)
+    with telemetry.stage('save_relationships') as metrics:
+        save_relationships(associations)
+        metrics.advance(len(associations), OUTPUT_RELATIONSHIPS.stat().st_size)
+    with telemetry.stage('map_cui_to_terms') as metrics:
+        mapped_associations = map_cui_to_terms(associations, concept_terms, concept_qualities)
+        metrics.advance(rows=len(associations))
 
     # Step 4: Save associations
     print(f"\n💾 Saving associations to {OUTPUT_ASSOCIATIONS}...")
@@ -395,13 +1103,20 @@ def main():
             'total_associations': data['total_associations']
         }
 
-    with open(OUTPUT_ASSOCIATIONS, 'w', encoding='utf-8') as f:
-        json.dump(json_data, f, indent=2)
+    with telemetry.stage('save_associations') as metrics:
+        with open(OUTPUT_ASSOCIATIONS, 'w', encoding='utf-8') as f:
+            json.dump(json_data, f, indent=2)
+        metrics.advance(len(json_data), OUTPUT_ASSOCIATIONS.stat().st_size)
 
     print(f"   ✅ Saved {len(json_data):,} CUI associations")
 
     # Step 5: Generate profile report
     generate_profile_report(stats, associations, mapped_associations)
+    if isinstance(associations, SpilledAssociations):
+        associations.close()
+
+    telemetry.save()
+    telemetry.print_summary()
 
     # Summary
     print("\n" + "="*70)
@@ -414,6 +1129,8 @@ def main():
     print(f"✅ Domain-specific relationships: {stats['domain_specific']:,}")
     print(f"✅ Output: {OUTPUT_ASSOCIATIONS}")
     print(f"✅ Profile: {OUTPUT_PROFILE}")
+    print(f"✅ Concept graph: {OUTPUT_GRAPH}")
+    print(f"✅ Hierarchy index: {OUTPUT_HIERARCHY}")
 
     print(f"\n🎯 Next: Map UMLS data to NeuroDB-2 26-column schema")
 
@@ -0,0 +1,169 @@
+#!/usr/bin/env python3
+"""
+UMLS Concept Graph Query
+
+Queries the concept graph written by parse_mrrel_associations.py
+(imports/umls/umls_concept_graph.csr, see lib/concept_graph.py):
+
+- Edges of a concept (--edges)
+- k-hop neighbourhood, optionally over typed edges only (--hops)
+- Typed path, one edge filter per hop (--path)
+- Shortest path to another concept (--to)
+- Descendants in the source hierarchies (--descendants), and whether the
+  concept lies under another one (--under), from the hierarchy index
+  (imports/umls/umls_hierarchy.idx, see lib/hierarchy_index.py)
+
+Edge filters: --rel, --rela and --sab (repeatable). A --path step is
+FIELD=VALUE[,VALUE...] pairs joined by '+', e.g. 'rela=part_of' or
+'rel=PAR,RB+sab=MSH'. Hierarchy queries take one --sab (default: any source).
+
+Usage:
+    python scripts/query_concept_graph.py C0006104 --edges
+    python scripts/query_concept_graph.py C0006104 --hops 2 --rel PAR --rel RB
+    python scripts/query_concept_graph.py C0006104 --path rela=part_of --path rel=PAR
+    python scripts/query_concept_graph.py C0006104 --to C0007776
+    python scripts/query_concept_graph.py C0006104 --descendants --sab MSH
+    python scripts/query_concept_graph.py C0007776 --under C0006104
+"""
+
+import sys
+import time
+import argparse
+from pathlib import Path
+
+# Add lib to path
+sys.path.insert(0, str(Path(__file__).parent))
+
+from lib.concept_graph import ConceptGraph, ConceptGraphError
+from lib.hierarchy_index import HierarchyIndex, HierarchyIndexError
+from lib.intermediate import iter_intermediate
+
+GRAPH_FILE = Path("imports/umls/umls_concept_graph.csr")
+HIERARCHY_FILE = Path("imports/umls/umls_hierarchy.idx")
+INTERMEDIATE_FILE = Path("imports/umls/umls_concepts_intermediate.jsonl")
+
+
+def parse_path_step(step):
+    """Parses 'rel=PAR,RB+sab=MSH' into {'rel': ['PAR', 'RB'], 'sab': ['MSH']}."""
+    filters = {}
+    for part in step.split('+'):
+        field, _, values = part.partition('=')
+        field = field.strip().lower()
+        if field not in ('rel', 'rela', 'sab') or not values:
+            raise ValueError(f"Bad path step {step!r} (expected e.g. rela=part_of or rel=PAR,RB+sab=MSH)")
+        filters[field] = values.split(',')
+    return filters
+
+
+def load_terms(cuis):
+    """Preferred terms for a set of CUIs, from the intermediate file if present."""
+    if not INTERMEDIATE_FILE.exists():
+        return {}
+    return {
+        cui: concept.preferred_term
+        for cui, concept in iter_intermediate(INTERMEDIATE_FILE)
+        if cui in cuis
+    }
+
+
+def parse_args():
+    """Parses command-line options."""
+    parser = argparse.ArgumentParser(description="Query the UMLS concept graph")
+    parser.add_argument('cui', help="Start concept (CUI)")
+    query = parser.add_mutually_exclusive_group(required=True)
+    query.add_argument('--edges', action='store_true', help="List the concept's edges")
+    query.add_argument('--hops', type=int, help="Concepts within this many hops")
+    query.add_argument('--path', action='append', help="Typed path step (repeat per hop)")
+    query.add_argument('--to', metavar='CUI', help="Shortest path to this concept")
+    query.add_argument('--descendants', action='store_true', help="Concepts below it in the hierarchies")
+    query.add_argument('--under', metavar='CUI', help="Whether it lies below this concept")
+    parser.add_argument('--rel', action='append', help="Only edges with this REL")
+    parser.add_argument('--rela', action='append', help="Only edges with this RELA")
+    parser.add_argument('--sab', action='append', help="Only edges from this source")
+    parser.add_argument('--max-hops', type=int, default=6, help="Longest path for --to (default: 6)")
+    parser.add_argument('--graph', type=Path, default=GRAPH_FILE, help=f"Graph file (default: {GRAPH_FILE})")
+    parser.add_argument(
+        '--hierarchy', type=Path, default=HIERARCHY_FILE,
+        help=f"Hierarchy index (default: {HIERARCHY_FILE})"
+    )
+    return parser.parse_args()
+
+
+def query_hierarchy(args):
+    """Runs --descendants / --under against the hierarchy index."""
+    if args.sab and len(args.sab) > 1:
+        print("❌ Hierarchy queries take at most one --sab")
+        return 1
+    sab = args.sab[0] if args.sab else None
+    try:
+        index = HierarchyIndex(args.hierarchy)
+    except HierarchyIndexError as e:
+        print(f"❌ {e}")
+        return 1
+
+    started = time.perf_counter()
+    if args.under:
+        under = index.is_under(args.cui, args.under, sab=sab)
+        elapsed = time.perf_counter() - started
+        terms = load_terms({args.cui, args.under})
+        concept, ancestor = (f"{cui} {terms.get(cui) or ''}".rstrip() for cui in (args.cui, args.under))
+        print(f"{'✅' if under else '❌'} {concept} {'is' if under else 'is not'} under {ancestor}")
+        print(f"   ({sab or 'any source'}, {elapsed * 1000:.3f} ms)")
+        return 0 if under else 1
+
+    results = index.descendants(args.cui, sab=sab)
+    elapsed = time.perf_counter() - started
+    terms = load_terms(set(results) | {args.cui})
+    sources = ', '.join(index.hierarchies_of(args.cui)) or 'no hierarchy'
+    print(f"🔍 {args.cui} {terms.get(args.cui) or ''} ({sources})")
+    for cui in results:
+        print(f"   {cui}  {terms.get(cui) or ''}".rstrip())
+    print(f"\n✅ {len(results):,} descendant(s) in {elapsed * 1000:.1f} ms")
+    return 0
+
+
+def main():
+    args = parse_args()
+    if args.descendants or args.under:
+        return query_hierarchy(args)
+    filters = {'rel': args.rel, 'rela': args.rela, 'sab': args.sab}
+
+    try:
+        graph = ConceptGraph(args.graph)
+    except ConceptGraphError as e:
+        print(f"❌ {e}")
+        return 1
+    if args.cui not in graph:
+        print(f"❌ {args.cui} is not in the concept graph")
+        return 1
+
+    started = time.perf_counter()
+    if args.edges:
+        results = [(cui, f"{rel} {rela or '-'} {sab}") for cui, rel, rela, sab in graph.edges(args.cui, **filters)]
+    elif args.hops is not None:
+        results = [(cui, f"{hops} hop(s)") for cui, hops in graph.k_hop(args.cui, args.hops, **filters).items()]
+    elif args.path:
+        try:
+            steps = [parse_path_step(step) for step in args.path]
+        except ValueError as e:
+            print(f"❌ {e}")
+            return 1
+        results = [(cui, '') for cui in graph.follow(args.cui, steps)]
+    else:
+        path = graph.shortest_path(args.cui, args.to, max_hops=args.max_hops, **filters)
+        if path is None:
+            print(f"❌ No path from {args.cui} to {args.to} within {args.max_hops} hops")
+            return 1
+        results = [(cui, f"step {i}") for i, cui in enumerate(path)]
+    elapsed = time.perf_counter() - started
+
+    terms = load_terms({cui for cui, _ in results} | {args.cui})
+    print(f"🔍 {args.cui} {terms.get(args.cui) or ''}".rstrip())
+    for cui, detail in results:
+        print(f"   {cui}  {detail:<28} {terms.get(cui) or ''}".rstrip())
+    print(f"\n✅ {len(results):,} result(s) in {elapsed * 1000:.1f} ms")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,205 @@
+#!/usr/bin/env python3
+"""
+UMLS Filter What-If Simulator
+
+Re-runs the DEC-002 filter stages 3-5 and the term deduplication of
+import_umls_neuroscience.py over the per-atom feature table
+(imports/umls/atom_features/, written by `import_umls_neuroscience.py
+--atom-features`, see lib/atom_features.py), and reports the term counts
+each filter configuration would give, in seconds instead of a full MRCONSO
+re-scan.
+
+The baseline is the importer's current BROAD_SEMANTIC_TYPES, NEURO_KEYWORDS
+and stage 3/4 rules. One variant can be given with the flags below; several
+with --config, a JSON object mapping variant names to overrides:
+
+    {
+      "priority-1-only": {"max_priority": 1},
+      "no-drug-keywords": {"remove_broad_types": ["Pharmacologic Substance"]},
+      "strict": {"keywords": ["neuro", "brain", "cerebr"], "preferred_ttys": []}
+    }
+
+Override keys: broad_semantic_types, add_broad_types, remove_broad_types,
+keywords, add_keywords, remove_keywords, preferred_ttys, suppress,
+max_priority. Keywords must be in the table's vocabulary; record extra ones
+with `import_umls_neuroscience.py --atom-features --feature-keyword ...`.
+Priority configurations can only narrow the filter index (Priority 3 CUIs
+are not indexed, so they have no atoms in the table).
+
+Usage:
+    python scripts/simulate_filters.py --max-priority 1
+    python scripts/simulate_filters.py --remove-broad-type 'Disease or Syndrome'
+    python scripts/simulate_filters.py --add-keyword spinal --preferred-tty PT
+    python scripts/simulate_filters.py --config filter_variants.json
+"""
+
+import sys
+import json
+import time
+import argparse
+from pathlib import Path
+
+# Add lib to path
+sys.path.insert(0, str(Path(__file__).parent))
+
+from lib.atom_features import AtomFeatures, FeatureTableError, simulate_filters
+from lib.filter_index import FilterIndex, FilterIndexError
+
+import import_umls_neuroscience as importer
+
+TARGET_RANGE = (150000, 250000)
+
+# Stage 4 TTYs and stage 3 SUPPRESS values the importer uses
+BASELINE = {
+    'broad_semantic_types': sorted(importer.BROAD_SEMANTIC_TYPES),
+    'keywords': list(importer.NEURO_KEYWORDS),
+    'preferred_ttys': ['PN'],
+    'suppress': ['N'],
+    'max_priority': None,
+}
+
+OVERRIDE_KEYS = set(BASELINE) | {
+    'add_broad_types', 'remove_broad_types', 'add_keywords', 'remove_keywords',
+}
+
+
+def apply_overrides(overrides):
+    """
+    Baseline configuration with a variant's overrides applied.
+
+    Raises:
+        ValueError: On an unknown override key
+    """
+    unknown = set(overrides) - OVERRIDE_KEYS
+    if unknown:
+        raise ValueError(f"Unknown override(s): {', '.join(sorted(unknown))}")
+
+    config = dict(BASELINE)
+    config.update({key: overrides[key] for key in BASELINE if key in overrides})
+    for name, key in (('broad_types', 'broad_semantic_types'), ('keywords', 'keywords')):
+        removed = set(overrides.get(f'remove_{name}', ()))
+        config[key] = [value for value in config[key] if value not in removed]
+        config[key] += [value for value in overrides.get(f'add_{name}', ()) if value not in config[key]]
+    return config
+
+
+def variants_from_args(args):
+    """{variant name: overrides} from --config and the single-variant flags."""
+    variants = {}
+    if args.config:
+        with open(args.config, 'r', encoding='utf-8') as f:
+            variants.update(json.load(f))
+
+    overrides = {
+        'add_broad_types': args.add_broad_type,
+        'remove_broad_types': args.remove_broad_type,
+        'add_keywords': args.add_keyword,
+        'remove_keywords': args.remove_keyword,
+    }
+    overrides = {key: values for key, values in overrides.items() if values}
+    if args.preferred_tty is not None:
+        overrides['preferred_ttys'] = args.preferred_tty
+    if args.allow_suppressed:
+        overrides['suppress'] = ['N', 'Y', 'E', 'O']
+    if args.max_priority is not None:
+        overrides['max_priority'] = args.max_priority
+    if overrides:
+        variants['command line'] = overrides
+    return variants
+
+
+def print_results(results):
+    """Print stage counts per configuration, with the change from the baseline."""
+    baseline = results[0][1]
+    rows = [
+        ('Stage 3 (not suppressed)', 'stage3_not_suppressed'),
+        ('Stage 4 (preferred)', 'stage4_preferred'),
+        ('Stage 5 keyword pass', 'stage5_keyword_pass'),
+        ('Stage 5 keyword fail', 'stage5_keyword_fail'),
+        ('Concepts with terms', 'concepts'),
+        ('Unique terms', 'unique_terms'),
+    ]
+    for name, counts in results:
+        print(f"\n📊 {name}")
+        for label, key in rows:
+            delta = counts[key] - baseline[key]
+            change = f"  ({delta:+,})" if counts is not baseline else ''
+            print(f"   {label:<26} {counts[key]:>12,}{change}")
+
+        low, high = TARGET_RANGE
+        terms = counts['unique_terms']
+        if low <= terms <= high:
+            print(f"   ✅ Within target range (150K-250K)")
+        else:
+            print(f"   ⚠️  {'Below' if terms < low else 'Above'} target (150K-250K)")
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Simulate DEC-002 filter settings over the atom feature table")
+    parser.add_argument(
+        '--features', type=Path, default=importer.ATOM_FEATURES_DIR,
+        help=f"Feature table directory (default: {importer.ATOM_FEATURES_DIR})"
+    )
+    parser.add_argument('--config', type=Path, help="JSON file of named variants (see above)")
+    parser.add_argument('--add-broad-type', action='append', default=[], metavar='TYPE',
+                        help="Semantic type name or TUI needing the keyword check (repeatable)")
+    parser.add_argument('--remove-broad-type', action='append', default=[], metavar='TYPE',
+                        help="Drop a type from BROAD_SEMANTIC_TYPES (repeatable)")
+    parser.add_argument('--add-keyword', action='append', default=[], metavar='KEYWORD',
+                        help="Add a stage 5 keyword (repeatable)")
+    parser.add_argument('--remove-keyword', action='append', default=[], metavar='KEYWORD',
+                        help="Drop a stage 5 keyword (repeatable)")
+    parser.add_argument('--preferred-tty', action='append', metavar='TTY',
+                        help="TTYs treated as preferred besides ISPREF=Y (repeatable; default: PN)")
+    parser.add_argument('--allow-suppressed', action='store_true',
+                        help="Skip the stage 3 suppression filter")
+    parser.add_argument('--max-priority', type=int, choices=(1, 2),
+                        help="Keep only CUIs whose best filter priority is at most this")
+    return parser.parse_args()
+
+
+def main():
+    args = parse_args()
+
+    try:
+        features = AtomFeatures(args.features)
+        variants = {
+            name: apply_overrides(overrides)
+            for name, overrides in variants_from_args(args).items()
+        }
+    except (FeatureTableError, ValueError) as e:
+        print(f"❌ {e}")
+        print(f"   Build the table with: python3 scripts/import_umls_neuroscience.py --atom-features")
+        return 1
+    except ImportError as e:
+        print(f"❌ {e}")
+        return 1
+
+    try:
+        filter_index = FilterIndex(importer.FILTER_INDEX_FILE)
+        if not features.is_current(importer.MRCONSO_FILE, filter_index):
+            print(f"⚠️  {args.features} is older than MRCONSO.RRF or the filter index; "
+                  f"rebuild it with --atom-features")
+    except (FilterIndexError, OSError):
+        pass  # Sources not available here; simulate the table as it is
+
+    print(f"🔬 {len(features):,} English atoms (UMLS {features.release}, "
+          f"{len(features.keywords)} keywords recorded)")
+
+    started = time.perf_counter()
+    results = []
+    try:
+        for name, config in [('baseline', BASELINE)] + list(variants.items()):
+            results.append((name, simulate_filters(features, **config)))
+    except FeatureTableError as e:
+        print(f"❌ {e}")
+        return 1
+    elapsed = time.perf_counter() - started
+
+    print_results(results)
+    print(f"\n✅ {len(results)} configuration(s) simulated in {elapsed:.2f}s")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -12,10 +12,17 @@ Checks:
 5. No malformed rows
 """
 
+import sys
 import csv
+import argparse
 from pathlib import Path
 from collections import Counter
 
+# Add lib to path
+sys.path.insert(0, str(Path(__file__).parent))
+
+from lib.sampling import add_sample_argument, enter_sample
+
 # File to validate
 CSV_FILE = Path("imports/umls/umls_neuroscience_terms.csv")
 
@@ -109,7 +116,17 @@ def print_results(errors, warnings, row_count):
         print(f"❌ VALIDATION FAILED")
 
 
+def parse_args():
+    parser = argparse.ArgumentParser(description="Validate the UMLS CSV against the 26-column schema")
+    add_sample_argument(parser)
+    return parser.parse_args()
+
+
 def main():
+    args = parse_args()
+    if args.sample:
+        enter_sample(args.sample)
+
     print("="*70)
     print("UMLS CSV STRUCTURAL VALIDATOR")
     print("="*70)